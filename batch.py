@@ -0,0 +1,356 @@
+"""
+Non-interactive order processing.
+
+Prices order specs with the same logic as add_products_by_code, one order at a
+time, so a whole order book can be streamed from a file:
+
+    python batch.py orders.jsonl -o priced.jsonl
+    python batch.py orders.csv -o priced.csv
+    python batch.py orders.jsonl -o priced.jsonl --workers 8
+    python batch.py orders.jsonl -o priced.jsonl --store orders.db
+    python batch.py orders.jsonl -o priced.jsonl --lines lines.csv
+    python batch.py orders.jsonl -o priced.jsonl --lines lines.pkl      # pandas DataFrame
+    python batch.py orders.jsonl -o priced.jsonl --metrics metrics.prom
+    python batch.py orders.jsonl -o priced.jsonl --profile batch.prof
+
+A JSONL order spec looks like:
+
+    {"order_id": "A-1", "seller_id": 4, "customer_id": 1, "commission_rate": 5,
+     "table": "711", "payment_conditions": [30, 60], "transport_id": 7,
+     "sender": true, "items": [{"code": "100", "quantity": 4, "discount": 10}]}
+
+CSV input has one row per order line with the columns in CSV_COLUMNS; rows of
+the same order must be consecutive. payment_conditions is ';'-separated there.
+"""
+import argparse
+import cProfile
+import csv
+import json
+import os
+import pstats
+import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+import main as _main
+from instrumentation import instrument, metrics
+from loaders import parse_record
+from main import (ORDER_SUMMARY_COL_SPACE, ORDER_SUMMARY_COLUMNS, customer_dict, order_summary_row, price_order,
+                  product_name, products, seller_dict, transport_dict)
+from order_store import OrderStore
+from render import TableWriter, format_for_path, to_dataframe
+
+CSV_COLUMNS = ['order_id', 'seller_id', 'customer_id', 'commission_rate', 'table', 'payment_conditions',
+               'transport_id', 'sender', 'code', 'quantity', 'discount']
+
+# A CSV order spec, or a JSONL line as (line number, text) still to be parsed.
+RawSpec = Union[dict, Tuple[int, str]]
+
+RESULT_CSV_COLUMNS = ['order_id', 'error', 'seller_id', 'customer_id', 'transport_id', 'table', 'total_products',
+                      'total_price_before_transport', 'transport_fee', 'total_price', 'total_weight',
+                      'flammable_weight', 'non_flammable_weight', 'commission', 'total_cost']
+
+# ---------------------------
+# Reading Order Specs
+# ---------------------------
+def _parse_bool(value) -> bool:
+    if isinstance(value, bool):
+        return value
+    return str(value).strip().lower() in ('yes', 'true', '1', 'y')
+
+def _read_jsonl_orders(path: str) -> Iterator[Tuple[int, str]]:
+    with open(path, encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            line = line.strip()
+            if line:
+                yield line_number, line
+
+def _read_csv_orders(path: str) -> Iterator[dict]:
+    """Group consecutive CSV rows sharing an order_id into one order spec."""
+    with open(path, newline='', encoding='utf-8') as f:
+        spec = None
+        for row in csv.DictReader(f):
+            if spec is None or row['order_id'] != spec['order_id']:
+                if spec is not None:
+                    yield spec
+                terms = row.get('payment_conditions') or ''
+                spec = {
+                    'order_id': row['order_id'],
+                    'seller_id': row['seller_id'],
+                    'customer_id': row['customer_id'],
+                    'commission_rate': row['commission_rate'],
+                    'table': row['table'],
+                    'payment_conditions': [t for t in terms.split(';') if t.strip()],
+                    'transport_id': row.get('transport_id'),
+                    'sender': row.get('sender', 'no'),
+                    'items': [],
+                }
+            spec['items'].append({'code': row['code'], 'quantity': row['quantity'], 'discount': row.get('discount') or 0})
+        if spec is not None:
+            yield spec
+
+def read_orders(path: str) -> Iterator[RawSpec]:
+    """
+    Stream order specs from a .jsonl or .csv file. JSONL lines come unparsed, so a
+    malformed line becomes an error record in process_orders instead of ending the run.
+    """
+    if path.endswith('.csv'):
+        return _read_csv_orders(path)
+    return _read_jsonl_orders(path)
+
+# ---------------------------
+# Processing
+# ---------------------------
+def _get_participants(spec: dict):
+    """Resolve and check seller, customer and transport the same way the interactive prompts do."""
+    seller = seller_dict.get(int(spec['seller_id']))
+    if seller is None:
+        raise ValueError(f"Invalid seller ID: {spec['seller_id']}.")
+    if seller.block:
+        raise ValueError(f"Seller {seller.customer_id} is no longer at the company.")
+
+    customer = customer_dict.get(int(spec['customer_id']))
+    if customer is None:
+        raise ValueError(f"Invalid customer ID: {spec['customer_id']}.")
+    if customer.block:
+        raise ValueError(f"Customer {customer.customer_id} is blocked due to lack of payment.")
+    if customer.seller_id != seller.customer_id:
+        raise ValueError(f"Customer ID {customer.customer_id} is not registered to Seller ID {seller.customer_id}.")
+
+    transport_id = spec.get('transport_id')
+    if transport_id in (None, ''):
+        raise ValueError("Transport ID cannot be empty.")
+    transport = transport_dict.get(int(transport_id))
+    if transport is None:
+        raise ValueError(f"Invalid Transport ID: {transport_id}.")
+    return seller, customer, transport
+
+def _parse_spec(raw: RawSpec) -> dict:
+    if isinstance(raw, dict):
+        return raw
+    line_number, text = raw
+    try:
+        return parse_record(text)
+    except ValueError as exc:
+        raise ValueError(f"line {line_number}: {exc}") from None
+
+def _parse_quantity(value) -> int:
+    """A whole-number quantity; 4.7, "4.5" or true are rejected, as at the interactive prompt."""
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if isinstance(value, (int, str)) and not isinstance(value, bool):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    raise ValueError(f"Quantity must be a whole number, got {value!r}.")
+
+def process_order(spec: dict) -> dict:
+    """Price a single order spec. Raises ValueError if the spec is invalid."""
+    seller, customer, transport = _get_participants(spec)
+    items = {}
+    for item in spec.get('items', []):
+        code = str(item['code']).strip()
+        if code in items:
+            raise ValueError(f"Product {code} appears more than once in the order.")
+        items[code] = (_parse_quantity(item['quantity']), float(item.get('discount', 0)))
+    result = price_order(
+        customer,
+        seller,
+        float(spec['commission_rate']),
+        str(spec['table']),
+        [int(days) for days in spec.get('payment_conditions', [])],
+        items,
+        transport=transport,
+        sender=_parse_bool(spec.get('sender', False)),
+    )
+    return {'order_id': spec.get('order_id'), **result}
+
+def process_orders(specs: Iterable[RawSpec]) -> Iterator[dict]:
+    """
+    Price each spec in turn. Invalid orders, and JSONL lines that are not a JSON object,
+    yield an {'order_id', 'error'} record instead of stopping the run.
+    """
+    for raw in specs:
+        spec = None
+        try:
+            spec = _parse_spec(raw)
+            result = process_order(spec)
+        except (KeyError, TypeError, ValueError) as exc:
+            result = {'order_id': spec.get('order_id') if spec is not None else None, 'error': str(exc)}
+        yield result
+
+def _process_chunk(specs: List[RawSpec]) -> List[dict]:
+    return list(process_orders(specs))
+
+def _chunks(specs: Iterable[RawSpec], size: int) -> Iterator[List[RawSpec]]:
+    specs = iter(specs)
+    while True:
+        chunk = list(islice(specs, size))
+        if not chunk:
+            return
+        yield chunk
+
+def process_orders_parallel(specs: Iterable[RawSpec], workers: Optional[int] = None, chunksize: int = 256) -> Iterator[dict]:
+    """
+    Price specs across a pool of worker processes, chunksize orders per task.
+    Results come back in input order, and at most two chunks per worker are in
+    flight, so the input can be streamed. Commissions accumulate on the workers'
+    copies of the sellers; use the 'commission' field of each result instead.
+    """
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in _chunks(specs, chunksize):
+            pending.append(pool.submit(_process_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def store_results(results: Iterable[dict], store: OrderStore, batch_size: int = 1000) -> Iterator[dict]:
+    """Pass results through, saving priced orders to the store one transaction per batch_size orders."""
+    pending = []
+    for result in results:
+        if 'error' not in result:
+            pending.append(result)
+            if len(pending) >= batch_size:
+                store.add_orders(pending)
+                pending = []
+        yield result
+    if pending:
+        store.add_orders(pending)
+
+# ---------------------------
+# Writing Results
+# ---------------------------
+LINE_COLUMNS = ['Order'] + ORDER_SUMMARY_COLUMNS
+DATAFRAME_EXTENSIONS = ('.pkl', '.pickle')
+
+def _line_rows(result: dict) -> Iterator[dict]:
+    for line in result.get('lines', ()):
+        yield {'Order': result['order_id'], **order_summary_row(line['code'], line)}
+
+def write_lines(results: Iterable[dict], out, fmt: str = 'text') -> Iterator[dict]:
+    """
+    Pass results through, writing each priced order's Order Summary rows to out as it
+    goes by. Text columns are sized from the catalog, since the rows can't be measured
+    ahead of time.
+    """
+    widths = dict(ORDER_SUMMARY_COL_SPACE)
+    widths['Product name'] = max([widths['Product name']] + [len(product_name(p)) for p in products.values()])
+    writer = TableWriter(out, fmt, LINE_COLUMNS, widths)
+    for result in results:
+        for row in _line_rows(result):
+            writer.write_row(row)
+        yield result
+
+def collect_lines(results: Iterable[dict], rows: List[dict]) -> Iterator[dict]:
+    """Pass results through, appending each priced order's Order Summary rows to rows."""
+    for result in results:
+        rows.extend(_line_rows(result))
+        yield result
+
+def write_lines_dataframe(rows: List[dict], path: str) -> None:
+    """Pickle the collected line rows as a pandas DataFrame (pandas is imported only here)."""
+    to_dataframe(rows, LINE_COLUMNS).to_pickle(path)
+
+def write_results(results: Iterable[dict], out, fmt: str = 'jsonl') -> Dict[str, int]:
+    """Write results as they are produced. Returns counts of priced and failed orders."""
+    counts = {'priced': 0, 'failed': 0}
+    if fmt == 'csv':
+        writer = csv.DictWriter(out, fieldnames=RESULT_CSV_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+    for result in results:
+        counts['failed' if 'error' in result else 'priced'] += 1
+        if fmt == 'csv':
+            writer.writerow(result)
+        else:
+            out.write(json.dumps(result) + '\n')
+    return counts
+
+def run_batch(input_path: str, output_path: Optional[str] = None, workers: int = 1, chunksize: int = 256,
+              store: Optional[OrderStore] = None, lines_out=None, lines_format: str = 'text',
+              lines_rows: Optional[List[dict]] = None) -> Dict[str, int]:
+    """
+    Price every order in input_path and write the results to output_path (stdout if
+    None). Priced orders are also saved to store, their lines written to lines_out and
+    collected into lines_rows, if given.
+    """
+    fmt = 'csv' if output_path and output_path.endswith('.csv') else 'jsonl'
+    if workers == 1:
+        results = process_orders(read_orders(input_path))
+    else:
+        results = process_orders_parallel(read_orders(input_path), workers, chunksize)
+    if store is not None:
+        results = store_results(results, store)
+    if lines_out is not None:
+        results = write_lines(results, lines_out, lines_format)
+    if lines_rows is not None:
+        results = collect_lines(results, lines_rows)
+    if output_path is None:
+        return write_results(results, sys.stdout, fmt)
+    with open(output_path, 'w', newline='', encoding='utf-8') as out:
+        return write_results(results, out, fmt)
+
+def profile_call(path: str, fn, *args, **kwargs):
+    """Run fn under cProfile, dump the stats to path and print the top functions to stderr."""
+    profiler = cProfile.Profile()
+    try:
+        return profiler.runcall(fn, *args, **kwargs)
+    finally:
+        profiler.dump_stats(path)
+        stats = pstats.Stats(profiler, stream=sys.stderr)
+        stats.sort_stats('cumulative').print_stats(PROFILE_REPORT_LINES)
+
+PROFILE_REPORT_LINES = 25
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Price a file of orders without the interactive prompts.")
+    parser.add_argument('input', help="order specs, .jsonl or .csv")
+    parser.add_argument('-o', '--output', help="where to write priced orders (.jsonl or .csv); stdout if omitted")
+    parser.add_argument('-w', '--workers', type=int, default=1,
+                        help="worker processes to shard orders across (0 = one per CPU)")
+    parser.add_argument('--chunksize', type=int, default=256, help="orders per worker task")
+    parser.add_argument('--store', help="SQLite order store to save priced orders to")
+    parser.add_argument('--lines', help="also write every priced line to this file (.csv, .jsonl or text; "
+                                        ".pkl for a pickled pandas DataFrame)")
+    parser.add_argument('--metrics', help="time the hot paths and write the metrics here (.json or Prometheus text); "
+                                          "only the main process is measured, so use with --workers 1")
+    parser.add_argument('--profile', help="run under cProfile, dump the stats to this file and print a report")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        _main.enable_instrumentation()
+        instrument(sys.modules[__name__], {'process_order': 'process_order'})
+
+    store = OrderStore(args.store) if args.store else None
+    lines_frame = bool(args.lines) and args.lines.endswith(DATAFRAME_EXTENSIONS)
+    lines_rows = [] if lines_frame else None
+    lines_out = open(args.lines, 'w', newline='', encoding='utf-8') if args.lines and not lines_frame else None
+    run_args = (args.input, args.output)
+    run_kwargs = dict(workers=args.workers or None, chunksize=args.chunksize, store=store, lines_out=lines_out,
+                      lines_format=format_for_path(args.lines) if lines_out else 'text', lines_rows=lines_rows)
+    try:
+        if args.profile:
+            counts = profile_call(args.profile, run_batch, *run_args, **run_kwargs)
+        else:
+            counts = run_batch(*run_args, **run_kwargs)
+    finally:
+        if store is not None:
+            store.close()
+        if lines_out is not None:
+            lines_out.close()
+    if lines_rows is not None:
+        write_lines_dataframe(lines_rows, args.lines)
+    if args.metrics:
+        metrics.incr('orders_priced', counts['priced'])
+        metrics.incr('orders_failed', counts['failed'])
+        metrics.write(args.metrics)
+    print(f"Priced {counts['priced']} orders, {counts['failed']} failed.", file=sys.stderr)
+    return 1 if counts['failed'] else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
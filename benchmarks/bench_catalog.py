@@ -0,0 +1,85 @@
+"""
+Startup-time benchmark for the product catalog build.
+
+Compares the old quadratic duplicate check, build_catalog, and loading a
+precomputed catalog file, over synthetic price tables.
+
+    python benchmarks/bench_catalog.py [--sizes 10000 100000 1000000] [--quadratic-limit 10000]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+TABLES = ["711", "411"]
+LOCATIONS = ["goiania", "pernambuco", "bahia", "para", "ceara"]
+WEIGHTS = [500, 1000, 2000, 3600, 18000]
+
+def synthetic_price_keys(n_entries):
+    """Price keys shaped like PRICE_TABLES: every product is priced in every table and location."""
+    n_products = max(1, n_entries // (len(TABLES) * len(LOCATIONS)))
+    keys = []
+    for _ in TABLES:
+        for i in range(n_products):
+            color = f"color{i // len(WEIGHTS)}"
+            weight = WEIGHTS[i % len(WEIGHTS)]
+            for location in LOCATIONS:
+                keys.append(("Acrilico premium", "fosco", color, weight, location))
+    return keys
+
+def quadratic_catalog(price_keys):
+    """The original import-time loop, kept for comparison."""
+    code_counter = 100
+    products = {}
+    for category, finish, color, weight, _ in price_keys:
+        product_cost = (weight / 500.0) * main.BASE_COST_PER_500ML
+        if (category, finish, color, weight) not in [(p.category, p.finish, p.color, p.weight) for p in products.values()]:
+            code = f"P{code_counter}"
+            flammable = color in ["black", "green"]
+            products[code_counter] = main.Product(category, finish, color, weight, code, flammable, cost=product_cost)
+            code_counter += 1
+    return products
+
+def _timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def run(sizes, quadratic_limit):
+    results = []
+    for n_entries in sizes:
+        keys = synthetic_price_keys(n_entries)
+        catalog, build_s = _timed(main.build_catalog, keys)
+        row = {'entries': len(keys), 'products': len(catalog), 'build_s': build_s, 'quadratic_s': None}
+
+        if n_entries <= quadratic_limit:
+            old_catalog, row['quadratic_s'] = _timed(quadratic_catalog, keys)
+            assert old_catalog == catalog, "build_catalog must assign the same codes as the old loop"
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'catalog.json')
+            main.save_catalog(catalog, path)
+            loaded, row['load_s'] = _timed(main.load_catalog, path)
+            assert loaded == catalog
+        results.append(row)
+    return results
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000, 1_000_000])
+    parser.add_argument('--quadratic-limit', type=int, default=10_000,
+                        help="only time the old loop up to this many entries")
+    args = parser.parse_args(argv)
+
+    print(f"{'entries':>9} {'products':>9} {'quadratic s':>12} {'build s':>9} {'load s':>8}")
+    for r in run(args.sizes, args.quadratic_limit):
+        quadratic = f"{r['quadratic_s']:.3f}" if r['quadratic_s'] is not None else "skipped"
+        print(f"{r['entries']:>9} {r['products']:>9} {quadratic:>12} {r['build_s']:>9.3f} {r['load_s']:>8.3f}")
+
+if __name__ == "__main__":
+    main_cli()
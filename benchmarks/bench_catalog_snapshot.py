@@ -0,0 +1,65 @@
+"""
+Startup time with and without a compiled catalog snapshot.
+
+For each catalog size a pricing config with that many colors is written, compiled
+with compile_catalog.py, and `import main` is timed in fresh interpreters, once
+rebuilding everything and once memory-mapping the snapshot. Times are measured
+inside the child, so interpreter startup is not included.
+
+    python benchmarks/bench_catalog_snapshot.py [--colors 3 300 3000] [--runs 5]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from dataclasses import replace
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from pricing_config import DEFAULT_PRICING, pricing_config_from_dict, save_pricing_config  # noqa: E402
+
+IMPORT_MAIN = ("import time; start = time.perf_counter(); import main; "
+               "print(time.perf_counter() - start, len(main.products), main.compiled_catalog is not None)")
+
+def import_seconds(env, runs):
+    timings = []
+    for _ in range(runs):
+        out = subprocess.run([sys.executable, '-c', IMPORT_MAIN], cwd=ROOT, env=env, capture_output=True,
+                             text=True, check=True).stdout.split()
+        timings.append(float(out[0]))
+    return statistics.median(timings), int(out[1]), out[2] == 'True'
+
+def run(n_colors, runs, tmp):
+    base = pricing_config_from_dict(DEFAULT_PRICING)
+    colors = base.colors + [f"color{i}" for i in range(len(base.colors), n_colors)]
+    config_path = os.path.join(tmp, f"pricing-{n_colors}.json")
+    save_pricing_config(replace(base, colors=colors[:n_colors]), config_path)
+    snapshot_path = os.path.join(tmp, f"catalog-{n_colors}")
+
+    env = dict(os.environ, SALES_PRICING_CONFIG=config_path, SALES_PRICING_MODE='eager')
+    env.pop('SALES_CATALOG_SNAPSHOT', None)
+    subprocess.run([sys.executable, 'compile_catalog.py', snapshot_path], cwd=ROOT, env=env, check=True,
+                   capture_output=True)
+    rebuild_s, n_products, _ = import_seconds(env, runs)
+    mapped_s, _, used = import_seconds(dict(env, SALES_CATALOG_SNAPSHOT=snapshot_path), runs)
+    if not used:
+        raise RuntimeError(f"snapshot for {n_colors} colors was not used")
+    return {'colors': n_colors, 'products': n_products, 'rebuild_ms': rebuild_s * 1e3, 'mapped_ms': mapped_s * 1e3}
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--colors', type=int, nargs='+', default=[3, 300, 3000])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args(argv)
+
+    print(f"{'colors':>6} {'products':>9} {'rebuild ms':>11} {'mmap ms':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_colors in args.colors:
+            r = run(n_colors, args.runs, tmp)
+            print(f"{r['colors']:>6} {r['products']:>9} {r['rebuild_ms']:>11.1f} {r['mapped_ms']:>8.1f}")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,92 @@
+"""
+Bytes per entity for Customer, Seller, Transport and Product, before and after __slots__.
+
+The "before" classes are copies of the previous plain-__dict__ definitions.
+
+    python benchmarks/bench_entities.py [--count 100000]
+"""
+import argparse
+import os
+import sys
+import tracemalloc
+from dataclasses import dataclass
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+
+# ---------------------------
+# Previous (unslotted) definitions
+# ---------------------------
+class DictCustomer:
+    def __init__(self, customer_id, name, address, email, phone, seller_id, block=False):
+        self.customer_id = customer_id
+        self.name = name
+        self.address = address
+        self.email = email
+        self.phone = phone
+        self.seller_id = seller_id
+        self.block = block
+        self._order_history = []
+
+class DictSeller(DictCustomer):
+    def __init__(self, customer_id, name, address, email, phone, block=False):
+        super().__init__(customer_id, name, address, email, phone, None, block)
+        self._total_commission = 0.0
+        self._sales_history = []
+
+class DictTransport(DictCustomer):
+    def __init__(self, customer_id, name, address, email, phone, block=False, cost=0.0):
+        super().__init__(customer_id, name, address, email, phone, None, block)
+        self.cost = cost
+        self.sender = False
+
+@dataclass
+class DictProduct:
+    category: str
+    finish: str
+    color: str
+    weight: int
+    code: str
+    flammable: bool = False
+    cost: float = 0.0
+
+# The field values are shared between both runs, so only the objects themselves are measured.
+NAME, ADDRESS, EMAIL, PHONE = "Customer", "goiania", "customer@example.com", "123-456-7890"
+CATEGORY, FINISH, COLOR, CODE = "Acrilico premium", "fosco", "black", "P100"
+
+FACTORIES = {
+    'Customer': (lambda cls, i: cls(i, NAME, ADDRESS, EMAIL, PHONE, 4, False), DictCustomer, main.Customer),
+    'Seller': (lambda cls, i: cls(i, NAME, ADDRESS, EMAIL, PHONE, False), DictSeller, main.Seller),
+    'Transport': (lambda cls, i: cls(i, NAME, ADDRESS, EMAIL, PHONE, False, cost=2.5), DictTransport, main.Transport),
+    'Product': (lambda cls, i: cls(CATEGORY, FINISH, COLOR, 500, CODE, True, cost=2.0), DictProduct, main.Product),
+}
+
+def bytes_per_entity(factory, cls, count):
+    ids = list(range(count))  # created up front so the ids are not charged to the entities
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    entities = [factory(cls, i) for i in ids]
+    after, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (after - before - sys.getsizeof(entities)) / count
+
+def run(count):
+    results = []
+    for name, (factory, old_cls, new_cls) in FACTORIES.items():
+        old = bytes_per_entity(factory, old_cls, count)
+        new = bytes_per_entity(factory, new_cls, count)
+        results.append({'entity': name, 'before_bytes': old, 'after_bytes': new, 'saving': 1 - new / old})
+    return results
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--count', type=int, default=100_000)
+    args = parser.parse_args(argv)
+
+    print(f"{'entity':>10} {'before B':>9} {'after B':>8} {'saving':>7}")
+    for r in run(args.count):
+        print(f"{r['entity']:>10} {r['before_bytes']:>9.0f} {r['after_bytes']:>8.0f} {r['saving']:>7.0%}")
+
+if __name__ == "__main__":
+    main_cli()
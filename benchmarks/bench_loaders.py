@@ -0,0 +1,67 @@
+"""
+Load-time benchmark for bulk customer files (CSV and JSONL).
+
+    python benchmarks/bench_loaders.py [--customers 10000 50000 100000] [--chunk-size 10000]
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from search_index import TextIndex  # noqa: E402
+from synthetic import synthetic_customers  # noqa: E402
+
+FIELDS = ['customer_id', 'name', 'address', 'email', 'phone', 'seller_id', 'block']
+
+def write_files(directory, n):
+    csv_path = os.path.join(directory, 'customers.csv')
+    jsonl_path = os.path.join(directory, 'customers.jsonl')
+    with open(csv_path, 'w', newline='') as csv_file, open(jsonl_path, 'w') as jsonl_file:
+        writer = csv.DictWriter(csv_file, fieldnames=FIELDS)
+        writer.writeheader()
+        for record in synthetic_customers(n):
+            writer.writerow(record)
+            jsonl_file.write(json.dumps(record) + '\n')
+    return csv_path, jsonl_path
+
+def _reset():
+    main.customer_dict.clear()
+    for field in main.SEARCH_FIELDS:
+        main.search_indexes[("customer", field)] = TextIndex()
+
+def run(sizes, chunk_size):
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for n in sizes:
+            for path in write_files(tmp, n):
+                _reset()
+                tracemalloc.start()
+                start = time.perf_counter()
+                report = main.load_customers(path, chunk_size=chunk_size)
+                elapsed = time.perf_counter() - start
+                _, peak = tracemalloc.get_traced_memory()
+                tracemalloc.stop()
+                assert report.loaded == n
+                results.append({'customers': n, 'format': os.path.splitext(path)[1][1:], 'seconds': elapsed,
+                                'per_second': n / elapsed, 'peak_mb': peak / 1e6})
+    return results
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--customers', type=int, nargs='+', default=[10_000, 50_000, 100_000])
+    parser.add_argument('--chunk-size', type=int, default=main.LOAD_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    print(f"{'customers':>10} {'format':>7} {'seconds':>8} {'per second':>11} {'peak MB':>8}")
+    for r in run(args.customers, args.chunk_size):
+        print(f"{r['customers']:>10} {r['format']:>7} {r['seconds']:>8.2f} {r['per_second']:>11.0f} {r['peak_mb']:>8.1f}")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,132 @@
+"""
+Float vs integer-cents money: speed of line pricing and the drift the floats leave.
+
+Prices the same random lines with the previous float formulas and with the cents
+arithmetic (main._price_line_cents, columnar.price_lines_cents), one line at a
+time and as a vectorized batch. Drift is the running float sum of line totals
+minus the exact sum of the same values, plus the share of orders whose displayed
+installments did not add up to the displayed total.
+
+    python benchmarks/bench_money.py [--lines 200000] [--seed 42]
+"""
+import argparse
+import math
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import columnar  # noqa: E402
+import main  # noqa: E402
+from money import apply_rate_array, discounted_array, percent_to_rate_array, split  # noqa: E402
+
+DISCOUNTS = [0, 0, 0, 5, 7.5, 10, 12.5, 15]
+
+def synthetic_lines(n, seed):
+    rng = random.Random(seed)
+    codes = list(main.products)
+    keys = [rng.choice(codes) for _ in range(n)]
+    products = [main.products[key] for key in keys]
+    quantities = [4 * rng.randrange(1, 25) if p.weight == 500 else rng.randrange(1, 40) for p in products]
+    discounts = [rng.choice(DISCOUNTS) for _ in range(n)]
+    tables = [rng.choice(list(main.TABLES)) for _ in range(n)]
+    locations = [rng.choice(main.LOCATIONS) for _ in range(n)]
+    return keys, products, quantities, discounts, tables, locations
+
+def float_line_total(product, quantity, discount, table, location):
+    """The previous float arithmetic of main._price_line, line total only."""
+    base_price = main.get_price(table, product, location)
+    discounted_price = base_price - (base_price * discount / 100)
+    tax_amount_per_item = discounted_price * main.TAX_RATES.get(location, 0) if product.flammable else 0
+    return discounted_price * quantity + tax_amount_per_item * quantity
+
+def _indexes(arrays, codes, tables, locations):
+    product_idx = np.searchsorted(arrays.codes, codes)
+    table_idx = np.array([arrays.tables[table] for table in tables])
+    location_idx = np.array([arrays.locations[location] for location in locations])
+    return product_idx, table_idx, location_idx
+
+def float_line_totals(arrays, float_prices, float_tax_rates, indexes, quantities, discounts):
+    """The previous float arithmetic of columnar.price_lines, line total only."""
+    product_idx, table_idx, location_idx = indexes
+    base_price = float_prices[table_idx, product_idx, location_idx]
+    discounted_price = base_price - (base_price * discounts / 100)
+    tax = np.where(arrays.flammable[product_idx], discounted_price * float_tax_rates[location_idx], 0.0)
+    return discounted_price * quantities + tax * quantities
+
+def cents_line_totals(arrays, indexes, quantities, discounts):
+    """The cents arithmetic of columnar.price_lines_cents, line total only."""
+    product_idx, table_idx, location_idx = indexes
+    base_price = arrays.prices[table_idx, product_idx, location_idx]
+    discounted_price = discounted_array(base_price, percent_to_rate_array(discounts))
+    tax = np.where(arrays.flammable[product_idx], apply_rate_array(discounted_price, arrays.tax_rates[location_idx]), 0)
+    return discounted_price * quantities + tax * quantities
+
+def _timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+def run(n, seed):
+    keys, products, quantities, discounts, tables, locations = synthetic_lines(n, seed)
+    lines = list(zip(products, quantities, discounts, tables, locations))
+    codes = np.array(keys, dtype=np.int64)
+    q, d = np.array(quantities), np.array(discounts, dtype=np.float64)
+    arrays = columnar.build_catalog_arrays()
+
+    float_totals, float_scalar = _timed(lambda: [float_line_total(*line) for line in lines])
+    cents_totals, cents_scalar = _timed(lambda: [main._price_line_cents(*line)['line_total_with_tax'] for line in lines])
+    indexes = _indexes(arrays, codes, tables, locations)
+    float_prices = main.PRICE_TABLES.product_prices([main.products[int(code)] for code in arrays.codes])
+    float_tax_rates = np.array([main.TAX_RATES.get(location, 0) for location in arrays.locations], dtype=np.float64)
+    _, float_vector = _timed(lambda: float_line_totals(arrays, float_prices, float_tax_rates, indexes, q, d))
+    cents_vector_totals, cents_vector = _timed(lambda: cents_line_totals(arrays, indexes, q, d))
+    assert cents_vector_totals.tolist() == cents_totals
+    priced, full_batch = _timed(lambda: columnar.price_lines_cents(codes, q, d, tables, locations, arrays=arrays))
+    assert priced['line_total_with_tax'].tolist() == cents_totals
+
+    # installments: orders of 1-5 lines, 1-6 installments
+    rng = random.Random(seed)
+    orders = mismatched = 0
+    start = 0
+    while start < n:
+        size = rng.randrange(1, 6)
+        parts = rng.randrange(1, 7)
+        float_total = sum(float_totals[start:start + size])
+        shown = round(float_total / parts, 2) * parts
+        mismatched += round(shown, 2) != round(float_total, 2)
+        assert sum(split(sum(cents_totals[start:start + size]), parts)) == sum(cents_totals[start:start + size])
+        orders += 1
+        start += size
+
+    return {
+        'lines': n,
+        'scalar_float_us': float_scalar / n * 1e6,
+        'scalar_cents_us': cents_scalar / n * 1e6,
+        'vector_float_ms': float_vector * 1e3,
+        'vector_cents_ms': cents_vector * 1e3,
+        'full_batch_ms': full_batch * 1e3,
+        'sum_drift': sum(float_totals) - math.fsum(float_totals),
+        'installment_mismatch': mismatched / orders,
+    }
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=200_000)
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args(argv)
+
+    r = run(args.lines, args.seed)
+    print(f"{r['lines']} lines")
+    print(f"  one line at a time: float {r['scalar_float_us']:.2f} us/line, cents {r['scalar_cents_us']:.2f} us/line")
+    print(f"  vectorized batch:   float {r['vector_float_ms']:.1f} ms, cents {r['vector_cents_ms']:.1f} ms")
+    print(f"  columnar.price_lines_cents incl. validation and label encoding: {r['full_batch_ms']:.1f} ms")
+    print(f"  running float sum - exact sum of line totals: {r['sum_drift']:+.2e} (cents: 0)")
+    print(f"  orders whose float installments did not add up: {r['installment_mismatch']:.1%} (cents: 0%)")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,49 @@
+"""
+Throughput scaling of batch repricing from 1 to N worker processes.
+
+    python benchmarks/bench_parallel.py [--orders 20000] [--max-workers 8] [--chunksize 256]
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch  # noqa: E402
+from synthetic import synthetic_orders  # noqa: E402
+
+def run(n_orders, max_workers, chunksize):
+    orders = synthetic_orders(n_orders)
+    start = time.perf_counter()
+    expected = list(batch.process_orders(orders))
+    serial_s = time.perf_counter() - start
+    results = [{'workers': 0, 'seconds': serial_s, 'orders_per_s': n_orders / serial_s}]
+
+    workers = 1
+    while workers <= max_workers:
+        start = time.perf_counter()
+        priced = list(batch.process_orders_parallel(orders, workers, chunksize))
+        elapsed = time.perf_counter() - start
+        assert [r['order_id'] for r in priced] == [r['order_id'] for r in expected]
+        assert [r['total_price'] for r in priced] == [r['total_price'] for r in expected]
+        results.append({'workers': workers, 'seconds': elapsed, 'orders_per_s': n_orders / elapsed})
+        workers *= 2
+    return results
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=20_000)
+    parser.add_argument('--max-workers', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--chunksize', type=int, default=256)
+    args = parser.parse_args(argv)
+
+    results = run(args.orders, args.max_workers, args.chunksize)
+    serial = results[0]['orders_per_s']
+    print(f"{'workers':>8} {'seconds':>8} {'orders/s':>10} {'speedup':>8}")
+    for r in results:
+        label = 'serial' if r['workers'] == 0 else r['workers']
+        print(f"{label:>8} {r['seconds']:>8.2f} {r['orders_per_s']:>10.0f} {r['orders_per_s'] / serial:>8.2f}")
+
+if __name__ == "__main__":
+    main_cli()
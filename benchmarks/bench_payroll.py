@@ -0,0 +1,97 @@
+"""
+Commission payroll: per-order Python grouping vs the chunked NumPy pass, and a
+full run from the order store with and without a checkpoint.
+
+Synthetic priced orders (seller, date, commission base, commission as priced)
+spread over a month are grouped by (seller, day) both ways, with per-seller
+rates for half the sellers, and the totals are checked to be identical. The
+store run writes the same orders to a temporary OrderStore first.
+
+    python benchmarks/bench_payroll.py [--orders 1000000] [--sellers 200] [--store-orders 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import payroll  # noqa: E402
+from money import apply_rate, percent_to_rate, to_cents  # noqa: E402
+from order_store import OrderStore  # noqa: E402
+
+def synthetic_rows(n, n_sellers, seed=42):
+    """(ISO date, seller_id, commission base, commission) rows for October 2026."""
+    rng = random.Random(seed)
+    rows = []
+    for _ in range(n):
+        base = round(rng.uniform(20, 5000), 2)
+        rows.append((f"2026-10-{rng.randint(1, 31):02d}T{rng.randint(8, 19):02d}:{rng.randint(0, 59):02d}:00",
+                     rng.randrange(n_sellers), base, round(base * rng.choice((0.03, 0.05, 0.07)), 2)))
+    return rows
+
+def python_grouping(rows, rates):
+    totals = defaultdict(lambda: [0, 0, 0])
+    for when, seller_id, base, commission in rows:
+        base_cents = to_cents(base)
+        if seller_id in rates:
+            paid = apply_rate(base_cents, percent_to_rate(rates[seller_id]))
+        else:
+            paid = to_cents(commission)
+        group = totals[(seller_id, when[:10])]
+        group[0] += 1
+        group[1] += base_cents
+        group[2] += paid
+    return totals
+
+def numpy_grouping(rows, rates, chunk_size):
+    result = payroll.Payroll(rates=rates)
+    for i in range(0, len(rows), chunk_size):
+        result.add(payroll.commission_columns(rows[i:i + chunk_size]))
+    return result.totals
+
+def store_runs(rows, rates, chunk_size):
+    with tempfile.TemporaryDirectory() as tmp:
+        with OrderStore(os.path.join(tmp, "orders.db")) as store:
+            store.add_orders({'date': when, 'customer_id': 0, 'seller_id': seller_id, 'total_price': base,
+                              'total_price_before_transport': base, 'commission': commission}
+                             for when, seller_id, base, commission in rows)
+            timings = {}
+            for label, checkpoint in (('store', None), ('store + checkpoint', os.path.join(tmp, "payroll.ckpt"))):
+                start = time.perf_counter()
+                result = payroll.run_payroll(store, "2026-10-01", "2026-11-01", rates, chunk_size=chunk_size,
+                                             checkpoint=checkpoint)
+                timings[label] = (time.perf_counter() - start, result.orders_read)
+            return timings
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=1_000_000)
+    parser.add_argument('--sellers', type=int, default=200)
+    parser.add_argument('--chunk-size', type=int, default=payroll.PAYROLL_CHUNK_SIZE)
+    parser.add_argument('--store-orders', type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    rows = synthetic_rows(args.orders, args.sellers)
+    rates = {seller_id: 4 + seller_id % 5 * 0.5 for seller_id in range(0, args.sellers, 2)}
+
+    start = time.perf_counter()
+    expected = python_grouping(rows, rates)
+    python_s = time.perf_counter() - start
+    start = time.perf_counter()
+    totals = numpy_grouping(rows, rates, args.chunk_size)
+    numpy_s = time.perf_counter() - start
+    if totals != dict(expected):
+        raise SystemExit("grouped totals differ")
+
+    print(f"{args.orders} orders, {args.sellers} sellers, {len(totals)} (seller, day) groups")
+    print(f"  python loop       {python_s * 1e3:9.1f} ms")
+    print(f"  numpy chunks      {numpy_s * 1e3:9.1f} ms  ({python_s / numpy_s:.1f}x)")
+    for label, (seconds, n) in store_runs(rows[:args.store_orders], rates, args.chunk_size).items():
+        print(f"  {label:<17} {seconds * 1e3:9.1f} ms  ({n} orders, {n / seconds:,.0f}/s)")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,110 @@
+"""
+Memory and lookup benchmark: tuple-keyed dict PRICE_TABLES vs PriceMatrix.
+
+    python benchmarks/bench_price_matrix.py [--colors 3 30 300] [--lookups 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from price_matrix import PriceMatrix  # noqa: E402
+
+TABLES = {"711": 1.0, "411": 0.9}
+CATEGORIES = ["Acrilico premium", "Esmalte", "Latex"]
+FINISHES = ["fosco", "semibrilho", "brilho"]
+WEIGHTS = {500: 1.0, 1000: 1.5, 2000: 2.0, 3600: 3.2, 18000: 14.0}
+LOCATIONS = {"goiania": 4.0, "pernambuco": 4.5, "bahia": 5.0, "para": 5.2, "ceara": 4.8}
+
+def _dimensions(n_colors):
+    return list(TABLES), CATEGORIES, FINISHES, [f"color{i}" for i in range(n_colors)], list(WEIGHTS), list(LOCATIONS)
+
+def build_dict(n_colors):
+    tables, categories, finishes, colors, weights, locations = _dimensions(n_colors)
+    price_tables = {table: {} for table in tables}
+    for table in tables:
+        for category in categories:
+            for finish in finishes:
+                for color in colors:
+                    for weight in weights:
+                        for location in locations:
+                            price_tables[table][(category, finish, color, weight, location)] = \
+                                WEIGHTS[weight] * LOCATIONS[location] * TABLES[table]
+    return price_tables
+
+def build_matrix(n_colors):
+    tables, categories, finishes, colors, weights, locations = _dimensions(n_colors)
+    matrix = PriceMatrix(tables, categories, finishes, colors, weights, locations)
+    for table in tables:
+        view = matrix[table]
+        for category in categories:
+            for finish in finishes:
+                for color in colors:
+                    for weight in weights:
+                        for location in locations:
+                            view[(category, finish, color, weight, location)] = \
+                                WEIGHTS[weight] * LOCATIONS[location] * TABLES[table]
+    return matrix
+
+def _measure_build(build, n_colors):
+    tracemalloc.start()
+    start = time.perf_counter()
+    store = build(n_colors)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return store, current, elapsed
+
+def _sample_keys(n_colors, n):
+    tables, categories, finishes, colors, weights, locations = _dimensions(n_colors)
+    rng = random.Random(42)
+    return [(rng.choice(tables), rng.choice(categories), rng.choice(finishes), rng.choice(colors),
+             rng.choice(weights), rng.choice(locations)) for _ in range(n)]
+
+def run(color_counts, n_lookups):
+    results = []
+    for n_colors in color_counts:
+        price_tables, dict_bytes, dict_build = _measure_build(build_dict, n_colors)
+        matrix, matrix_bytes, matrix_build = _measure_build(build_matrix, n_colors)
+        keys = _sample_keys(n_colors, n_lookups)
+
+        start = time.perf_counter()
+        for table, category, finish, color, weight, location in keys:
+            price_tables.get(table, {}).get((category, finish, color, weight, location), None)
+        dict_lookup = (time.perf_counter() - start) / n_lookups
+
+        lookup = matrix.lookup
+        start = time.perf_counter()
+        for key in keys:
+            lookup(*key)
+        matrix_lookup = (time.perf_counter() - start) / n_lookups
+
+        results.append({
+            'colors': n_colors,
+            'prices': sum(len(t) for t in price_tables.values()),
+            'dict_bytes': dict_bytes,
+            'matrix_bytes': matrix_bytes,
+            'dict_build_s': dict_build,
+            'matrix_build_s': matrix_build,
+            'dict_lookup_ns': dict_lookup * 1e9,
+            'matrix_lookup_ns': matrix_lookup * 1e9,
+        })
+    return results
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--colors', type=int, nargs='+', default=[3, 30, 300])
+    parser.add_argument('--lookups', type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    print(f"{'colors':>7} {'prices':>9} {'dict MB':>9} {'matrix MB':>10} {'dict ns':>8} {'matrix ns':>10}")
+    for r in run(args.colors, args.lookups):
+        print(f"{r['colors']:>7} {r['prices']:>9} {r['dict_bytes'] / 1e6:>9.2f} {r['matrix_bytes'] / 1e6:>10.2f} "
+              f"{r['dict_lookup_ns']:>8.0f} {r['matrix_lookup_ns']:>10.0f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Per-line pricing cost with and without the per-(table, location) PricingContext.
+
+"direct" repeats the lookups each line used to do (get_price, TAX_RATES, cost
+and flammable checks); "context" is the Cart path, one entry lookup plus the
+money arithmetic. Also reports how long building one context takes.
+
+    python benchmarks/bench_pricing_context.py [--lines 200000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from money import apply_rate, discounted, percent_to_rate, to_cents, to_rate  # noqa: E402
+
+def direct_line(product, quantity, discount, table, location):
+    """The per-line lookups of _price_line_cents before PricingContext."""
+    base_price = main.get_price(table, product, location)
+    discounted_price = discounted(to_cents(base_price), percent_to_rate(discount))
+    tax_amount_per_item = apply_rate(discounted_price, to_rate(main.TAX_RATES.get(location, 0))) if product.flammable else 0
+    item_total_before_tax = discounted_price * quantity
+    line_tax_amount = tax_amount_per_item * quantity
+    return {
+        'unit_price_before_tax': discounted_price,
+        'unit_price_incl_tax': discounted_price + tax_amount_per_item,
+        'tax_amount_per_item': tax_amount_per_item,
+        'item_total_before_tax': item_total_before_tax,
+        'line_tax_amount': line_tax_amount,
+        'line_total_with_tax': item_total_before_tax + line_tax_amount,
+        'line_cost': to_cents(product.cost) * quantity,
+    }
+
+def run(n, seed=42):
+    rng = random.Random(seed)
+    catalog = list(main.products.values())
+    table, location = main.TABLES[0], main.LOCATIONS[0]
+    lines = [(rng.choice(catalog), 4 * rng.randrange(1, 25), rng.choice([0, 5, 10])) for _ in range(n)]
+
+    start = time.perf_counter()
+    direct = [direct_line(product, quantity, discount, table, location) for product, quantity, discount in lines]
+    direct_s = time.perf_counter() - start
+
+    context = main.get_pricing_context(table, location)
+    start = time.perf_counter()
+    with_context = [main._context_line(context, product, quantity, discount) for product, quantity, discount in lines]
+    context_s = time.perf_counter() - start
+    assert direct == with_context
+
+    start = time.perf_counter()
+    main.build_pricing_context(table, location)
+    build_s = time.perf_counter() - start
+    return {'lines': n, 'direct_us': direct_s / n * 1e6, 'context_us': context_s / n * 1e6,
+            'build_ms': build_s * 1e3, 'products': len(context)}
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--lines', type=int, default=200_000)
+    args = parser.parse_args(argv)
+
+    r = run(args.lines)
+    print(f"{r['lines']} lines: direct {r['direct_us']:.2f} us/line, context {r['context_us']:.2f} us/line")
+    print(f"building a context for {r['products']} products: {r['build_ms']:.2f} ms")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,98 @@
+"""
+Cost of a pricing hot reload, and what it does to order pricing running alongside.
+
+"reload" times main.reload_pricing (read + check the config file, compile the
+rules, fill the price tables, swap the snapshot) at several catalog sizes.
+"latency" opens a cart and prices a few lines over and over, first alone and
+then while another thread reloads every --every seconds, and reports p50/p99.
+
+    python benchmarks/bench_reload.py [--colors 3 30 300] [--every 0.05]
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import main  # noqa: E402
+from pricing_config import save_pricing_config  # noqa: E402
+from synthetic import scaled_catalog  # noqa: E402
+
+def _percentile(samples, p):
+    samples = sorted(samples)
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+def time_reloads(path, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        main.reload_pricing(path)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def order_latencies(lines, n):
+    """Seconds to open a cart and price lines, n times."""
+    customer = next(c for c in main.customer_dict.values() if not c.block)
+    timings = []
+    for _ in range(n):
+        start = time.perf_counter()
+        cart = main.Cart(customer, main.TABLES[0])
+        for code, quantity in lines:
+            cart.add(code, quantity, 5)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def latency_under_reload(path, every, n, seed=42):
+    rng = random.Random(seed)
+    lines = [(str(code), 4 if product.weight == 500 else 1)
+             for code, product in rng.sample(sorted(main.products.items()), min(10, len(main.products)))]
+    quiet = order_latencies(lines, n)
+
+    stop = threading.Event()
+    reloads = []
+
+    def reloader():
+        while not stop.wait(every):
+            reloads.extend(time_reloads(path, 1))
+    thread = threading.Thread(target=reloader, daemon=True)
+    thread.start()
+    try:
+        busy = order_latencies(lines, n)
+    finally:
+        stop.set()
+        thread.join()
+    return quiet, busy, len(reloads)
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--colors', type=int, nargs='+', default=[3, 30, 300])
+    parser.add_argument('--repeats', type=int, default=20)
+    parser.add_argument('--orders', type=int, default=20_000, help="carts priced per latency run")
+    parser.add_argument('--every', type=float, default=0.05, help="seconds between background reloads")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, 'pricing.json')
+        print(f"{'colors':>6} {'cells':>8} {'median ms':>10} {'max ms':>8}")
+        for n_colors in args.colors:
+            with scaled_catalog(n_colors) as m:
+                save_pricing_config(m.PRICING.config, path)
+                timings = time_reloads(path, args.repeats)
+                print(f"{n_colors:>6} {m.PRICE_TABLES.data.size:>8} {statistics.median(timings) * 1e3:>10.2f} "
+                      f"{max(timings) * 1e3:>8.2f}")
+
+        with scaled_catalog(args.colors[-1]):
+            save_pricing_config(main.PRICING.config, path)
+            quiet, busy, reloads = latency_under_reload(path, args.every, args.orders)
+        print(f"\norder latency ({args.colors[-1]} colors, 10 lines per cart):")
+        for label, timings in (("no reloads", quiet), (f"{reloads} reloads", busy)):
+            print(f"  {label:<12} p50 {_percentile(timings, 0.5) * 1e6:8.1f} us   "
+                  f"p99 {_percentile(timings, 0.99) * 1e6:8.1f} us   max {max(timings) * 1e3:6.2f} ms")
+
+if __name__ == "__main__":
+    main_cli()
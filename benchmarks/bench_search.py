@@ -0,0 +1,65 @@
+"""
+Customer search benchmark: linear substring scan vs TextIndex.
+
+    python benchmarks/bench_search.py [--customers 10000 100000 300000] [--queries 200]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from search_index import TextIndex  # noqa: E402
+from synthetic import FIRST, LAST, synthetic_names  # noqa: E402
+
+def scan(names, query):
+    """What search_by_name did: lowercase every name on every query."""
+    return [i for i, name in names.items() if query.lower() in name.lower()]
+
+def run(sizes, n_queries):
+    rng = random.Random(7)
+    results = []
+    for n in sizes:
+        names = synthetic_names(n)
+        start = time.perf_counter()
+        index = TextIndex()
+        for i, name in names.items():
+            index.add(i, name)
+        build_s = time.perf_counter() - start
+
+        # a mix of selective and broad queries, like typed-in partial names
+        queries = [rng.choice([f"{rng.choice(LAST)} {rng.choice(LAST)[:3]}", str(rng.randrange(n)),
+                               rng.choice(FIRST)[:4]]) for _ in range(n_queries)]
+        start = time.perf_counter()
+        expected = [scan(names, q) for q in queries]
+        scan_s = (time.perf_counter() - start) / n_queries
+
+        start = time.perf_counter()
+        found = [index.search(q) for q in queries]
+        index_s = (time.perf_counter() - start) / n_queries
+
+        start = time.perf_counter()
+        for q in queries:
+            index.search(q, limit=20)
+        limited_s = (time.perf_counter() - start) / n_queries
+        assert found == expected
+
+        results.append({'entities': n, 'build_s': build_s, 'scan_ms': scan_s * 1e3,
+                        'index_ms': index_s * 1e3, 'index_limit20_ms': limited_s * 1e3})
+    return results
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--customers', type=int, nargs='+', default=[10_000, 100_000, 300_000])
+    parser.add_argument('--queries', type=int, default=200)
+    args = parser.parse_args(argv)
+
+    print(f"{'entities':>9} {'build s':>8} {'scan ms':>8} {'index ms':>9} {'limit=20 ms':>12}")
+    for r in run(args.customers, args.queries):
+        print(f"{r['entities']:>9} {r['build_s']:>8.2f} {r['scan_ms']:>8.2f} {r['index_ms']:>9.3f} "
+              f"{r['index_limit20_ms']:>12.3f}")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,62 @@
+"""
+CLI startup benchmark based on `python -X importtime`.
+
+Imports main in fresh interpreters, reports the cumulative import time of main
+and its slowest dependencies, and checks that pandas is no longer imported at
+startup (its own import cost is shown for comparison).
+
+    python benchmarks/bench_startup.py [--runs 5] [--top 10]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def importtime(statement):
+    """Run statement under -X importtime. Returns {module: (self_us, cumulative_us)}, nested names indented."""
+    proc = subprocess.run([sys.executable, '-X', 'importtime', '-c', statement], cwd=ROOT,
+                          capture_output=True, text=True, check=True)
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|')
+        modules[name[1:].rstrip()] = (int(self_us), int(cumulative_us))  # nested imports keep their indent
+    return modules
+
+def run(runs, top):
+    main_times, pandas_times = [], []
+    modules = {}
+    for _ in range(runs):
+        modules = importtime('import main')
+        main_times.append(modules['main'][1])
+        pandas_times.append(importtime('import pandas')['pandas'][1])
+    # imports made directly by main are indented one level (two spaces)
+    direct = [(name, times[1]) for name, times in modules.items() if len(name) - len(name.lstrip()) == 2]
+    slowest = sorted(direct, key=lambda item: -item[1])[:top]
+    return {
+        'main_import_ms': statistics.median(main_times) / 1e3,
+        'pandas_import_ms': statistics.median(pandas_times) / 1e3,
+        'pandas_imported_by_main': any(name.strip().split('.')[0] == 'pandas' for name in modules),
+        'slowest_imports_ms': {name.strip(): us / 1e3 for name, us in slowest},
+    }
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10)
+    args = parser.parse_args(argv)
+
+    result = run(args.runs, args.top)
+    print(f"import main (median of {args.runs}): {result['main_import_ms']:.1f} ms")
+    print(f"import pandas, for comparison:    {result['pandas_import_ms']:.1f} ms")
+    print(f"pandas imported at startup: {'yes' if result['pandas_imported_by_main'] else 'no'}")
+    print("\nSlowest imports made by main (cumulative ms):")
+    for name, ms in result['slowest_imports_ms'].items():
+        print(f"  {name:<30} {ms:>8.1f}")
+
+if __name__ == "__main__":
+    main_cli()
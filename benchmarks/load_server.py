@@ -0,0 +1,89 @@
+"""
+Load generator for server.py: latency percentiles and throughput.
+
+Starts the server in a subprocess on a free local port (or drives one already
+running with --port), opens --clients connections and has each send its share
+of --requests orders one after another, waiting for every response. Reports
+p50/p99 latency and requests per second.
+
+    python benchmarks/load_server.py [--requests 5000] [--clients 1 8 32] [--workers 0]
+    python benchmarks/load_server.py --port 8750 --clients 16
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from synthetic import synthetic_orders  # noqa: E402
+
+def start_server(workers):
+    """Run server.py on a free port; returns (process, port) once it is listening."""
+    proc = subprocess.Popen([sys.executable, 'server.py', '--port', '0', '--workers', str(workers)],
+                            cwd=ROOT, stderr=subprocess.PIPE, text=True)
+    line = proc.stderr.readline()
+    if not line.startswith('Listening on'):
+        proc.kill()
+        raise RuntimeError(f"server did not start: {line}{proc.stderr.read()}")
+    return proc, int(line.rsplit(':', 1)[1])
+
+async def _client(host, port, requests, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    for request in requests:
+        start = time.perf_counter()
+        writer.write(request)
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        if 'error' in response:
+            errors.append(response['error'])
+    writer.close()
+    await writer.wait_closed()
+
+async def _drive(host, port, requests, clients):
+    latencies, errors = [], []
+    shares = [requests[i::clients] for i in range(clients)]
+    start = time.perf_counter()
+    await asyncio.gather(*(_client(host, port, share, latencies, errors) for share in shares))
+    return latencies, len(errors), time.perf_counter() - start
+
+def run(host, port, n_requests, clients_list):
+    requests = [json.dumps(order).encode() + b'\n' for order in synthetic_orders(n_requests, lines_per_order=5)]
+    results = []
+    for clients in clients_list:
+        latencies, errors, elapsed = asyncio.run(_drive(host, port, requests, clients))
+        cuts = statistics.quantiles(latencies, n=100)
+        results.append({'clients': clients, 'requests': len(latencies), 'errors': errors,
+                        'p50_ms': cuts[49] * 1e3, 'p99_ms': cuts[98] * 1e3, 'requests_per_s': len(latencies) / elapsed})
+    return results
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, help="drive a server already running here instead of starting one")
+    parser.add_argument('--requests', type=int, default=5000)
+    parser.add_argument('--clients', type=int, nargs='+', default=[1, 8, 32])
+    parser.add_argument('--workers', type=int, default=0, help="--workers for the server this script starts")
+    args = parser.parse_args(argv)
+
+    proc, port = (None, args.port) if args.port else start_server(args.workers)
+    try:
+        results = run(args.host, port, args.requests, args.clients)
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    print(f"{'clients':>8} {'requests':>9} {'errors':>7} {'p50 ms':>8} {'p99 ms':>8} {'req/s':>8}")
+    for r in results:
+        print(f"{r['clients']:>8} {r['requests']:>9} {r['errors']:>7} {r['p50_ms']:>8.2f} {r['p99_ms']:>8.2f} "
+              f"{r['requests_per_s']:>8.0f}")
+
+if __name__ == "__main__":
+    main_cli()
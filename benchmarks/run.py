@@ -0,0 +1,203 @@
+"""
+Benchmark suite runner: times the pricing, catalog, order and search hot paths
+on synthetic data and writes the results to JSON.
+
+Each case runs once to warm up and then --repeats times; the median is the
+number compared between runs. With --compare, cases whose median got slower
+than --threshold times the baseline are reported and the exit status is 1.
+
+    python benchmarks/run.py --size small -o before.json
+    python benchmarks/run.py --size small -o after.json --compare before.json
+    python benchmarks/run.py --size medium large --case get_price price_orders find_products
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import batch  # noqa: E402
+import main  # noqa: E402
+from synthetic import FIRST, LAST, extra_customers, scaled_catalog, synthetic_orders  # noqa: E402
+
+SIZES = {
+    'small': {'colors': 3, 'lookups': 10_000, 'orders': 200, 'customers': 1_000, 'queries': 100, 'summary_lines': 18},
+    'medium': {'colors': 30, 'lookups': 100_000, 'orders': 2_000, 'customers': 20_000, 'queries': 200,
+               'summary_lines': 180},
+    'large': {'colors': 300, 'lookups': 500_000, 'orders': 10_000, 'customers': 100_000, 'queries': 200,
+              'summary_lines': 1_800},
+}
+
+# ---------------------------
+# Cases
+# ---------------------------
+# Each case is a context manager that takes a size dict, sets up its data and
+# yields (operations per call, function to time).
+CASES = {}
+
+def case(name):
+    def register(fn):
+        CASES[name] = contextmanager(fn)
+        return fn
+    return register
+
+@case('populate_price_tables')
+def _populate_price_tables(size):
+    with scaled_catalog(size['colors'], populate=False) as m:
+        cells = len(m.TABLES) * len(m.CATEGORIES) * len(m.FINISHES) * len(m.COLORS) * len(m.BASE_PRICES) * len(m.LOCATIONS)
+        yield cells, m.populate_price_tables
+
+@case('build_catalog')
+def _build_catalog(size):
+    with scaled_catalog(size['colors']) as m:
+        yield len(m.products), lambda: m.build_catalog(m.iter_price_keys())
+
+@case('get_price')
+def _get_price(size):
+    with scaled_catalog(size['colors']) as m:
+        rng = random.Random(42)
+        catalog = list(m.products.values())
+        lookups = [(rng.choice(m.TABLES), rng.choice(catalog), rng.choice(m.LOCATIONS)) for _ in range(size['lookups'])]
+        get_price = m.get_price
+
+        def run():
+            for table, product, location in lookups:
+                get_price(table, product, location)
+        yield len(lookups), run
+
+@case('price_orders')
+def _price_orders(size):
+    """The add_products_by_code pricing path (Cart, transport, commission, installments) in batch form."""
+    orders = synthetic_orders(size['orders'])
+    yield len(orders), lambda: list(batch.process_orders(orders))
+
+@case('search_by_name')
+def _search_by_name(size):
+    with extra_customers(size['customers']) as m:
+        rng = random.Random(7)
+        queries = [rng.choice([f"{rng.choice(LAST)} {rng.choice(LAST)[:3]}", rng.choice(FIRST)[:4],
+                               str(1000 + rng.randrange(size['customers']))]) for _ in range(size['queries'])]
+
+        def run():
+            for query in queries:
+                m.search_by_name(query, limit=20)
+        yield len(queries), run
+
+@case('search_seller_customers')
+def _search_seller_customers(size):
+    with extra_customers(size['customers']) as m:
+        rng = random.Random(9)
+        seller_ids = list(m.seller_dict)
+        queries = [(rng.choice(seller_ids), rng.choice([rng.choice(FIRST)[:4], rng.choice(LAST)]))
+                   for _ in range(size['queries'])]
+
+        def run():
+            for seller_id, query in queries:
+                m.search_by_name(query, seller_id=seller_id, limit=20)
+        yield len(queries), run
+
+@case('find_products')
+def _find_products(size):
+    with scaled_catalog(size['colors']) as m:
+        rng = random.Random(11)
+        index = m.product_index
+        finishes, colors, weights = list(index.values('finish')), list(index.values('color')), list(index.values('weight'))
+        queries = [{'finish': rng.choice(finishes), 'color': rng.sample(colors, 2), 'weight': rng.choice(weights)}
+                   for _ in range(size['queries'])]
+
+        def run():
+            for criteria in queries:
+                m.find_products(**criteria)
+        yield len(queries), run
+
+@case('render_order_summary')
+def _render_order_summary(size):
+    with scaled_catalog(size['colors']) as m:
+        customer = next(c for c in m.customer_dict.values() if not c.block)
+        cart = m.Cart(customer, m.TABLES[0])
+        for code, product in list(m.products.items())[:size['summary_lines']]:
+            cart.add(str(code), 4 if product.weight == 500 else 1, 0)
+        yield len(cart), lambda: m.write_order_summary(cart, io.StringIO())
+
+# ---------------------------
+# Running
+# ---------------------------
+def time_case(name, size_name, repeats):
+    with CASES[name](SIZES[size_name]) as (ops, fn):
+        fn()  # warm-up
+        timings = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - start)
+    median = statistics.median(timings)
+    return {'case': name, 'size': size_name, 'ops': ops, 'repeats': repeats, 'min_s': min(timings),
+            'median_s': median, 'per_op_us': median / ops * 1e6 if ops else None}
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(sizes, cases, repeats):
+    return {
+        'meta': {'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'commit': _git_commit(),
+                 'python': platform.python_version(), 'platform': platform.platform(),
+                 'pricing_mode': main.PRICING_MODE, 'repeats': repeats},
+        'results': [time_case(name, size, repeats) for size in sizes for name in cases],
+    }
+
+def compare(report, baseline, threshold):
+    """Return (case, size, baseline median, current median, ratio) for every case in both reports."""
+    previous = {(r['case'], r['size']): r for r in baseline['results']}
+    rows = []
+    for r in report['results']:
+        before = previous.get((r['case'], r['size']))
+        if before:
+            rows.append((r['case'], r['size'], before['median_s'], r['median_s'], r['median_s'] / before['median_s']))
+    return rows
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--size', nargs='+', choices=list(SIZES), default=['small'])
+    parser.add_argument('--case', nargs='+', choices=list(CASES), default=list(CASES))
+    parser.add_argument('--repeats', type=int, default=5)
+    parser.add_argument('-o', '--output', default='benchmark-results.json')
+    parser.add_argument('--compare', help="baseline results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=1.25, help="slowdown ratio that counts as a regression")
+    args = parser.parse_args(argv)
+
+    report = run(args.size, args.case, args.repeats)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    print(f"{'case':<22} {'size':<7} {'ops':>8} {'median ms':>10} {'us/op':>9}")
+    for r in report['results']:
+        print(f"{r['case']:<22} {r['size']:<7} {r['ops']:>8} {r['median_s'] * 1e3:>10.2f} {r['per_op_us']:>9.3f}")
+    print(f"Results written to {args.output}")
+
+    if not args.compare:
+        return 0
+    with open(args.compare, encoding='utf-8') as f:
+        rows = compare(report, json.load(f), args.threshold)
+    regressions = [row for row in rows if row[4] > args.threshold]
+    print(f"\n{'case':<22} {'size':<7} {'before ms':>10} {'after ms':>9} {'ratio':>6}")
+    for name, size, before, after, ratio in rows:
+        flag = '  REGRESSION' if ratio > args.threshold else ''
+        print(f"{name:<22} {size:<7} {before * 1e3:>10.2f} {after * 1e3:>9.2f} {ratio:>6.2f}{flag}")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,80 @@
+"""
+Stress test: price the same orders on one thread and on a thread pool and check
+that nothing leaks between concurrent orders.
+
+Every order is priced through batch.process_order (one OrderSession each) on
+--threads threads, with a tiny thread switch interval to force interleaving. The
+run passes when every result equals the single-threaded one (transport fees
+depend on each order's own sender flag) and every seller's commission total grew
+by exactly the sum of its orders' commissions. Exits 1 otherwise.
+
+    python benchmarks/stress_sessions.py [--orders 5000] [--threads 16] [--rounds 3]
+"""
+import argparse
+import os
+import sys
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import batch  # noqa: E402
+import main  # noqa: E402
+from money import to_cents  # noqa: E402
+from synthetic import synthetic_orders  # noqa: E402
+
+def commission_totals():
+    return {seller_id: seller._commission_cents for seller_id, seller in main.seller_dict.items()}
+
+def expected_commissions(results):
+    expected = Counter()
+    for result in results:
+        expected[result['seller_id']] += to_cents(result['commission'])
+    return expected
+
+def run_round(orders, threads):
+    """Price orders on a thread pool. Returns (results, seconds, commission growth per seller)."""
+    before = commission_totals()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(batch.process_order, orders))
+    seconds = time.perf_counter() - start
+    after = commission_totals()
+    return results, seconds, {seller_id: after[seller_id] - before[seller_id] for seller_id in after}
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--orders', type=int, default=5_000)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--rounds', type=int, default=3)
+    parser.add_argument('--switch-interval', type=float, default=1e-6,
+                        help="sys.setswitchinterval while the pool runs (smaller = more interleaving)")
+    args = parser.parse_args(argv)
+
+    orders = synthetic_orders(args.orders)
+    start = time.perf_counter()
+    reference = [batch.process_order(order) for order in orders]
+    sequential_s = time.perf_counter() - start
+    print(f"{args.orders} orders on 1 thread: {sequential_s:.2f} s")
+
+    failures = 0
+    saved_interval = sys.getswitchinterval()
+    sys.setswitchinterval(args.switch_interval)
+    try:
+        for round_number in range(1, args.rounds + 1):
+            results, seconds, growth = run_round(orders, args.threads)
+            wrong = sum(result != expected for result, expected in zip(results, reference))
+            expected = expected_commissions(reference)
+            lost = {seller_id: expected[seller_id] - cents for seller_id, cents in growth.items()
+                    if cents != expected[seller_id]}
+            status = "ok" if not wrong and not lost else "FAILED"
+            print(f"round {round_number}: {args.threads} threads {seconds:.2f} s, "
+                  f"{wrong} orders differ, commission mismatches {lost or 'none'}: {status}")
+            failures += status != "ok"
+    finally:
+        sys.setswitchinterval(saved_interval)
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
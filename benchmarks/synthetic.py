@@ -0,0 +1,104 @@
+"""
+Synthetic data for the benchmarks: catalogs, customers and orders of any size.
+
+Everything is seeded, so the same arguments always give the same data.
+"""
+import random
+from contextlib import contextmanager
+from dataclasses import replace
+
+import main
+
+FIRST = ["Alice", "Bruno", "Carla", "Diego", "Elisa", "Fabio", "Gisele", "Heitor", "Iris", "Joao",
+         "Karina", "Lucas", "Marina", "Nilo", "Olivia", "Paulo", "Renata", "Sergio", "Tania", "Vitor"]
+LAST = ["Silva", "Santos", "Oliveira", "Souza", "Rodrigues", "Ferreira", "Alves", "Pereira", "Lima", "Gomes",
+        "Costa", "Ribeiro", "Martins", "Carvalho", "Almeida", "Lopes", "Soares", "Fernandes", "Vieira", "Barbosa"]
+
+# ---------------------------
+# Catalogs
+# ---------------------------
+def synthetic_colors(n):
+    """n color names; the first three are the real ones, so flammable colors are still in the mix."""
+    base = list(main.COLORS)
+    return base[:n] + [f"color{i}" for i in range(len(base), n)]
+
+@contextmanager
+def scaled_catalog(n_colors, populate=True):
+    """
+    Install a pricing snapshot and catalog with n_colors colors (eager price tables)
+    while the block runs, then put the originals back. Yields main.
+    """
+    saved = (main.PRICING, main.products)
+    try:
+        config = replace(main.PRICING.config, colors=synthetic_colors(n_colors))
+        main.install_pricing(main.build_pricing_snapshot(config, mode="eager", populate=populate))
+        if populate:
+            main.products = main.build_catalog(main.iter_price_keys())
+            main.build_product_index()
+        yield main
+    finally:
+        main.install_pricing(saved[0])
+        main.products = saved[1]
+        main.build_product_index()
+
+# ---------------------------
+# Customers
+# ---------------------------
+def synthetic_names(n, seed=42):
+    rng = random.Random(seed)
+    return {i: f"{rng.choice(FIRST)} {rng.choice(LAST)} {rng.choice(LAST)} {i}" for i in range(n)}
+
+def synthetic_customers(n, seed=42, first_id=1000):
+    """Customer records (loader field names) registered to the sample sellers."""
+    rng = random.Random(seed)
+    seller_ids = list(main.seller_dict)
+    for i in range(n):
+        customer_id = first_id + i
+        yield {
+            'customer_id': customer_id,
+            'name': f"{rng.choice(FIRST)} {rng.choice(LAST)} {rng.choice(LAST)} {customer_id}",
+            'address': rng.choice(main.LOCATIONS),
+            'email': f"customer{customer_id}@example.com",
+            'phone': f"{rng.randrange(10**9):09d}",
+            'seller_id': rng.choice(seller_ids),
+            'block': rng.random() < 0.05,
+        }
+
+@contextmanager
+def extra_customers(n, seed=42):
+    """Register n synthetic customers (indexed for search) while the block runs."""
+    saved = dict(main.customer_dict)
+    try:
+        for record in synthetic_customers(n, seed):
+            main.customer_dict[record['customer_id']] = main.Customer(**record)
+        main.build_search_indexes()
+        yield main
+    finally:
+        main.customer_dict.clear()
+        main.customer_dict.update(saved)
+        main.build_search_indexes()
+
+# ---------------------------
+# Orders
+# ---------------------------
+def synthetic_orders(n_orders, lines_per_order=10, seed=42):
+    """Valid order specs (batch.py format) drawn from the current customers, sellers, transports and catalog."""
+    rng = random.Random(seed)
+    pairs = [(c.seller_id, c.customer_id) for c in main.customer_dict.values()
+             if not c.block and c.seller_id in main.seller_dict and not main.seller_dict[c.seller_id].block]
+    codes = list(main.products)
+    transports = list(main.transport_dict)
+    orders = []
+    for i in range(n_orders):
+        seller_id, customer_id = rng.choice(pairs)
+        items = []
+        for code in rng.sample(codes, min(lines_per_order, len(codes))):
+            quantity = rng.randint(1, 25) * (4 if main.products[code].weight == 500 else 1)
+            items.append({'code': str(code), 'quantity': quantity, 'discount': rng.choice([0, 5, 10, 12.5])})
+        orders.append({
+            'order_id': f"O{i}", 'seller_id': seller_id, 'customer_id': customer_id,
+            'commission_rate': 5, 'table': rng.choice(list(main.PRICE_TABLES)),
+            'payment_conditions': [30, 60, 90], 'transport_id': rng.choice(transports),
+            'sender': rng.random() < 0.5, 'items': items,
+        })
+    return orders
@@ -0,0 +1,166 @@
+"""
+Compiled catalog snapshots: the price matrix and product catalog as NumPy files
+that a process memory-maps at startup instead of rebuilding them.
+
+A snapshot is a directory holding
+
+    header.json             format version, config hash, table and dimension
+                            labels, and the names of the two array files
+    prices-<stamp>.npy      the PriceMatrix array, float64, NaN for missing prices
+    products-<stamp>.npy    one fixed-width record per product
+
+prices are opened with mmap_mode='r', so loading costs the same whatever the
+catalog size and every process started from the same snapshot shares its pages
+through the OS page cache. The config hash covers everything the prices and
+catalog are derived from; load_catalog_snapshot returns None when it does not
+match, and the caller rebuilds as if there were no snapshot.
+
+Every compile writes its arrays under new names and then renames a new
+header.json into place, so a header only ever names arrays written with it: a
+reader gets either the old header and arrays or the new ones, never a mix.
+Arrays no longer named by the header are deleted afterwards; a process that
+already mapped them keeps reading them, and one that read the old header just
+before is sent back to read the new one.
+"""
+import hashlib
+import json
+import os
+from datetime import datetime
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from price_matrix import PriceMatrix
+
+FORMAT_VERSION = 2
+HEADER_FILE = 'header.json'
+ARRAY_PREFIXES = ('prices', 'products')
+LOAD_ATTEMPTS = 3  # header re-reads when a compile replaces the arrays while loading
+
+CODE_WIDTH = 16  # characters kept of Product.code
+
+PRODUCT_DTYPE = np.dtype([('id', np.int64), ('code', f'U{CODE_WIDTH}'),
+                          ('category', np.int32), ('finish', np.int32), ('color', np.int32), ('weight', np.int32),
+                          ('flammable', np.bool_), ('cost', np.float64)])  # dimension fields are label indexes
+
+def config_hash(*parts) -> str:
+    """Stable hash of JSON-serializable parts (dict key order does not matter)."""
+    text = json.dumps(parts, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+# ---------------------------
+# Writing
+# ---------------------------
+def _replace(path: str, write: Callable[[str], None]) -> None:
+    tmp = f"{path}.{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+def _save_npy(array: np.ndarray) -> Callable[[str], None]:
+    def write(path):
+        with open(path, 'wb') as f:
+            np.save(f, array)
+    return write
+
+def write_catalog_snapshot(path: str, matrix: PriceMatrix, products: Dict[int, object], digest: str) -> dict:
+    """
+    Write matrix and products (id -> Product) to the snapshot directory path,
+    tagged with digest (see config_hash). Returns the header.
+    """
+    categories, finishes, colors, weights, _ = (dict((label, i) for i, label in enumerate(labels))
+                                                for labels in matrix.labels)
+    records = np.zeros(len(products), dtype=PRODUCT_DTYPE)
+    for row, (product_id, product) in zip(records, products.items()):
+        if len(product.code) > CODE_WIDTH:
+            raise ValueError(f"Product code {product.code} is longer than {CODE_WIDTH} characters.")
+        row['id'] = product_id
+        row['code'] = product.code
+        row['category'] = categories[product.category]
+        row['finish'] = finishes[product.finish]
+        row['color'] = colors[product.color]
+        row['weight'] = weights[product.weight]
+        row['flammable'] = product.flammable
+        row['cost'] = product.cost
+
+    stamp = f"{datetime.now():%Y%m%d%H%M%S%f}-{os.getpid()}"
+    files = {'prices': f"prices-{stamp}.npy", 'products': f"products-{stamp}.npy"}
+    header = {'version': FORMAT_VERSION, 'config_hash': digest,
+              'created': datetime.now().isoformat(timespec='seconds'), 'files': files,
+              'tables': list(matrix.tables), 'labels': [list(labels) for labels in matrix.labels],
+              'shape': list(matrix.data.shape), 'products': len(products)}
+    os.makedirs(path, exist_ok=True)
+    _replace(os.path.join(path, files['prices']), _save_npy(np.ascontiguousarray(matrix.data)))
+    _replace(os.path.join(path, files['products']), _save_npy(records))
+
+    def write_header(tmp):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(header, f, indent=2)
+    _replace(os.path.join(path, HEADER_FILE), write_header)
+    _remove_stale_arrays(path, set(files.values()))
+    return header
+
+def _remove_stale_arrays(path: str, keep: set) -> None:
+    """Delete array files the header no longer names (including format 1's prices.npy/products.npy)."""
+    for name in os.listdir(path):
+        if name.endswith('.npy') and name.startswith(ARRAY_PREFIXES) and name not in keep:
+            try:
+                os.remove(os.path.join(path, name))
+            except FileNotFoundError:
+                pass
+
+# ---------------------------
+# Loading
+# ---------------------------
+class CatalogSnapshot:
+    """A loaded snapshot: header, a PriceMatrix over the memory-mapped prices, and the product records."""
+
+    def __init__(self, path: str, header: dict, prices: PriceMatrix, records: np.ndarray):
+        self.path = path
+        self.header = header
+        self.prices = prices
+        self.records = records
+
+    def products(self, make_product: Callable[..., object]) -> Dict[int, object]:
+        """
+        The catalog as {id: make_product(category, finish, color, weight, code, flammable, cost)},
+        the argument order of main.Product.
+        """
+        categories, finishes, colors, weights, _ = self.prices.labels
+        r = self.records
+        return {product_id: make_product(categories[category], finishes[finish], colors[color], weights[weight],
+                                         code, flammable, cost)
+                for product_id, code, category, finish, color, weight, flammable, cost
+                in zip(r['id'].tolist(), r['code'].tolist(), r['category'].tolist(), r['finish'].tolist(),
+                       r['color'].tolist(), r['weight'].tolist(), r['flammable'].tolist(), r['cost'].tolist())}
+
+    def __repr__(self) -> str:
+        return (f"CatalogSnapshot({self.path!r}, products={len(self.records)}, "
+                f"created={self.header.get('created')!r})")
+
+def read_header(path: str) -> Optional[dict]:
+    """The snapshot's header, or None if there is no snapshot at path."""
+    try:
+        with open(os.path.join(path, HEADER_FILE), encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+def load_catalog_snapshot(path: str, digest: str) -> Optional[CatalogSnapshot]:
+    """
+    Memory-map the snapshot at path. Returns None if there is none, or if it was
+    written by another format version or for a config whose hash is not digest.
+    """
+    for _ in range(LOAD_ATTEMPTS):
+        header = read_header(path)
+        if header is None or header.get('version') != FORMAT_VERSION or header.get('config_hash') != digest:
+            return None
+        try:
+            data = np.load(os.path.join(path, header['files']['prices']), mmap_mode='r')
+            records = np.load(os.path.join(path, header['files']['products']), mmap_mode='r')
+        except FileNotFoundError:
+            continue  # a compile replaced the snapshot after the header was read
+        if list(data.shape) != header['shape'] or len(records) != header['products']:
+            raise ValueError(f"Catalog snapshot {path} is damaged: the arrays do not match the header.")
+        prices = PriceMatrix(header['tables'], *header['labels'], data=data)
+        return CatalogSnapshot(path, header, prices, records)
+    return None
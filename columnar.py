@@ -0,0 +1,161 @@
+"""
+Columnar (NumPy) pricing of whole batches of order lines.
+
+price_lines takes parallel arrays of product code, quantity, discount, table and
+location and prices every line in one vectorized pass. The arithmetic is the
+int64 cents arithmetic of main._price_line_cents (see money), so each value is
+identical to the scalar path.
+"""
+from typing import Dict, NamedTuple, Optional
+
+import numpy as np
+
+import main
+from money import apply_rate_array, discounted_array, from_cents, percent_to_rate_array, to_cents_array, to_rate
+
+# ---------------------------
+# Catalog Arrays
+# ---------------------------
+class CatalogArrays(NamedTuple):
+    codes: np.ndarray        # sorted product codes (int64)
+    weight: np.ndarray       # ml per unit, aligned with codes
+    flammable: np.ndarray    # bool, aligned with codes
+    cost: np.ndarray         # product cost per unit in cents, aligned with codes
+    tables: Dict[str, int]   # table -> axis 0 index of prices
+    locations: Dict[str, int]  # location -> axis 2 index of prices and index of tax_rates
+    prices: np.ndarray       # [table, product, location] base price in cents, -1 where get_price is None
+    tax_rates: np.ndarray    # tax rate per location, in parts per million
+
+def build_catalog_arrays() -> CatalogArrays:
+    """Snapshot products, PRICE_TABLES and TAX_RATES into lookup arrays."""
+    codes = np.array(sorted(main.products), dtype=np.int64)
+    catalog = [main.products[int(code)] for code in codes]
+    matrix = main.PRICE_TABLES
+    tables = {table: i for i, table in enumerate(matrix.tables)}
+    locations = {location: i for i, location in enumerate(matrix.labels_for('location'))}
+    prices = matrix.product_prices(catalog)
+    missing = np.isnan(prices)
+    prices = np.where(missing, -1, to_cents_array(np.where(missing, 0.0, prices)))
+
+    return CatalogArrays(
+        codes=codes,
+        weight=np.array([product.weight for product in catalog], dtype=np.int64),
+        flammable=np.array([product.flammable for product in catalog], dtype=bool),
+        cost=to_cents_array(np.array([product.cost for product in catalog], dtype=np.float64)),
+        tables=tables,
+        locations=locations,
+        prices=prices,
+        tax_rates=np.array([to_rate(main.TAX_RATES.get(location, 0)) for location in locations], dtype=np.int64),
+    )
+
+def _encode(values, index: Dict[str, int], what: str) -> np.ndarray:
+    """Map an array of labels to their integer positions in index."""
+    uniques, inverse = np.unique(np.asarray(values).astype(str), return_inverse=True)
+    positions = np.empty(len(uniques), dtype=np.intp)
+    for i, label in enumerate(uniques):
+        if label not in index:
+            raise ValueError(f"Invalid {what}: {label}.")
+        positions[i] = index[label]
+    return positions[inverse]
+
+# ---------------------------
+# Vectorized Pricing
+# ---------------------------
+MONEY_COLUMNS = ('unit_price_before_tax', 'unit_price_incl_tax', 'tax_amount_per_item', 'item_total_before_tax',
+                 'line_tax_amount', 'line_total_with_tax', 'line_cost')
+
+def price_lines_cents(codes, quantities, discounts, tables, locations,
+                      arrays: Optional[CatalogArrays] = None) -> Dict[str, np.ndarray]:
+    """
+    Price a batch of order lines. All arguments are equal-length array-likes; tables
+    and locations may also be a single string applied to every line. Returns a dict
+    of arrays keyed like the dicts returned by main._price_line_cents (int64 cents),
+    plus weight, volume and flammable columns.
+    """
+    if arrays is None:
+        arrays = build_catalog_arrays()
+
+    codes = np.asarray(codes).astype(np.int64)
+    quantities = np.asarray(quantities, dtype=np.int64)
+    discounts = np.asarray(discounts, dtype=np.float64)
+    n = len(codes)
+    if isinstance(tables, str):
+        tables = np.full(n, tables)
+    if isinstance(locations, str):
+        locations = np.full(n, locations)
+
+    product_idx = np.searchsorted(arrays.codes, codes)
+    product_idx[product_idx == len(arrays.codes)] = 0
+    unknown = arrays.codes[product_idx] != codes if len(arrays.codes) else np.ones(n, dtype=bool)
+    if unknown.any():
+        raise ValueError(f"Invalid product code: {codes[unknown][0]}.")
+    if (quantities <= 0).any():
+        raise ValueError("Quantity must be a positive number.")
+    weight = arrays.weight[product_idx]
+    if ((weight == 500) & (quantities % 4 != 0)).any():
+        raise ValueError("Quantity for 500ml products must be a multiple of 4.")
+    if ((discounts < 0) | (discounts > 100)).any():
+        raise ValueError("Discount must be between 0 and 100.")
+
+    table_idx = _encode(tables, arrays.tables, "table number")
+    location_idx = _encode(locations, arrays.locations, "location")
+    base_price = arrays.prices[table_idx, product_idx, location_idx]
+    if (base_price < 0).any():
+        raise ValueError("Invalid table number or location.")
+
+    flammable = arrays.flammable[product_idx]
+    discounted_price = discounted_array(base_price, percent_to_rate_array(discounts))
+    tax_amount_per_item = np.where(flammable, apply_rate_array(discounted_price, arrays.tax_rates[location_idx]), 0)
+    item_total_before_tax = discounted_price * quantities
+    line_tax_amount = tax_amount_per_item * quantities
+    line_weight = weight * quantities
+
+    return {
+        'unit_price_before_tax': discounted_price,
+        'unit_price_incl_tax': discounted_price + tax_amount_per_item,
+        'tax_amount_per_item': tax_amount_per_item,
+        'item_total_before_tax': item_total_before_tax,
+        'line_tax_amount': line_tax_amount,
+        'line_total_with_tax': item_total_before_tax + line_tax_amount,
+        'line_cost': arrays.cost[product_idx] * quantities,
+        'weight': weight,
+        'flammable': flammable,
+        'line_weight': line_weight,
+        'flammable_weight': np.where(flammable, line_weight, 0),
+        'non_flammable_weight': np.where(flammable, 0, line_weight),
+        'volumes': np.where(weight == 500, quantities // 4, quantities),
+    }
+
+def price_lines(codes, quantities, discounts, tables, locations, arrays: Optional[CatalogArrays] = None) -> Dict[str, np.ndarray]:
+    """price_lines_cents with the money columns converted to float currency units, like main._price_line."""
+    priced = price_lines_cents(codes, quantities, discounts, tables, locations, arrays=arrays)
+    for column in MONEY_COLUMNS:
+        priced[column] = from_cents(priced[column])
+    return priced
+
+def totals_by_order(order_ids, priced: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Sum priced line columns per order. Returns the sorted unique order ids plus one
+    array per summed column, and a volumes_<weight> package count for every weight in
+    the pricing config (and any other weight among the lines). Pass price_lines_cents
+    output for exact money sums.
+    """
+    order_keys, inverse = np.unique(np.asarray(order_ids), return_inverse=True)
+    totals = {'order_id': order_keys}
+    for column in ('item_total_before_tax', 'line_tax_amount', 'line_total_with_tax', 'line_cost',
+                   'line_weight', 'flammable_weight', 'non_flammable_weight'):
+        values = priced[column]
+        summed = np.zeros(len(order_keys), dtype=values.dtype)
+        np.add.at(summed, inverse, values)
+        totals[column] = summed
+    for size in sorted(set(main.PRICING_CONFIG.base_prices) | set(np.unique(priced['weight']).tolist())):
+        packages = np.zeros(len(order_keys), dtype=np.int64)
+        np.add.at(packages, inverse, np.where(priced['weight'] == size, priced['volumes'], 0))
+        totals[f'volumes_{size}'] = packages
+    return totals
+
+def price_frame(frame, arrays: Optional[CatalogArrays] = None):
+    """Price a pandas DataFrame with code, quantity, discount, table and location columns."""
+    priced = price_lines(frame['code'].to_numpy(), frame['quantity'].to_numpy(), frame['discount'].to_numpy(),
+                         frame['table'].to_numpy(), frame['location'].to_numpy(), arrays=arrays)
+    return frame.assign(**priced)
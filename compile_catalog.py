@@ -0,0 +1,52 @@
+"""
+Compile the price matrix and product catalog into a snapshot that main.py
+memory-maps at startup (see catalog_snapshot):
+
+    python compile_catalog.py catalog.snapshot
+    SALES_CATALOG_SNAPSHOT=catalog.snapshot python batch.py orders.jsonl -o priced.jsonl
+
+The snapshot is built from the pricing config main.py would load (pricing_config
+defaults, or SALES_PRICING_CONFIG) and tagged with its hash. Compile again after
+changing the config; until then processes rebuild at startup as before.
+"""
+import argparse
+import os
+import sys
+import time
+from typing import List, Optional
+
+import main as _main
+from catalog_snapshot import read_header, write_catalog_snapshot
+
+def compile_catalog(path: str) -> dict:
+    """Write a snapshot of the current config's prices and catalog to path. Returns its header."""
+    snapshot = _main.build_pricing_snapshot(_main.PRICING_CONFIG, mode="eager")
+    tables = snapshot.price_tables
+    catalog = _main.build_catalog(key for table in tables for key in tables[table].keys())
+    return write_catalog_snapshot(path, tables, catalog, _main.catalog_hash())
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compile the price matrix and catalog for memory-mapped startup.")
+    parser.add_argument('path', nargs='?', default=_main.CATALOG_SNAPSHOT,
+                        help="snapshot directory to write (default: SALES_CATALOG_SNAPSHOT)")
+    parser.add_argument('--check', action='store_true',
+                        help="only report whether the snapshot matches the current config (exit 1 if not)")
+    args = parser.parse_args(argv)
+    if not args.path:
+        parser.error("give a snapshot directory or set SALES_CATALOG_SNAPSHOT")
+
+    if args.check:
+        header = read_header(args.path)
+        current = header is not None and header.get('config_hash') == _main.catalog_hash()
+        print(f"{args.path}: {'up to date' if current else 'stale or missing'}", file=sys.stderr)
+        return 0 if current else 1
+
+    start = time.perf_counter()
+    header = compile_catalog(args.path)
+    size = sum(os.path.getsize(os.path.join(args.path, name)) for name in os.listdir(args.path))
+    print(f"Compiled {header['products']} products, {header['shape']} prices into {args.path} "
+          f"({size / 1e6:.1f} MB) in {time.perf_counter() - start:.2f} s.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,142 @@
+"""
+Opt-in timers and counters for the order-processing hot paths.
+
+Nothing is recorded until metrics.enable() is called. Functions are timed by
+replacing them on their module with a wrapper (instrument), so code that is not
+instrumented runs unchanged; blocks of code use `with metrics.timer(name)`,
+which is a no-op context manager while metrics are disabled.
+
+Snapshots are exported as JSON or in the Prometheus text format:
+
+    metrics.write("metrics.json")
+    metrics.write("metrics.prom")
+"""
+import json
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+from typing import Dict, Mapping, Optional
+
+PROMETHEUS_PREFIX = 'sales_'
+
+class TimerStats:
+    __slots__ = ('count', 'total', 'min', 'max')
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float('inf')
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds < self.min:
+            self.min = seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def as_dict(self) -> dict:
+        return {'count': self.count, 'total_s': self.total, 'mean_s': self.total / self.count if self.count else 0.0,
+                'min_s': self.min if self.count else 0.0, 'max_s': self.max}
+
+class Metrics:
+    """Registry of named counters and timers. Updates from several threads are serialized."""
+
+    def __init__(self):
+        self.enabled = False
+        self.counters: Dict[str, int] = {}
+        self.timers: Dict[str, TimerStats] = {}
+        self._lock = threading.Lock()
+
+    def enable(self) -> None:
+        self.enabled = True
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.timers.clear()
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        if self.enabled:
+            with self._lock:
+                self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            stats = self.timers.get(name)
+            if stats is None:
+                stats = self.timers[name] = TimerStats()
+            stats.observe(seconds)
+
+    def timer(self, name: str):
+        """Context manager timing its block under name (does nothing while disabled)."""
+        if not self.enabled:
+            return nullcontext()
+        return self._timer(name)
+
+    @contextmanager
+    def _timer(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    # ---------------------------
+    # Export
+    # ---------------------------
+    def snapshot(self) -> dict:
+        return {'counters': dict(self.counters), 'timers': {name: stats.as_dict() for name, stats in self.timers.items()}}
+
+    def to_json(self) -> str:
+        return json.dumps(self.snapshot(), indent=2)
+
+    def to_prometheus(self) -> str:
+        lines = []
+        for name, value in sorted(self.counters.items()):
+            metric = f"{PROMETHEUS_PREFIX}{name}_total"
+            lines += [f"# TYPE {metric} counter", f"{metric} {value}"]
+        for name, stats in sorted(self.timers.items()):
+            metric = f"{PROMETHEUS_PREFIX}{name}_seconds"
+            lines += [f"# TYPE {metric} summary", f"{metric}_count {stats.count}", f"{metric}_sum {stats.total:.9f}",
+                      f"# TYPE {metric}_max gauge", f"{metric}_max {stats.max:.9f}"]
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str) -> None:
+        """Write a snapshot to path: JSON for .json, Prometheus text otherwise."""
+        text = self.to_json() if path.endswith('.json') else self.to_prometheus()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+metrics = Metrics()
+
+# ---------------------------
+# Instrumenting Functions
+# ---------------------------
+def timed(fn, name: str, registry: Optional[Metrics] = None):
+    """Wrap fn so every call is timed under name."""
+    registry = registry or metrics
+    perf_counter = time.perf_counter
+
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        start = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            registry.observe(name, perf_counter() - start)
+    wrapper.__wrapped_by_metrics__ = True
+    return wrapper
+
+def instrument(namespace, targets: Mapping[str, str], registry: Optional[Metrics] = None) -> None:
+    """
+    Replace each function namespace.<attr> with a timed wrapper recording under
+    targets[attr]. Callers that look the function up on the module (including the
+    module's own code) are timed from then on. Already instrumented functions are
+    left alone.
+    """
+    for attr, name in targets.items():
+        fn = getattr(namespace, attr)
+        if not getattr(fn, '__wrapped_by_metrics__', False):
+            setattr(namespace, attr, timed(fn, name, registry))
@@ -0,0 +1,160 @@
+"""
+On-demand price computation.
+
+LazyPriceTables answers the same lookups as PriceMatrix but computes each price
+with its calculate function (main.calculate_cell_price) the first time it is
+asked for and keeps it in a bounded LRU cache, so nothing is materialized at
+import and resident memory is capped by the cache size rather than the size of
+the catalog.
+"""
+import threading
+from collections import OrderedDict
+from collections.abc import Mapping
+from typing import Callable, Hashable, Iterable, Iterator, Optional, Sequence
+
+import numpy as np
+
+from price_matrix import PriceKey, PriceMatrix
+
+_MISSING = object()
+
+# ---------------------------
+# LRU Cache
+# ---------------------------
+class LRUCache:
+    """Bounded least-recently-used cache with hit, miss and eviction counters. Safe to share between threads."""
+
+    def __init__(self, maxsize: int = 4096):
+        if maxsize <= 0:
+            raise ValueError("maxsize must be a positive number.")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default=None):
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value) -> None:
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._data
+
+    def stats(self) -> dict:
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'size': len(self._data), 'maxsize': self.maxsize}
+
+# ---------------------------
+# Lazy Price Tables
+# ---------------------------
+class LazyPriceTableView(Mapping):
+    """Read-only dict-style view of one table, keyed by (category, finish, color, weight, location)."""
+
+    def __init__(self, tables: "LazyPriceTables", table: str):
+        self._tables = tables
+        self._table = table
+
+    def __getitem__(self, key: PriceKey) -> float:
+        if len(key) != len(self._tables.dimensions):
+            raise KeyError(key)
+        price = self._tables.lookup(self._table, *key)
+        if price is None:
+            raise KeyError(key)
+        return price
+
+    def __iter__(self) -> Iterator[PriceKey]:
+        """Iterate keys in the same order populate_price_tables would insert them, without pricing anything."""
+        categories, finishes, colors, weights, locations = self._tables.labels
+        for category in categories:
+            for finish in finishes:
+                for color in colors:
+                    for weight in weights:
+                        for location in locations:
+                            yield (category, finish, color, weight, location)
+
+    def __len__(self) -> int:
+        size = 1
+        for labels in self._tables.labels:
+            size *= len(labels)
+        return size
+
+class LazyPriceTables(Mapping):
+    """PriceMatrix-compatible price store that computes prices on first access and caches them."""
+
+    dimensions = PriceMatrix.dimensions
+
+    def __init__(self, tables: Iterable[str], categories: Iterable[str], finishes: Iterable[str],
+                 colors: Iterable[str], weights: Iterable[int], locations: Iterable[str],
+                 calculate: Callable[[str, str, str, str, int, str], Optional[float]], maxsize: int = 4096):
+        self.tables = tuple(tables)
+        self.labels = (tuple(categories), tuple(finishes), tuple(colors), tuple(weights), tuple(locations))
+        self._label_sets = tuple(frozenset(labels) for labels in self.labels)
+        self._calculate = calculate
+        self.cache = LRUCache(maxsize)
+        self._views = {table: LazyPriceTableView(self, table) for table in self.tables}
+
+    def __getitem__(self, table: str) -> LazyPriceTableView:
+        return self._views[table]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tables)
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def lookup(self, table: str, category: str, finish: str, color: str, weight: int, location: str) -> Optional[float]:
+        """Return the price for one cell, computing and caching it on a miss. None for unknown labels."""
+        key = (table, category, finish, color, weight, location)
+        price = self.cache.get(key, _MISSING)
+        if price is not _MISSING:
+            return price
+        if table not in self._views or not all(label in labels for label, labels in zip(key[1:], self._label_sets)):
+            return None
+        price = self._calculate(*key)
+        self.cache.put(key, price)
+        return price
+
+    def price(self, table: str, product, location: str) -> Optional[float]:
+        """get_price-compatible lookup for a Product."""
+        return self.lookup(table, product.category, product.finish, product.color, product.weight, location)
+
+    def product_prices(self, products: Sequence) -> np.ndarray:
+        """[table, product, location] array of prices for a list of Products, NaN where there is no price."""
+        locations = self.labels[-1]
+        prices = np.full((len(self.tables), len(products), len(locations)), np.nan)
+        for t, table in enumerate(self.tables):
+            for p, product in enumerate(products):
+                for l, location in enumerate(locations):
+                    price = self.price(table, product, location)
+                    if price is not None:
+                        prices[t, p, l] = price
+        return prices
+
+    def labels_for(self, dimension: str) -> Sequence:
+        return self.labels[self.dimensions.index(dimension)]
+
+    def cache_stats(self) -> dict:
+        return self.cache.stats()
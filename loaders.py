@@ -0,0 +1,113 @@
+"""
+Streaming readers for bulk customer, seller and transport files.
+
+Records are read one at a time from CSV or JSONL and handed out in chunks, so
+a loader never holds more than one chunk of raw rows next to the objects it
+has already built. Field helpers raise ValueError with a readable message,
+and LoadReport collects the errors of rows that were skipped.
+"""
+import csv
+import json
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Iterable, Iterator, List, Tuple, Union
+
+MAX_REPORTED_ERRORS = 100
+
+@dataclass
+class LoadReport:
+    path: str
+    loaded: int = 0
+    skipped: int = 0
+    errors: List[str] = field(default_factory=list)
+
+    def add_error(self, line: int, message: str) -> None:
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(f"{self.path}:{line}: {message}")
+
+# ---------------------------
+# Reading Records
+# ---------------------------
+def iter_records(path: str) -> Iterator[Tuple[int, Union[dict, str]]]:
+    """
+    Yield (line number, raw record) from a .csv (with header) or .jsonl file. CSV rows
+    come as dicts, JSONL lines as text; parse_record turns either into a dict, so a
+    malformed line fails where its errors are handled, not while reading.
+    """
+    with open(path, newline='', encoding='utf-8') as f:
+        if path.endswith('.csv'):
+            reader = csv.DictReader(f)
+            for row in reader:
+                yield reader.line_num, row
+        else:
+            for line_number, line in enumerate(f, 1):
+                line = line.strip()
+                if line:
+                    yield line_number, line
+
+def parse_record(raw: Union[dict, str]) -> dict:
+    """The record as a dict; raises ValueError for a JSONL line that is not a JSON object."""
+    if isinstance(raw, dict):
+        return raw
+    try:
+        record = json.loads(raw)
+    except json.JSONDecodeError as exc:
+        raise ValueError(f"not valid JSON ({exc.msg} at column {exc.colno})") from None
+    if not isinstance(record, dict):
+        raise ValueError("not a JSON object")
+    return record
+
+def iter_chunks(records: Iterable, size: int) -> Iterator[list]:
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+# ---------------------------
+# Field Validation
+# ---------------------------
+def require_int(record: dict, name: str) -> int:
+    value = record.get(name)
+    if value in (None, ''):
+        raise ValueError(f"missing {name}")
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a whole number, got {value!r}") from None
+
+def require_str(record: dict, name: str) -> str:
+    value = record.get(name)
+    if value is None or not str(value).strip():
+        raise ValueError(f"missing {name}")
+    return str(value).strip()
+
+def optional_float(record: dict, name: str, default: float = 0.0) -> float:
+    value = record.get(name)
+    if value in (None, ''):
+        return default
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{name} must be a number, got {value!r}") from None
+
+def optional_bool(record: dict, name: str, default: bool = False) -> bool:
+    value = record.get(name)
+    if value in (None, ''):
+        return default
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in ('true', 'yes', '1', 'y'):
+        return True
+    if text in ('false', 'no', '0', 'n'):
+        return False
+    raise ValueError(f"{name} must be yes/no or true/false, got {value!r}")
+
+def require_email(record: dict, name: str = 'email') -> str:
+    email = require_str(record, name)
+    if '@' not in email:
+        raise ValueError(f"{name} is not a valid address: {email!r}")
+    return email
@@ -1,7 +1,29 @@
+import atexit
+import heapq
+import json
+import os
+import sys
+import threading
+import time
+from itertools import count
 from datetime import datetime
-from dataclasses import dataclass
-import pandas as pd
+from dataclasses import asdict, dataclass
 from typing import Dict, List, Tuple, Optional
+from price_matrix import PriceMatrix
+from lazy_pricing import LazyPriceTables
+from order_store import OrderStore
+from search_index import OwnershipIndex, TextIndex
+from money import apply_rate, from_cents, percent_to_rate, split, to_cents, to_rate
+from pricing_context import ContextEntry, PricingContext, PricingContextCache
+from instrumentation import instrument, metrics
+from pricing_config import (DEFAULT_PRICING, compile_rules, load_pricing_config, pricing_config_from_dict,
+                            pricing_config_to_dict)
+from catalog_snapshot import config_hash, load_catalog_snapshot
+from pricing_reload import ConfigWatcher, PricingSnapshot, ReloadStats
+from product_search import LISTING_COLUMNS, ProductIndex, listing_rows
+from render import column_widths, columns_to_rows, render_table, to_dataframe, write_table
+from loaders import (LoadReport, iter_chunks, iter_records, optional_bool, optional_float, parse_record,
+                     require_email, require_int, require_str)
 # ---------------------------
 # Global Pricing Information
 # ---------------------------
@@ -9,61 +31,251 @@ from typing import Dict, List, Tuple, Optional
 #new text editor_11
 
 
-LOCATIONS = ["goiania", "pernambuco", "bahia"]
-PRICE_FACTORS = {
-    "goiania": 4.0,
-    "pernambuco": 4.5,
-    "bahia": 5.0
-}
-BASE_PRICES = {
-    500: 1.0,
-    1000: 1.5,
-    2000: 2.0
-}
+# The pricing model (dimensions, factors, tax rates and per-SKU overrides) is read from
+# SALES_PRICING_CONFIG if set, else taken from pricing_config.DEFAULT_PRICING.
+PRICING_CONFIG_FILE = os.environ.get("SALES_PRICING_CONFIG")
+if PRICING_CONFIG_FILE:
+    PRICING_CONFIG = load_pricing_config(PRICING_CONFIG_FILE)
+else:
+    PRICING_CONFIG = pricing_config_from_dict(DEFAULT_PRICING)
+
+# These name the current config's own dicts and lists (install_pricing rebinds them),
+# so editing one in place is picked up like a reload on the next pricing-context lookup.
+LOCATIONS = list(PRICING_CONFIG.location_factors)
+PRICE_FACTORS = PRICING_CONFIG.location_factors
+BASE_PRICES = PRICING_CONFIG.base_prices
+TABLE_FACTORS = PRICING_CONFIG.table_factors
+PRICE_OVERRIDES = PRICING_CONFIG.overrides
 
 BASE_COST_PER_500ML = 2.0
+FIRST_PRODUCT_CODE = 100
+FLAMMABLE_COLORS = ["black", "green"]
 
-PRICE_TABLES = {"711": {}, "411": {}}
-TAX_RATES = {
-    "goiania": 0.10,      # 10% tax
-    "pernambuco": 0.15,   # 15% tax
-    "bahia": 0.12         # 12% tax
-}
+CATEGORIES = PRICING_CONFIG.categories
+FINISHES = PRICING_CONFIG.finishes
+COLORS = PRICING_CONFIG.colors
+TABLES = list(TABLE_FACTORS)
+
+# "eager" fills every price at import; "lazy" computes prices on first use and keeps
+# at most PRICE_CACHE_SIZE of them in an LRU cache.
+PRICING_MODE = os.environ.get("SALES_PRICING_MODE", "eager")
+PRICE_CACHE_SIZE = int(os.environ.get("SALES_PRICE_CACHE_SIZE", "4096"))
+
+# Directory of a catalog snapshot written by compile_catalog.py. In eager mode the prices
+# and catalog are memory-mapped from it at import instead of being rebuilt, as long as
+# it was compiled from the current pricing config.
+CATALOG_SNAPSHOT = os.environ.get("SALES_CATALOG_SNAPSHOT")
+
+# With SALES_PRICING_CONFIG set, check the file every this many seconds and reload
+# prices when it changes (0 = never).
+PRICING_RELOAD_INTERVAL = float(os.environ.get("SALES_PRICING_RELOAD_INTERVAL", "0"))
+
+# Set to a .json or .prom path to time the hot paths and write the metrics there at exit.
+METRICS_FILE = os.environ.get("SALES_METRICS_FILE")
+if METRICS_FILE:
+    metrics.enable()
+
+TAX_RATES = PRICING_CONFIG.tax_rates
 
 # ---------------------------
 # Price Table Setup
 # ---------------------------
 def calculate_price(weight, location, table):
-    """Calculate price based on weight, location, and table."""
-    base_price = BASE_PRICES[weight] * PRICE_FACTORS[location]
-    if table == "711":
-        return base_price
-    elif table == "411":
-        return base_price * 0.9
+    """Calculate price based on weight, location, and table (base price x location factor x table factor)."""
+    return PRICING_RULES.base_price(weight, location, table)
+
+def calculate_cell_price(table, category, finish, color, weight, location):
+    """Price of one price-table cell, per-SKU overrides included."""
+    return PRICING_RULES.price(table, category, finish, color, weight, location)
 
 def populate_price_tables():
-    """Populate the price tables with computed prices."""
-    for table in PRICE_TABLES:
-        for category in ["Acrilico premium"]:
-            for finish in ["fosco", "semibrilho"]:
-                for color in ["black", "white", "green"]:
-                    for weight in BASE_PRICES:
-                        for location in LOCATIONS:
-                            price = calculate_price(weight, location, table)
-                            PRICE_TABLES[table][(category, finish, color, weight, location)] = price
+    """
+    Populate the current price tables with computed prices. Lazy tables and a memory-mapped
+    catalog snapshot can't be written to, so those are replaced by refresh_price_tables.
+    """
+    if isinstance(PRICE_TABLES, PriceMatrix) and PRICE_TABLES.data.flags.writeable:
+        PRICING_RULES.fill(PRICE_TABLES)
+    else:
+        refresh_price_tables()
+
+def create_price_tables(mode=PRICING_MODE, config=None, rules=None):
+    """Create the empty (eager) or on-demand (lazy) price store for config (the current one by default)."""
+    config = config or PRICING_CONFIG
+    dimensions = (list(config.table_factors), config.categories, config.finishes, config.colors,
+                  list(config.base_prices), list(config.location_factors))
+    if mode == "eager":
+        return PriceMatrix(*dimensions)
+    elif mode == "lazy":
+        return LazyPriceTables(*dimensions, calculate=(rules or PRICING_RULES).price, maxsize=PRICE_CACHE_SIZE)
+    raise ValueError(f"Unknown pricing mode: {mode}. Use 'eager' or 'lazy'.")
+
+def get_price(table, product, location, snapshot=None):
+    """Get price for a product based on table, product attributes, and location, at snapshot's version (default current)."""
+    return (snapshot or PRICING).price_tables.price(table, product, location)
 
-populate_price_tables()
+# ---------------------------
+# Pricing Snapshots and Hot Reload
+# ---------------------------
+_pricing_versions = count(1)
+_reload_lock = threading.Lock()  # one reload at a time; readers never take it
+reload_stats = ReloadStats()
+pricing_watcher = None
+
+def pricing_fingerprint(config=None):
+    """Snapshot of the settings prices are computed from; changes whenever one of them is edited."""
+    config = config or PRICING_CONFIG
+    return (tuple(config.location_factors.items()), tuple(config.tax_rates.items()),
+            tuple(config.base_prices.items()), tuple(config.table_factors.items()), tuple(config.overrides))
+
+def build_pricing_snapshot(config, source=None, mode=PRICING_MODE, populate=True, price_tables=None):
+    """
+    Compile config and compute its prices into a new PricingSnapshot, without installing
+    it. price_tables, if given, already holds config's prices and is used as is.
+    """
+    rules = compile_rules(config)
+    if price_tables is None:
+        price_tables = create_price_tables(mode, config, rules)
+        if populate and mode == "eager":
+            rules.fill(price_tables)
+    contexts = PricingContextCache(pricing_fingerprint(config))
+    return PricingSnapshot(next(_pricing_versions), config, rules, price_tables, contexts, source)
+
+def install_pricing(snapshot):
+    """
+    Make snapshot the current pricing. Pricing contexts go through the single PRICING
+    reference, so new carts see all of the new version at once; the module-level
+    names are rebound after it for everything else.
+    """
+    global PRICING, PRICING_CONFIG, PRICING_RULES, PRICE_TABLES, pricing_contexts
+    global LOCATIONS, PRICE_FACTORS, BASE_PRICES, TABLE_FACTORS, PRICE_OVERRIDES, TAX_RATES, TABLES
+    global CATEGORIES, FINISHES, COLORS
+    PRICING = snapshot
+    config = snapshot.config
+    PRICING_CONFIG, PRICING_RULES, PRICE_TABLES, pricing_contexts = config, snapshot.rules, snapshot.price_tables, snapshot.contexts
+    LOCATIONS, TABLES = list(config.location_factors), list(config.table_factors)
+    PRICE_FACTORS, BASE_PRICES, TABLE_FACTORS = config.location_factors, config.base_prices, config.table_factors
+    PRICE_OVERRIDES, TAX_RATES = config.overrides, config.tax_rates
+    CATEGORIES, FINISHES, COLORS = config.categories, config.finishes, config.colors
+    return snapshot
+
+def refresh_price_tables():
+    """Rebuild the current config's rules and prices as a new version after it was edited in place."""
+    with _reload_lock:
+        return install_pricing(build_pricing_snapshot(PRICING.config, source=PRICING.source))
+
+def _check_catalog_dimensions(config):
+    current = PRICING.config
+    for name in ("categories", "finishes", "colors"):
+        if getattr(config, name) != getattr(current, name):
+            raise ValueError(f"Changing {name} needs a restart: the product catalog is built from them.")
+    if list(config.base_prices) != list(current.base_prices):
+        raise ValueError("Changing weights needs a restart: the product catalog is built from them.")
+
+def reload_pricing(path=None):
+    """
+    Load the pricing config at path (default SALES_PRICING_CONFIG) and swap it in as a
+    new version. Carts already open keep the version they started with. On any error
+    the current version stays in place and the error is raised.
+    """
+    path = path or PRICING_CONFIG_FILE
+    if not path:
+        raise ValueError("No pricing config file to reload. Set SALES_PRICING_CONFIG.")
+    start = time.perf_counter()
+    try:
+        config = load_pricing_config(path)
+        with _reload_lock:
+            _check_catalog_dimensions(config)
+            snapshot = install_pricing(build_pricing_snapshot(config, source=path))
+    except (OSError, ValueError) as exc:
+        reload_stats.record_failure(exc)
+        raise
+    reload_stats.record(time.perf_counter() - start)
+    return snapshot
+
+def watch_pricing_config(path=None, interval=None):
+    """Reload pricing whenever the config file changes, checking every interval seconds."""
+    global pricing_watcher
+    if pricing_watcher is not None:
+        pricing_watcher.stop()
+    path = path or PRICING_CONFIG_FILE
+    if not path:
+        raise ValueError("No pricing config file to watch. Set SALES_PRICING_CONFIG.")
+    pricing_watcher = ConfigWatcher(path, reload_pricing, interval or PRICING_RELOAD_INTERVAL or 1.0).start()
+    return pricing_watcher
+
+# ---------------------------
+# Compiled Catalog Snapshot
+# ---------------------------
+def catalog_hash(config=None):
+    """Hash of everything the price matrix and catalog are derived from, stored in compiled snapshots."""
+    return config_hash(pricing_config_to_dict(config or PRICING_CONFIG),
+                       {'base_cost_per_500ml': BASE_COST_PER_500ML, 'first_product_code': FIRST_PRODUCT_CODE,
+                        'flammable_colors': FLAMMABLE_COLORS})
+
+def _load_compiled_catalog(path):
+    """The catalog snapshot at path if it matches the current config, else None (after saying why)."""
+    snapshot = load_catalog_snapshot(path, catalog_hash())
+    if snapshot is None:
+        print(f"Catalog snapshot {path} is missing or was compiled from another pricing config; "
+              f"rebuilding prices and catalog. Run compile_catalog.py to update it.", file=sys.stderr)
+    return snapshot
+
+compiled_catalog = _load_compiled_catalog(CATALOG_SNAPSHOT) if CATALOG_SNAPSHOT and PRICING_MODE == "eager" else None
+
+PRICING = install_pricing(build_pricing_snapshot(PRICING_CONFIG, source=PRICING_CONFIG_FILE,
+                                                 price_tables=compiled_catalog.prices if compiled_catalog else None))
 
-def get_price(table, product, location):
-    """Get price for a product based on table, product attributes, and location."""
-    product_key = (product.category, product.finish, product.color, product.weight, location)
-    table_prices = PRICE_TABLES.get(table, {})
-    return table_prices.get(product_key, None)
+# ---------------------------
+# Pricing Contexts
+# ---------------------------
+def _context_entry(product, table, location, snapshot=None):
+    """ContextEntry for one product, or None if the table/location has no price for it."""
+    snapshot = snapshot or PRICING
+    base_price = get_price(table, product, location, snapshot)
+    if base_price is None:
+        return None
+    tax_rate = to_rate(snapshot.config.tax_rates.get(location, 0)) if product.flammable else 0
+    return ContextEntry(to_cents(base_price), tax_rate, product.weight, product.flammable, to_cents(product.cost))
+
+def build_pricing_context(table, location, snapshot=None):
+    """
+    PricingContext for table and location at snapshot's version (the current one by
+    default). Eager price tables are read for every catalog product up front; lazy ones
+    are left to price each product when an order uses it, through their bounded cache.
+    Products without an entry are always priced at snapshot's version.
+    """
+    snapshot = snapshot or PRICING
+    entries = {}
+    if not isinstance(snapshot.price_tables, LazyPriceTables):
+        for product in products.values():
+            entry = _context_entry(product, table, location, snapshot)
+            if entry is not None:
+                entries[product.code] = entry
+    return PricingContext(table, location, snapshot.version, entries,
+                          resolve=lambda product: _context_entry(product, table, location, snapshot))
+
+def get_pricing_context(table, location):
+    """
+    Cached PricingContext for table and location at the current pricing version. Editing
+    PRICE_FACTORS, TAX_RATES, BASE_PRICES, TABLE_FACTORS or PRICE_OVERRIDES in place
+    makes the next call rebuild the prices as a new version.
+    """
+    snapshot = PRICING
+    fingerprint = pricing_fingerprint(snapshot.config)
+    if fingerprint != snapshot.contexts.fingerprint:
+        snapshot = refresh_price_tables()
+    return snapshot.contexts.get(table, location, fingerprint,
+                                 lambda table, location, _: build_pricing_context(table, location, snapshot))
+
+if PRICING_CONFIG_FILE and PRICING_RELOAD_INTERVAL > 0:
+    watch_pricing_config()
 
 # ---------------------------
 # Domain Classes
 # ---------------------------
 class Customer:
+    __slots__ = ('customer_id', 'name', 'address', 'email', 'phone', 'seller_id', 'block', '_order_history')
+
     def __init__(self, customer_id: int, name: str, address: str, email: str, phone: str, seller_id: int, block: bool = False):
         self.customer_id = customer_id
         self.name = name
@@ -77,15 +289,14 @@ class Customer:
     def __str__(self) -> str:
         return f"Customer(customer_id='{self.customer_id}', name='{self.name}', address='{self.address}', email='{self.email}', phone='{self.phone}', seller_id='{self.seller_id}', block={self.block})"
 
- #   def add_to_order_history(self, order_details: dict) -> None:  #idea to the end of program
-      #  """Add an order to customer's history."""
-      #  self._order_history.append({
-        #    'date': datetime.now(),
-         #   **order_details
-     #   })
+    def add_to_order_history(self, order_details: dict) -> None:
+        """Add an order to customer's history."""
+        self._order_history.append({
+            'date': datetime.now(),
+            **order_details
+        })
 
-@dataclass
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Product:
     category: str
     finish: str
@@ -96,39 +307,49 @@ class Product:
     cost: float = 0.0
 
 class Seller(Customer):
+    __slots__ = ('_commission_cents', '_commission_lock', '_sales_history')
+
     def __init__(self, customer_id: int, name: str, address: str, email: str, phone: str, block: bool = False):
         super().__init__(customer_id, name, address, email, phone, None, block)
-        self._total_commission = 0.0
+        self._commission_cents = 0
+        self._commission_lock = threading.Lock()  # orders for one seller may be priced on several threads
         self._sales_history = []
 
     def calculate_commission(self, total_price: float, commission_rate: float) -> float:
-        """Calculate commission for a sale."""
-        commission = (commission_rate / 100) * total_price
-        self._total_commission += commission
+        """Calculate commission for a sale, rounded to the cent."""
+        return from_cents(self.calculate_commission_cents(to_cents(total_price), commission_rate))
+
+    def calculate_commission_cents(self, total_cents: int, commission_rate: float) -> int:
+        """Calculate commission in cents for a sale of total_cents."""
+        commission = apply_rate(total_cents, percent_to_rate(commission_rate))
+        with self._commission_lock:
+            self._commission_cents += commission
         return commission
 
- #   def record_sale(self, customer_id: int, total_price: float, commission: float) -> None:  #idea to the end of program
-     #   """Record a sale in seller's history."""
-    #    self._sales_history.append({
-      #      'date': datetime.now(),
-       #     'customer_id': customer_id,
-       #     'total_price': total_price,
-       #     'commission': commission
-     #   })
+    def record_sale(self, customer_id: int, total_price: float, commission: float) -> None:
+        """Record a sale in seller's history."""
+        self._sales_history.append({
+            'date': datetime.now(),
+            'customer_id': customer_id,
+            'total_price': total_price,
+            'commission': commission
+        })
 
     def get_total_commission(self) -> float:
         """Get total commission earned."""
-        return self._total_commission
+        return from_cents(self._commission_cents)
 
 class Transport(Customer):
+     __slots__ = ('cost', 'sender')
+
      def __init__(self, customer_id: int, name: str,  address: str, email: str, phone: str, block:  bool=False, cost: float = 0.0):
          super().__init__(customer_id, name, address, email, phone, None, block)
          self.cost = cost
          self.sender = False
 
-     def calculate_transport_fee(self, total_weight_ml: float) -> float:
-         """Calculates the transport fee based on total weight in kg."""
-         if self.sender:
+     def calculate_transport_fee(self, total_weight_ml: float, sender: Optional[bool] = None) -> float:
+         """Calculates the transport fee based on total weight in kg (sender defaults to self.sender)."""
+         if self.sender if sender is None else sender:
              total_weight_kg = total_weight_ml / 1000.0
              return total_weight_kg * self.cost
          else:
@@ -159,22 +380,77 @@ customer_dict = {customer.customer_id: customer for customer in customers}
 seller_dict = {seller.customer_id: seller for seller in sellers}
 transport_dict = {transport.customer_id: transport for transport in transportation_list}
 
-code_counter = 100
-products = {}
+CATALOG_FILE = os.environ.get("SALES_CATALOG_FILE")
+
+def iter_price_keys():
+    """Yield every (category, finish, color, weight, location) key of every price table, in table order."""
+    for table in PRICE_TABLES.keys():
+        yield from PRICE_TABLES[table].keys()
 
-code_counter = 100
-products = {}
-for table in PRICE_TABLES.keys():
-    for table_key in PRICE_TABLES[table].keys():
-        category, finish, color, weight, _ = table_key
+def build_catalog(price_keys, start_code=FIRST_PRODUCT_CODE):
+    """
+    Build the products dict from price keys. Each distinct (category, finish, color, weight)
+    gets the next code in first-seen order, so codes are stable for the same price tables.
+    """
+    catalog = {}
+    seen = set()
+    code_counter = start_code
+    for category, finish, color, weight, _ in price_keys:
+        attributes = (category, finish, color, weight)
+        if attributes in seen:
+            continue
+        seen.add(attributes)
         product_cost = (weight / 500.0) * BASE_COST_PER_500ML
+        flammable = color in FLAMMABLE_COLORS
+        catalog[code_counter] = Product(category, finish, color, weight, f"P{code_counter}", flammable, cost=product_cost)
+        code_counter += 1
+    return catalog
+
+def save_catalog(catalog, path):
+    """Write a catalog to a JSON file that load_catalog can read back."""
+    records = [{'id': product_id, **asdict(product)} for product_id, product in catalog.items()]
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({'version': 1, 'products': records}, f)
+
+def load_catalog(path):
+    """Read a catalog written by save_catalog."""
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get('version') != 1:
+        raise ValueError(f"Unsupported catalog file version: {data.get('version')}.")
+    return {record.pop('id'): Product(**record) for record in data['products']}
+
+with metrics.timer("catalog_build"):
+    if compiled_catalog is not None:
+        products = compiled_catalog.products(Product)
+    elif CATALOG_FILE and os.path.exists(CATALOG_FILE):
+        products = load_catalog(CATALOG_FILE)
+    else:
+        products = build_catalog(iter_price_keys())
+
+# ---------------------------
+# Product Search
+# ---------------------------
+PRODUCT_SEARCH_PAGE_SIZE = 20
+product_index = None  # ProductIndex over products, see build_product_index
 
-        if (category, finish, color, weight) not in [(p.category, p.finish, p.color, p.weight) for p in products.values()]:
-            code = f"P{code_counter}"
-            flammable = color in ["black", "green"]
-            product = Product(category, finish, color, weight, code, flammable, cost=product_cost)
-            products[code_counter] = product
-            code_counter += 1
+def build_product_index():
+    """(Re)build the attribute indexes over products. Call after replacing the catalog."""
+    global product_index
+    product_index = ProductIndex(products)
+    return product_index
+
+def find_products(query=None, page=1, page_size=PRODUCT_SEARCH_PAGE_SIZE, **criteria):
+    """
+    One ProductPage of the catalog products matching a free-text query ("semibrilho white
+    2000ml") and/or attribute criteria (color="white", weight=[1000, 2000], flammable=False).
+    """
+    if query:
+        criteria = {**product_index.parse_query(query), **criteria}
+    return product_index.search(page, page_size, **criteria)
+
+with metrics.timer("product_index_build"):
+    build_product_index()
 
 # ---------------------------
 # Helper Lookup Functions
@@ -185,85 +461,294 @@ def get_customer_by_id(customer_id):
 def get_seller_by_id(seller_id):
     return seller_dict.get(seller_id, None)
 
+# ---------------------------
+# Order History
+# ---------------------------
+ORDER_STORE_PATH = os.environ.get("SALES_ORDER_STORE")
+_order_store = None
+
+def get_order_store():
+    """Open the order store named by SALES_ORDER_STORE on first use. None if it is not set."""
+    global _order_store
+    if _order_store is None and ORDER_STORE_PATH:
+        _order_store = OrderStore(ORDER_STORE_PATH)
+    return _order_store
+
+def record_order(customer, seller, order):
+    """Add a finished order to the customer's and seller's history and to the order store, if configured."""
+    customer.add_to_order_history(order)
+    seller.record_sale(customer.customer_id, order['total_price'], order['commission'])
+    store = get_order_store()
+    if store is not None:
+        store.add_order(order)
+    metrics.incr("orders_recorded")
+
 # ---------------------------
 # Order Processing Helper Functions
 # ---------------------------
-def _delete_product(del_code, customer, table, customer_product_list, products, total_price, total_weight, flammable_weight, non_flammable_weight, volumes):
-    """Helper function to delete a product from the order."""
-    apply_discount = lambda price, discount: price - (price * discount / 100)
-    calculate_tax = lambda price, flammable: price * TAX_RATES.get(customer.address, 0) if flammable else 0
-    if del_code in customer_product_list:
-        quantity, discount = customer_product_list.pop(del_code)
-        product = products[del_code]
-        base_price = get_price(table, product, customer.address)
-        if base_price is not None:
-            discounted_price = apply_discount(base_price, discount)
-            tax = calculate_tax(discounted_price, product.flammable)
-            item_total_price = (discounted_price + tax) * quantity
-            total_price -= item_total_price
-            total_weight -= product.weight * quantity
-            if product.flammable:
-                flammable_weight -= product.weight * quantity
-            else:
-                non_flammable_weight -= product.weight * quantity
-            if product.weight == 500:
-                volumes[500] -= quantity // 4
-            else:
-                volumes[product.weight] -= quantity
-            print(f"Product {products[del_code]} has been removed successfully!")
-            return total_price, total_weight, flammable_weight, non_flammable_weight, volumes, True
+def _price_line_cents(product, quantity, discount, table, location):
+    """
+    Price one order line in int cents (see money for the rounding rules). Returns None
+    if the table/location has no price for the product.
+    """
+    return _context_line(get_pricing_context(table, location), product, quantity, discount)
+
+def _context_line(context, product, quantity, discount):
+    """Price one line with a PricingContext, at its version. Returns None if the product has no price there."""
+    entry = context.entry(product)
+    if entry is None:
+        return None
+    return context.price_line(entry, quantity, discount)
+
+def _price_line(product, quantity, discount, table, location):
+    """Price one order line, in currency units. Returns None if the table/location has no price for the product."""
+    line = _price_line_cents(product, quantity, discount, table, location)
+    return None if line is None else {key: from_cents(cents) for key, cents in line.items()}
+
+def _validate_line(product, quantity, discount):
+    """Return an error message for an invalid quantity/discount, or None if the line is valid."""
+    if quantity <= 0:
+        return "Quantity must be a positive number."
+    if product.weight == 500 and quantity % 4 != 0:
+        return "Quantity for 500ml products must be a multiple of 4."
+    if not 0 <= discount <= 100:
+        return "Discount must be between 0 and 100."
+    return None
+
+class Cart:
+    """
+    Product lines of one order with running totals. Every edit prices only the line
+    it touches and adjusts the totals by the difference, so the summary is available
+    at any time without recomputing the whole order. Money totals are kept in int
+    cents, so they are exact however many edits are made. Lines are priced with the
+    PricingContext for the table and the customer's location, taken when the cart is
+    opened, so a pricing reload never changes an order in progress.
+    """
+    def __init__(self, customer, table):
+        self.customer = customer
+        self.table = table
+        self.context = get_pricing_context(table, customer.address)
+        self.items = {}  # code (str) -> (quantity, discount), same shape as customer_product_list
+        self.lines = {}  # code (str) -> priced line from _price_line
+        self._line_cents = {}  # code (str) -> priced line from _price_line_cents
+        self._reset_totals()
+
+    def _reset_totals(self):
+        self.total_price_cents = 0
+        self.total_weight = 0
+        self.flammable_weight = 0
+        self.non_flammable_weight = 0
+        self.volumes = dict.fromkeys(BASE_PRICES, 0)
+        self.total_cost_cents = 0
+
+    @property
+    def pricing_version(self):
+        return self.context.version
+
+    @property
+    def total_price(self):
+        return from_cents(self.total_price_cents)
+
+    @property
+    def total_cost(self):
+        return from_cents(self.total_cost_cents)
+
+    def _apply(self, product, quantity, line, sign):
+        """Add (sign=1) or remove (sign=-1) one line's contribution (in cents) to the totals."""
+        weight = product.weight * quantity
+        self.total_price_cents += sign * line['line_total_with_tax']
+        self.total_cost_cents += sign * line['line_cost']
+        self.total_weight += sign * weight
+        if product.flammable:
+            self.flammable_weight += sign * weight
         else:
-            print("Invalid table number or location.")
-            return total_price, total_weight, flammable_weight, non_flammable_weight, volumes, False
-    else:
-        print("Product code not found in the list.")
-        return total_price, total_weight, flammable_weight, non_flammable_weight, volumes, False
+            self.non_flammable_weight += sign * weight
+        if product.weight == 500:
+            self.volumes[500] += sign * (quantity // 4)
+        else:
+            self.volumes[product.weight] += sign * quantity
+
+    def _product(self, code):
+        try:
+            return products[int(code)]
+        except (KeyError, ValueError):
+            raise ValueError(f"Invalid product code: {code}.") from None
+
+    def _set(self, code, quantity, discount):
+        product = self._product(code)
+        error = _validate_line(product, quantity, discount)
+        if error:
+            raise ValueError(error)
+        line = _context_line(self.context, product, quantity, discount)
+        if line is None:
+            raise ValueError("Invalid table number or location.")
+        if code in self.items:
+            self._apply(product, self.items[code][0], self._line_cents[code], -1)
+        self.items[code] = (quantity, discount)
+        self._line_cents[code] = line
+        self.lines[code] = {key: from_cents(cents) for key, cents in line.items()}
+        self._apply(product, quantity, line, 1)
+        return self.lines[code]
+
+    def add(self, code, quantity, discount):
+        """Add a new product line and return its priced line."""
+        code = str(code).strip()
+        if code in self.items:
+            raise ValueError("This product is already in your list.")
+        return self._set(code, quantity, discount)
+
+    def remove(self, code):
+        """Remove a product line."""
+        if code not in self.items:
+            raise ValueError("Product code not found in the list.")
+        quantity, _ = self.items.pop(code)
+        del self.lines[code]
+        self._apply(self._product(code), quantity, self._line_cents.pop(code), -1)
+
+    def set_quantity(self, code, quantity):
+        if code not in self.items:
+            raise ValueError("Product code not found in the list.")
+        return self._set(code, quantity, self.items[code][1])
+
+    def set_discount(self, code, discount):
+        if code not in self.items:
+            raise ValueError("Product code not found in the list.")
+        return self._set(code, self.items[code][0], discount)
+
+    def __len__(self):
+        return len(self.items)
+
+    def __contains__(self, code):
+        return code in self.items
+
+class OrderSession:
+    """
+    Everything one order holds while it is being taken: participants, table, payment
+    conditions, the cart and the transport choice. The shared Transport is never
+    modified (whether it is the sender is kept here), so sessions for different
+    orders can be priced at the same time on different threads. The only shared
+    state an order changes is its seller's commission total, under the seller's lock.
+    """
+    def __init__(self, customer, seller, commission_rate, table, payment_conditions=()):
+        self.customer = customer
+        self.seller = seller
+        self.commission_rate = commission_rate
+        self.table = table
+        self.payment_conditions = list(payment_conditions)
+        self.cart = Cart(customer, table)
+        self.transport = None
+        self.sender = False
+        self.commission_cents = None  # set once the commission is charged to the seller
+
+    def set_transport(self, transport, sender=False):
+        self.transport = transport
+        self.sender = sender
+
+    @property
+    def transport_fee_cents(self):
+        if self.transport is None:
+            return 0
+        return to_cents(self.transport.calculate_transport_fee(self.cart.total_weight, self.sender))
+
+    @property
+    def total_price_cents(self):
+        return self.cart.total_price_cents + self.transport_fee_cents
+
+    def charge_commission(self):
+        """Add the commission on the products (transport fee excluded) to the seller's total, once. Returns it in cents."""
+        if self.commission_cents is None:
+            self.commission_cents = self.seller.calculate_commission_cents(self.cart.total_price_cents, self.commission_rate)
+        return self.commission_cents
+
+    def installment_cents(self):
+        """The final total split over the payment conditions; leftover cents go to the first installments."""
+        if not self.payment_conditions:
+            return []
+        return split(self.total_price_cents, len(self.payment_conditions))
+
+    def priced_order(self):
+        """The finished order in price_order's format. Charges the commission."""
+        cart = self.cart
+        commission_cents = self.charge_commission()
+        transport_fee_cents = self.transport_fee_cents
+        return {
+            'customer_id': self.customer.customer_id,
+            'seller_id': self.seller.customer_id,
+            'transport_id': self.transport.customer_id if self.transport is not None else None,
+            'table': self.table,
+            'lines': [{'code': code, 'quantity': quantity, 'discount': discount, **cart.lines[code]}
+                      for code, (quantity, discount) in cart.items.items()],
+            'total_products': len(cart),
+            'total_price_before_transport': cart.total_price,
+            'transport_fee': from_cents(transport_fee_cents),
+            'total_price': from_cents(cart.total_price_cents + transport_fee_cents),
+            'total_weight': cart.total_weight,
+            'flammable_weight': cart.flammable_weight,
+            'non_flammable_weight': cart.non_flammable_weight,
+            'volumes': cart.volumes,
+            'commission': from_cents(commission_cents),
+            'total_cost': from_cents(cart.total_cost_cents + commission_cents),
+            'installments': [{'days': days, 'amount': from_cents(cents)}
+                              for days, cents in zip(self.payment_conditions, self.installment_cents())],
+            'pricing_version': cart.pricing_version,
+        }
+
+def _print_running_totals(cart):
+    """Print the cart's current totals."""
+    print(f"\nProducts in order: {len(cart)}")
+    print(f"Running total (before Transport Fee): ${cart.total_price:.2f}")
+    print(f"Total weight: {cart.total_weight} ml (flammable {cart.flammable_weight} ml, non-flammable {cart.non_flammable_weight} ml)")
+    print("Volumes: " + ", ".join(f"{weight} ml: {volume}" for weight, volume in cart.volumes.items()))
+
+def _delete_product(del_code, cart):
+    """Helper function to delete a product from the order."""
+    product = products.get(int(del_code)) if del_code.strip().isdigit() else None
+    try:
+        cart.remove(del_code)
+    except ValueError as exc:
+        print(exc)
+        return False
+    print(f"Product {product} has been removed successfully!")
+    return True
 
-def _change_quantity(qua_code, customer_product_list, products):
+def _change_quantity(qua_code, cart):
     """Helper function to change the quantity of a product in the order."""
-    if qua_code in customer_product_list:
-        _, discount = customer_product_list[qua_code]
+    if qua_code in cart:
         new_quantity = int(input(f"Enter the new quantity for product {qua_code}: "))
-        if new_quantity <= 0:
-            print("Quantity must be a positive number. Please try again.")
-            return False
-        elif products[qua_code].weight == 500 and new_quantity % 4 != 0:
-            print("Quantity for 500ml products must be a multiple of 4. Please try again.")
+        try:
+            cart.set_quantity(qua_code, new_quantity)
+        except ValueError as exc:
+            print(f"{exc} Please try again.")
             return False
-        else:
-            customer_product_list[qua_code] = (new_quantity, discount)
-            print(f"Quantity for product {qua_code} has been updated to {new_quantity}.")
-            return True
+        print(f"Quantity for product {qua_code} has been updated to {new_quantity}.")
+        return True
     else:
         print("Product code not found in the list.")
         return False
 
-def _apply_discount_to_product(disc_code, customer_product_list):
+def _apply_discount_to_product(disc_code, cart):
     """Helper function to apply a discount to a product in the order."""
-    if disc_code in customer_product_list:
-        quantity, _ = customer_product_list[disc_code]
+    if disc_code in cart:
         new_discount = float(input(f"Enter the new discount for product {disc_code} (0-100): "))
-        if 0 <= new_discount <= 100:
-            customer_product_list[disc_code] = (quantity, new_discount)
-            print(f"Discount for product {disc_code} has been updated to {new_discount}%.")
-            return True
-        else:
-            print("Discount must be between 0 and 100. Please try again.")
+        try:
+            cart.set_discount(disc_code, new_discount)
+        except ValueError as exc:
+            print(f"{exc} Please try again.")
             return False
+        print(f"Discount for product {disc_code} has been updated to {new_discount}%.")
+        return True
     else:
         print("Product code not found in the list.")
         return False
 
-def _add_new_product(product_code, customer, table, customer_product_list, products, total_price, total_weight, flammable_weight, non_flammable_weight, volumes):
+def _add_new_product(product_code, cart):
     """Helper function to add a new product to the order."""
-    apply_discount = lambda price, discount: price - (price * discount / 100)
-    calculate_tax = lambda price, flammable: price * TAX_RATES.get(customer.address, 0) if flammable else 0
     try:
         product_code_int = int(product_code)
         if product_code_int in products:
-            if product_code in customer_product_list:
+            if product_code in cart:
                 print("This product is already in your list.")
-                return total_price, total_weight, flammable_weight, non_flammable_weight, volumes, False
+                return False
             else:
                 product = products[product_code_int]
                 while True:
@@ -286,36 +771,47 @@ def _add_new_product(product_code, customer, table, customer_product_list, produ
                             print("Discount must be between 0 and 100. Please try again.")
                     except ValueError:
                         print("Invalid input. Please enter a valid numeric discount.")
-                customer_product_list[product_code] = (quantity, discount)
-                base_price = get_price(table, product, customer.address)
-                if base_price is not None:
-                    discounted_price = apply_discount(base_price, discount)
-                    tax = calculate_tax(discounted_price, product.flammable)
-                    item_total_price = (discounted_price + tax) * quantity
-                    total_price += item_total_price
-                    total_weight += product.weight * quantity
-                    if product.flammable:
-                        flammable_weight += product.weight * quantity
-                    else:
-                        non_flammable_weight += product.weight * quantity
-                    if product.weight == 500:
-                        volumes[500] += quantity // 4
-                    else:
-                        volumes[product.weight] += quantity
-                    print(f"Product {products[product_code_int]} has been added successfully!")
-                    print(f"Subtotal price of {quantity} unit(s) of product {product_code} with discount and tax is ${item_total_price:.2f}")
-                    return total_price, total_weight, flammable_weight, non_flammable_weight, volumes, True
-                else:
-                    print("Invalid table number or location.")
-                    return total_price, total_weight, flammable_weight, non_flammable_weight, volumes, False
+                try:
+                    line = cart.add(product_code, quantity, discount)
+                except ValueError as exc:
+                    print(exc)
+                    return False
+                print(f"Product {product.code} ({product.category}, {product.weight}ml) added successfully!")
+                print(f"Subtotal price of {quantity} unit(s) of product {product_code} with discount and tax is ${line['line_total_with_tax']:.2f}")
+                return True
         else:
-            print("Invalid product code. Please try again.")
-            return total_price, total_weight, flammable_weight, non_flammable_weight, volumes, False
+            print(f"Invalid product code: {product_code}. Please try again.")
+            return False
     except ValueError:
-        print("Invalid product code format.") # Added for robustness
-        return total_price, total_weight, flammable_weight, non_flammable_weight, volumes, False
+        print("Invalid input. Please enter a valid product code or an option number.")
+        return False
 
 
+def _find_products(cart):
+    """Search the catalog by attributes and show the matches, with this order's base prices, a page at a time."""
+    query = input("Enter product attributes to search for (e.g., semibrilho white 2000ml): ")
+    try:
+        criteria = product_index.parse_query(query)
+    except ValueError as exc:
+        print(exc)
+        return
+    page_number = 1
+    while True:
+        page = product_index.search(page_number, PRODUCT_SEARCH_PAGE_SIZE, **criteria)
+        if not page.total:
+            print("No products match.")
+            return
+        rows = list(listing_rows(page, lambda product: _base_price(cart.context, product)))
+        print(render_table(rows, LISTING_COLUMNS + ['Price']))
+        print(f"Page {page.page} of {page.pages} ({page.total} products)")
+        if page.page >= page.pages or input("Enter 'n' for the next page, or press Enter to go back: ").strip().lower() != 'n':
+            return
+        page_number += 1
+
+def _base_price(context, product):
+    entry = context.entry(product)
+    return from_cents(entry.base_cents) if entry is not None else 'N/A'
+
 def _get_payment_conditions():
     """Gets valid payment installment days from the user."""
     while True:
@@ -347,29 +843,60 @@ def _get_payment_conditions():
         else:
             print("Please try again.")
 
+# ---------------------------
+# Order Summary Output
+# ---------------------------
+ORDER_SUMMARY_COLUMNS = ['Code', 'Product name', 'Unit Price (before Tax)', 'Total (before Tax)', 'Tax Amount', 'Line Total (incl Tax)']
+ORDER_SUMMARY_COL_SPACE = {'Code': 6, 'Product name': 30, 'Unit Price (before Tax)': 18, 'Total (before Tax)': 15, 'Tax Amount': 10, 'Line Total (incl Tax)': 18}
+
+def product_name(product):
+    return f"{product.category} ({product.finish}, {product.color}, {product.weight}ml)"
+
+def order_summary_row(code, line):
+    """One Order Summary row for a priced line. Amounts stay numbers; writers format them."""
+    return {
+        'Code': code,
+        'Product name': product_name(products[int(code)]),
+        'Unit Price (before Tax)': line['unit_price_before_tax'],
+        'Total (before Tax)': line['item_total_before_tax'],
+        'Tax Amount': line['line_tax_amount'],
+        'Line Total (incl Tax)': line['line_total_with_tax'],
+    }
+
+def iter_order_summary_rows(cart):
+    """Yield the Order Summary rows of a cart one at a time."""
+    for code, line in cart.lines.items():
+        yield order_summary_row(code, line)
+
+def order_summary_dataframe(cart):
+    """The Order Summary of a cart as a pandas DataFrame; pandas is imported on the first call."""
+    return to_dataframe(iter_order_summary_rows(cart), ORDER_SUMMARY_COLUMNS)
+
+def write_order_summary(cart, out, fmt="text"):
+    """
+    Stream the Order Summary of a cart to out as text, CSV or JSONL. Text columns are
+    sized in a first pass over the cart, so the layout matches render_table without
+    building the rows up front.
+    """
+    widths = column_widths(iter_order_summary_rows(cart), ORDER_SUMMARY_COLUMNS, ORDER_SUMMARY_COL_SPACE) if fmt == "text" else None
+    return write_table(iter_order_summary_rows(cart), out, fmt, ORDER_SUMMARY_COLUMNS, widths)
+
 # ---------------------------
 # Order Processing Functionality (Refactored)
 # ---------------------------
-import pandas as pd # Make sure this is at the top of your script
 
 def add_products_by_code(customer, seller, commission_rate, table, payment_conditions):
     """
     Allow adding, deleting, and modifying products by their code. Calculates totals
     and applies commissions.
     """
-    customer_product_list = {}
-    total_price = 0 # This will accumulate the Line Total (incl Tax) for all products + transport fee
-    total_weight = 0
-    flammable_weight = 0
-    non_flammable_weight = 0
-    volumes = {500: 0, 1000: 0, 2000: 0}
+    session = OrderSession(customer, seller, commission_rate, table, payment_conditions)
+    cart = session.cart # Keeps line prices and running totals up to date on every edit
+    customer_product_list = cart.items
     transport_info_entered = False
     transport = None # Initialize transport to None outside the loop
     final_transport_fee = 0 # Initialize final_transport_fee outside the loop
 
-    apply_discount = lambda price, discount: price - (price * discount / 100)
-    calculate_tax_rate_amount = lambda price, flammable, tax_rate: price * tax_rate if flammable else 0
-
     print("\nOrder Processing:")
     while True:
         print("\nEnter product code to add (or choose an option):")
@@ -378,27 +905,26 @@ def add_products_by_code(customer, seller, commission_rate, table, payment_condi
         print("  4. Change Discount")
         print("  5. Enter Transport Information")
         print("  6. Finish Order")
+        print("  7. Show Running Totals")
+        print("  8. Find Products")
         user_input = input("Enter code or option number: ").strip()
 
         if user_input == '2':
             try:
                 del_code = input("Enter the product code to delete: ")
-                # Recalculation logic in option 6 will handle overall totals correctly
-                _delete_product(del_code, customer, table, customer_product_list, products, total_price, total_weight, flammable_weight, non_flammable_weight, volumes)
+                _delete_product(del_code, cart)
             except ValueError:
                 print("Invalid product code. Please enter a valid code.")
         elif user_input == '3':
             try:
                 qua_code = input("Enter the product code to change quantity for: ")
-                _change_quantity(qua_code, customer_product_list, products)
-                 # Recalculation logic in option 6 will handle overall totals correctly
+                _change_quantity(qua_code, cart)
             except ValueError:
                 print("Invalid product code. Please enter a valid code.")
         elif user_input == '4':
             try:
                 disc_code = input("Enter the product code to change discount for: ")
-                _apply_discount_to_product(disc_code, customer_product_list)
-                 # Recalculation logic in option 6 will handle overall totals correctly
+                _apply_discount_to_product(disc_code, cart)
             except ValueError:
                 print("Invalid product code. Please enter a valid code.")
         elif user_input == '5':
@@ -425,12 +951,12 @@ def add_products_by_code(customer, seller, commission_rate, table, payment_condi
                 while True:
                     sender_input = input(f"Is '{transport.name}' the sender? (yes/no): ").lower()
                     if sender_input == 'yes':
-                        transport.sender = True
+                        session.set_transport(transport, True)
                         # Fee is calculated and added to total_price in option 6 after final weight is known
                         print(f"Transport '{transport.name}' set as sender. Fee will be calculated based on final weight.")
                         break
                     elif sender_input == 'no':
-                        transport.sender = False
+                        session.set_transport(transport, False)
                         print(f"Transport '{transport.name}' has been recorded for this order. Not the sender.")
                         break
                     else:
@@ -440,71 +966,24 @@ def add_products_by_code(customer, seller, commission_rate, table, payment_condi
             if not transport_info_entered:
                 print("Please enter the transport information (option 5) before finishing the order.")
             else:
-                order_data = []
-                # Recalculate totals/weights/volumes/cost here based on customer_product_list
-                total_price = 0 # Reset and recalculate final total price (product totals only initially)
-                total_weight = 0
-                flammable_weight = 0
-                non_flammable_weight = 0
-                volumes = {500: 0, 1000: 0, 2000: 0}
-                total_cost = 0.0 # Initialize total_cost for recalculation (product cost only initially)
-
-                if customer_product_list:
-                    for code, (quantity, discount) in customer_product_list.items():
-                        product = products[int(code)]
-                        base_price = get_price(table, product, customer.address)
-                        if base_price is not None:
-                            discounted_price = apply_discount(base_price, discount)
-                            tax_rate = TAX_RATES.get(customer.address, 0)
-                            tax_amount_per_item = calculate_tax_rate_amount(discounted_price, product.flammable, tax_rate)
-
-                            unit_price_before_tax = discounted_price
-                            unit_price_incl_tax = discounted_price + tax_amount_per_item
-
-                            item_total_before_tax = discounted_price * quantity
-                            line_tax_amount = tax_amount_per_item * quantity
-                            line_total_with_tax = item_total_before_tax + line_tax_amount
-
-                            total_price += line_total_with_tax # Add product line total to running total price
-
-                            # Calculate and add to total_cost (product cost)
-                            line_cost = product.cost * quantity
-                            total_cost += line_cost
-
-
-                            # Recalculate weights and volumes
-                            total_weight += product.weight * quantity
-                            if product.flammable:
-                                flammable_weight += product.weight * quantity
-                            else:
-                                non_flammable_weight += product.weight * quantity
-                            if product.weight == 500:
-                                volumes[500] += quantity // 4
-                            else:
-                                volumes[product.weight] += quantity
-
-
-                            product_name = f"{product.category} ({product.finish}, {product.color}, {product.weight}ml)"
-                            order_data.append({
-                                'Code': code,
-                                'Product name': product_name,
-                                'Unit Price (before Tax)': f"{unit_price_before_tax:.2f}",
-                                'Total (before Tax)': f"{item_total_before_tax:.2f}",
-                                'Tax Amount': f"{line_tax_amount:.2f}",
-                                'Line Total (incl Tax)': f"{line_total_with_tax:.2f}"
-                            })
-
-                    # Calculate and add transport fee to final total if transport is sender
-                    final_transport_fee = 0 # Re-initialize for calculation
-                    if transport and transport.sender:
-                         final_transport_fee = transport.calculate_transport_fee(total_weight)
-                         total_price += final_transport_fee # total_price now includes product totals + transport fee
-
-
-                    if order_data:
-                        df = pd.DataFrame(order_data)
+                with metrics.timer("finish_order"):
+                    # Totals are already up to date in the cart
+                    total_price_cents = cart.total_price_cents
+                    total_weight = cart.total_weight
+                    flammable_weight = cart.flammable_weight
+                    non_flammable_weight = cart.non_flammable_weight
+                    volumes = cart.volumes
+                    total_cost_cents = cart.total_cost_cents
+
+                    if customer_product_list:
+                        # Calculate and add transport fee to final total if transport is sender
+                        final_transport_fee = 0 # Re-initialize for calculation
+                        if session.transport and session.sender:
+                             final_transport_fee = from_cents(session.transport_fee_cents)
+                             total_price_cents += session.transport_fee_cents # now includes product totals + transport fee
+
                         print("\n--- Order Summary ---")
-                        print(df.to_string(index=False, col_space={'Code': 6, 'Product name': 30, 'Unit Price (before Tax)': 18, 'Total (before Tax)': 15, 'Tax Amount': 10, 'Line Total (incl Tax)': 18}))
+                        write_order_summary(cart, sys.stdout)
                         print("--- End of Order Summary ---")
 
                         # Calculate and print total items
@@ -512,49 +991,12 @@ def add_products_by_code(customer, seller, commission_rate, table, payment_condi
                         print(f"\nTotal products: {total_items} items")
 
                 break # Finish order
+        elif user_input == '7':
+            _print_running_totals(cart)
+        elif user_input == '8':
+            _find_products(cart)
         else:
-            product_code_str = user_input
-            try:
-                product_code_int = int(product_code_str) # Ensure code is integer for products dict lookup
-                if product_code_int in products:
-                    # Check if product code (as string) is already in the list
-                    if product_code_str in customer_product_list:
-                        print("This product is already in your list.")
-                        continue # Go back to the menu
-                    else:
-                         # Get quantity and discount for the new product
-                        product = products[product_code_int] # Get product object
-                        while True:
-                            try:
-                                quantity = int(input("Enter the quantity for this product: "))
-                                if quantity <= 0:
-                                    print("Quantity must be a positive number. Please try again.")
-                                elif product.weight == 500 and quantity % 4 != 0:
-                                    print("Quantity for 500ml products must be a multiple of 4. Please try again.")
-                                else:
-                                    break # Valid quantity entered
-                            except ValueError:
-                                print("Invalid input. Please enter a valid numeric quantity.")
-
-                        while True:
-                            try:
-                                discount = float(input("Enter the discount for this product (0-100): "))
-                                if 0 <= discount <= 100:
-                                    break # Valid discount entered
-                                else:
-                                    print("Discount must be between 0 and 100. Please try again.")
-                            except ValueError:
-                                print("Invalid input. Please enter a valid numeric discount.")
-
-                        # Add product and its quantity/discount to customer_product_list
-                        customer_product_list[product_code_str] = (quantity, discount)
-                        print(f"Product {product.code} ({product.category}, {product.weight}ml) added successfully!")
-                        # No need to calculate/update totals here if recalculating in option 6
-
-                else:
-                    print(f"Invalid product code: {product_code_str}. Please try again.")
-            except ValueError:
-                print("Invalid input. Please enter a valid product code or an option number.")
+            _add_new_product(user_input, cart)
 
     # --- Final Summary Section ---
 
@@ -570,7 +1012,7 @@ def add_products_by_code(customer, seller, commission_rate, table, payment_condi
         seller.phone,
         'N/A',
         seller.block,
-        f"${seller._total_commission:.2f}",
+        f"${seller.get_total_commission():.2f}",
         'N/A',
         'N/A'
     ]
@@ -601,7 +1043,7 @@ def add_products_by_code(customer, seller, commission_rate, table, payment_condi
             transport.block,
             'N/A', # Total Commission not applicable
             f"${transport.cost:.2f}" if hasattr(transport, 'cost') else 'N/A',
-            transport.sender if hasattr(transport, 'sender') else 'N/A'
+            session.sender
         ]
     else:
         transport_details = ['N/A'] * len(detail_types)
@@ -613,10 +1055,10 @@ def add_products_by_code(customer, seller, commission_rate, table, payment_condi
         'Transport': transport_details
     }
 
-    df_participants = pd.DataFrame(participants_data)
 
     print("\n--- Order Participants Summary ---")
-    print(df_participants.to_string(index=False, col_space={'Detail Type': 15, 'Seller': 25, 'Customer': 25, 'Transport': 25}))
+    with metrics.timer("render_participants"):
+        print(render_table(columns_to_rows(participants_data), col_space={'Detail Type': 15, 'Seller': 25, 'Customer': 25, 'Transport': 25}))
     print("--- End of Order Participants Summary ---")
 
 
@@ -628,7 +1070,9 @@ def add_products_by_code(customer, seller, commission_rate, table, payment_condi
     # commission is calculated below
     # We will print the updated total_cost after calculating commission
 
-    print(f"\nTotal price for all added products (before Transport Fee): ${total_price - final_transport_fee:.2f}")
+    total_price = from_cents(total_price_cents)
+    products_price_cents = total_price_cents - to_cents(final_transport_fee)
+    print(f"\nTotal price for all added products (before Transport Fee): ${from_cents(products_price_cents):.2f}")
     print(f"Total weight for all added products: {total_weight} ml")
     print(f"Total flammable weight: {flammable_weight} ml")
     print(f"Total non-flammable weight: {non_flammable_weight} ml")
@@ -636,12 +1080,12 @@ def add_products_by_code(customer, seller, commission_rate, table, payment_condi
     print(f"\nFinal Total Order Price (including Transport Fee): ${total_price:.2f}")
 
     # Commission calculation uses total price BEFORE transport fee
-    commission_base_price = total_price - final_transport_fee
-    commission = seller.calculate_commission(commission_base_price, commission_rate)
+    commission_cents = session.charge_commission()
+    commission = from_cents(commission_cents)
     print(f"Commission for the seller at {commission_rate}% is: ${commission:.2f}")
 
     # --- Add commission to total_cost and print ---
-    total_cost += commission # Add commission to product cost
+    total_cost = from_cents(total_cost_cents + commission_cents) # Add commission to product cost
     print(f"\nTotal order cost (products + commission): ${total_cost:.2f}") # Updated print statement
 
 
@@ -653,31 +1097,320 @@ def add_products_by_code(customer, seller, commission_rate, table, payment_condi
     if payment_conditions:
         num_installments = len(payment_conditions)
         if num_installments > 0:
-            price_per_installment = total_price / num_installments # Divide the FINAL total price
+            # Divide the FINAL total price; leftover cents go to the first installments
+            installment_cents = session.installment_cents()
             print("\n--- Payment Schedule ---")
             print(f"Total installments: {num_installments}")
-            for i, days in enumerate(payment_conditions):
-                 print(f"  Installment {i + 1}: ${price_per_installment:.2f} (due in {days} days)")
+            for i, (days, cents) in enumerate(zip(payment_conditions, installment_cents)):
+                 print(f"  Installment {i + 1}: ${from_cents(cents):.2f} (due in {days} days)")
             print("--- End of Payment Schedule ---")
         else:
             print("\nPayment: Full amount due immediately.")
 
+    record_order(customer, seller, session.priced_order())  # same record as price_order and batch.py
 
     return customer_product_list, total_price, total_weight, flammable_weight, volumes
 
 
+# ---------------------------
+# Headless Order Processing
+# ---------------------------
+def price_order(customer, seller, commission_rate, table, payment_conditions, items, transport=None, sender=False):
+    """
+    Price a complete order without prompting. `items` maps product code (str) to
+    (quantity, discount), the same shape as customer_product_list. Raises ValueError
+    for anything the interactive flow would have rejected.
+    """
+    if table not in PRICE_TABLES:
+        raise ValueError(f"Invalid table number: {table}.")
+    if not 0 <= commission_rate <= 100:
+        raise ValueError("Commission rate must be between 0 and 100.")
+    if any(days < 0 for days in payment_conditions):
+        raise ValueError("Number of days cannot be negative.")
+
+    session = OrderSession(customer, seller, commission_rate, table, payment_conditions)
+    for code, (quantity, discount) in items.items():
+        try:
+            session.cart.add(code, quantity, discount)
+        except ValueError as exc:
+            raise ValueError(f"Product {code}: {exc}") from None
+    if transport is not None:
+        session.set_transport(transport, sender)
+    return session.priced_order()
+
 # ---------------------------
 # Search and Main Program Logic
 # ---------------------------
-def search_by_name(name, entity_type="customer"):
-    entity_dict = customer_dict if entity_type == "customer" else seller_dict
-    results = [entity for entity in entity_dict.values() if name.lower() in entity.name.lower()]
-    return results
+SEARCH_FIELDS = ("name", "address")
+search_indexes = {}  # (entity_type, field) -> TextIndex over customer_dict/seller_dict
+customers_by_seller = OwnershipIndex()  # seller_id -> customer ids, kept in step with customer_dict
+
+def _entity_dict(entity_type):
+    return customer_dict if entity_type == "customer" else seller_dict
+
+def _index_entity(entity, entity_type):
+    for field in SEARCH_FIELDS:
+        search_indexes[(entity_type, field)].add(entity.customer_id, getattr(entity, field))
+    if entity_type == "customer":
+        customers_by_seller.add(entity.customer_id, entity.seller_id)
+
+def _index_entities(entities, entity_type):
+    for field in SEARCH_FIELDS:
+        search_indexes[(entity_type, field)].add_many((entity.customer_id, getattr(entity, field)) for entity in entities)
+    if entity_type == "customer":
+        customers_by_seller.add_many((entity.customer_id, entity.seller_id) for entity in entities)
+
+def _reset_indexes(entity_type):
+    global customers_by_seller
+    for field in SEARCH_FIELDS:
+        search_indexes[(entity_type, field)] = TextIndex()
+    if entity_type == "customer":
+        customers_by_seller = OwnershipIndex()
+
+def build_search_indexes():
+    """Rebuild the name and address indexes and the seller -> customers index from customer_dict and seller_dict."""
+    for entity_type in ("customer", "seller"):
+        _reset_indexes(entity_type)
+        _index_entities(_entity_dict(entity_type).values(), entity_type)
+
+def add_customer(customer):
+    """Register a new customer so lookups and searches can find it."""
+    customer_dict[customer.customer_id] = customer
+    _index_entity(customer, "customer")
+
+def add_seller(seller):
+    """Register a new seller so lookups and searches can find it."""
+    seller_dict[seller.customer_id] = seller
+    _index_entity(seller, "seller")
+
+def update_entity(entity, entity_type="customer", **changes):
+    """
+    Change attributes of a customer or seller and keep the search indexes in step. A
+    customer can only be moved to an active seller (ValueError otherwise, with nothing changed).
+    """
+    if entity_type == "customer" and changes.get("seller_id", entity.seller_id) != entity.seller_id:
+        _active_seller(changes["seller_id"])
+    for field, value in changes.items():
+        setattr(entity, field, value)
+    _index_entity(entity, entity_type)
+
+def _search(field, value, entity_type, limit, prefix, seller_id=None):
+    index = search_indexes[(entity_type, field)]
+    if seller_id is not None:
+        if entity_type != "customer":
+            raise ValueError("Only customer searches can be restricted to a seller.")
+        entity_ids = index.filter(customers_by_seller.portfolio(seller_id), value, prefix, limit)
+    else:
+        entity_ids = index.prefix(value, limit) if prefix else index.search(value, limit)
+    entity_dict = _entity_dict(entity_type)
+    return [entity_dict[entity_id] for entity_id in entity_ids]
 
-def search_by_address(address, entity_type="customer"):
-    entity_dict = customer_dict if entity_type == "customer" else seller_dict
-    results = [entity for entity in entity_dict.values() if address.lower() in entity.address.lower()]
-    return results
+def search_by_name(name, entity_type="customer", limit=None, prefix=False, seller_id=None):
+    """
+    Customers or sellers whose name contains (or, with prefix=True, starts with) name.
+    With seller_id, only that seller's customers are checked.
+    """
+    return _search("name", name, entity_type, limit, prefix, seller_id)
+
+def search_by_address(address, entity_type="customer", limit=None, prefix=False, seller_id=None):
+    """
+    Customers or sellers whose address contains (or, with prefix=True, starts with) address.
+    With seller_id, only that seller's customers are checked.
+    """
+    return _search("address", address, entity_type, limit, prefix, seller_id)
+
+# ---------------------------
+# Seller Portfolios
+# ---------------------------
+def customers_of_seller(seller_id, include_blocked=True):
+    """The customers registered to seller_id, in id order."""
+    customers = [customer_dict[customer_id] for customer_id in customers_by_seller.owned_by(seller_id)]
+    return customers if include_blocked else [customer for customer in customers if not customer.block]
+
+def _active_seller(seller_id):
+    seller = seller_dict.get(seller_id)
+    if seller is None:
+        raise ValueError(f"Invalid seller ID: {seller_id}.")
+    if seller.block:
+        raise ValueError(f"Seller {seller_id} is blocked and cannot take over customers.")
+    return seller
+
+def _assign(customer_id, seller_id):
+    customer_dict[customer_id].seller_id = seller_id
+    customers_by_seller.move(customer_id, seller_id)
+
+def reassign_portfolio(from_seller_id, to_seller_id):
+    """Move every customer of from_seller_id to to_seller_id. Returns how many were moved."""
+    if from_seller_id == to_seller_id:
+        raise ValueError("A portfolio cannot be reassigned to the seller who already has it.")
+    _active_seller(to_seller_id)
+    customer_ids = customers_by_seller.owned_by(from_seller_id)
+    for customer_id in customer_ids:
+        _assign(customer_id, to_seller_id)
+    return len(customer_ids)
+
+def _spread(customer_ids, seller_ids):
+    """Assign customer_ids to seller_ids, each to whoever has the fewest customers. Returns {customer_id: seller_id}."""
+    sizes = customers_by_seller.sizes()
+    load = [(sizes.get(seller_id, 0), seller_id) for seller_id in seller_ids]
+    heapq.heapify(load)
+    moves = {}
+    for customer_id in customer_ids:
+        size, seller_id = heapq.heappop(load)
+        _assign(customer_id, seller_id)
+        moves[customer_id] = seller_id
+        heapq.heappush(load, (size + 1, seller_id))
+    return moves
+
+def _active_seller_ids(excluding=()):
+    seller_ids = [seller_id for seller_id, seller in seller_dict.items() if not seller.block and seller_id not in excluding]
+    if not seller_ids:
+        raise ValueError("There is no active seller to take over the customers.")
+    return seller_ids
+
+def block_seller(seller_id, reassign_to=None):
+    """
+    Block a seller and hand their customers over: all to reassign_to if given, otherwise
+    spread over the active sellers, smallest portfolio first. Returns {customer_id: new seller_id}.
+    """
+    seller = seller_dict.get(seller_id)
+    if seller is None:
+        raise ValueError(f"Invalid seller ID: {seller_id}.")
+    customer_ids = customers_by_seller.owned_by(seller_id)
+    if reassign_to is not None:
+        reassign_portfolio(seller_id, reassign_to)
+        moves = dict.fromkeys(customer_ids, reassign_to)
+    else:
+        moves = _spread(customer_ids, _active_seller_ids(excluding={seller_id})) if customer_ids else {}
+    seller.block = True
+    return moves
+
+def reassign_blocked_portfolios():
+    """Spread the customers of every blocked seller over the active sellers. Returns {customer_id: new seller_id}."""
+    blocked = [seller_id for seller_id, seller in seller_dict.items() if seller.block]
+    orphans = [customer_id for seller_id in blocked for customer_id in customers_by_seller.owned_by(seller_id)]
+    return _spread(orphans, _active_seller_ids()) if orphans else {}
+
+build_search_indexes()
+
+# ---------------------------
+# Bulk Data Loading
+# ---------------------------
+LOAD_CHUNK_SIZE = 10000
+DATA_DIR = os.environ.get("SALES_DATA_DIR")
+
+def _customer_from_record(record):
+    seller_id = require_int(record, 'seller_id')
+    if seller_dict and seller_id not in seller_dict:
+        raise ValueError(f"unknown seller_id {seller_id}")
+    return Customer(require_int(record, 'customer_id'), require_str(record, 'name'), require_str(record, 'address'),
+                    require_email(record), require_str(record, 'phone'), seller_id, optional_bool(record, 'block'))
+
+def _seller_from_record(record):
+    return Seller(require_int(record, 'customer_id'), require_str(record, 'name'), require_str(record, 'address'),
+                  require_email(record), require_str(record, 'phone'), optional_bool(record, 'block'))
+
+def _transport_from_record(record):
+    return Transport(require_int(record, 'customer_id'), require_str(record, 'name'), require_str(record, 'address'),
+                     require_email(record), require_str(record, 'phone'), optional_bool(record, 'block'),
+                     cost=optional_float(record, 'cost'))
+
+def _load_entities(path, entity_dict, from_record, entity_type, chunk_size, strict):
+    """
+    Stream records from path into entity_dict one chunk at a time, indexing each chunk
+    for search. A chunk is built and checked before any of it is inserted, so a strict
+    load that fails leaves only whole, indexed chunks behind.
+    """
+    report = LoadReport(path)
+    for chunk in iter_chunks(iter_records(path), chunk_size):
+        entities = {}
+        for line, raw in chunk:
+            try:
+                entity = from_record(parse_record(raw))
+                if entity.customer_id in entity_dict or entity.customer_id in entities:
+                    raise ValueError(f"duplicate id {entity.customer_id}")
+            except ValueError as exc:
+                if strict:
+                    raise ValueError(f"{path}:{line}: {exc}") from None
+                report.add_error(line, str(exc))
+                continue
+            entities[entity.customer_id] = entity
+        entity_dict.update(entities)
+        if entity_type is not None:
+            _index_entities(entities.values(), entity_type)
+        report.loaded += len(entities)
+    return report
+
+def load_customers(path, chunk_size=LOAD_CHUNK_SIZE, strict=True):
+    """Load customers from a CSV/JSONL file into customer_dict. Load sellers first so seller_id is checked."""
+    return _load_entities(path, customer_dict, _customer_from_record, "customer", chunk_size, strict)
+
+def load_sellers(path, chunk_size=LOAD_CHUNK_SIZE, strict=True):
+    """Load sellers from a CSV/JSONL file into seller_dict."""
+    return _load_entities(path, seller_dict, _seller_from_record, "seller", chunk_size, strict)
+
+def load_transports(path, chunk_size=LOAD_CHUNK_SIZE, strict=True):
+    """Load transports from a CSV/JSONL file into transport_dict."""
+    return _load_entities(path, transport_dict, _transport_from_record, None, chunk_size, strict)
+
+def load_data_dir(data_dir, strict=True):
+    """
+    Replace the sample data with sellers, customers and transports files (.csv or .jsonl)
+    found in data_dir. Entity types without a file keep their current records. If a load
+    fails, every entity dict and search index is put back as it was before the call.
+    """
+    global customers_by_seller
+    entity_dicts = (seller_dict, customer_dict, transport_dict)
+    saved = ([dict(entity_dict) for entity_dict in entity_dicts], dict(search_indexes), customers_by_seller)
+    reports = []
+    try:
+        for name, entity_dict, load in (("sellers", seller_dict, load_sellers),
+                                        ("customers", customer_dict, load_customers),
+                                        ("transports", transport_dict, load_transports)):
+            for extension in (".csv", ".jsonl"):
+                path = os.path.join(data_dir, name + extension)
+                if os.path.exists(path):
+                    entity_dict.clear()
+                    if name != "transports":
+                        _reset_indexes(name[:-1])
+                    reports.append(load(path, strict=strict))
+                    break
+    except Exception:
+        # _reset_indexes swaps in new index objects, so the saved ones are untouched.
+        contents, indexes, customers_by_seller = saved
+        for entity_dict, entities in zip(entity_dicts, contents):
+            entity_dict.clear()
+            entity_dict.update(entities)
+        search_indexes.clear()
+        search_indexes.update(indexes)
+        raise
+    return reports
+
+if DATA_DIR:
+    load_data_dir(DATA_DIR)
+
+# ---------------------------
+# Instrumentation
+# ---------------------------
+# Functions timed once instrumentation is enabled, with the metric name for each.
+INSTRUMENTED_FUNCTIONS = {
+    'get_price': 'get_price',
+    'build_catalog': 'catalog_build',
+    'build_pricing_context': 'pricing_context_build',
+    'write_order_summary': 'render_order_summary',
+    'search_by_name': 'search_by_name',
+    'search_by_address': 'search_by_address',
+}
+
+def enable_instrumentation(metrics_file=None):
+    """Start timing INSTRUMENTED_FUNCTIONS; with metrics_file, write the metrics there at exit."""
+    metrics.enable()
+    instrument(sys.modules[__name__], INSTRUMENTED_FUNCTIONS)
+    if metrics_file:
+        atexit.register(metrics.write, metrics_file)
+
+if METRICS_FILE:
+    enable_instrumentation(METRICS_FILE)
 
 # ---------------------------
 # Helper Functions for Main Program
@@ -731,9 +1464,9 @@ def _get_commission_rate():
             print("Invalid input. Please enter a valid numeric commission rate.")
 
 def _get_valid_customer(seller):
-    """Gets a valid customer ID from the user, with search and seller association check."""
+    """Gets a valid customer ID from the user, with search and seller association check. Searches only cover the seller's customers."""
     while True:
-        user_input = input("Enter the customer ID directly, or type 'name' to search by name, or 'address' to search by address: ").lower()
+        user_input = input("Enter the customer ID directly, or type 'name' to search by name, 'address' to search by address, or 'list' to list your customers: ").lower()
         if user_input.isnumeric():
             customer_id = int(user_input)
             customer = get_customer_by_id(customer_id)
@@ -750,7 +1483,7 @@ def _get_valid_customer(seller):
                 print("Invalid customer ID. Please try again.")
         elif user_input == "name":
             search_value = input("Enter the name (or part of the name) of the customer: ").lower()
-            results = search_by_name(search_value, entity_type="customer")
+            results = search_by_name(search_value, entity_type="customer", seller_id=seller.customer_id)
             if results:
                 print("Found customers:")
                 for c in results:
@@ -759,34 +1492,44 @@ def _get_valid_customer(seller):
                 print("No customers found with the given information.")
         elif user_input == "address":
             search_value = input("Enter the address of the customer: ").lower()
-            results = search_by_address(search_value, entity_type="customer")
+            results = search_by_address(search_value, entity_type="customer", seller_id=seller.customer_id)
             if results:
                 print("Found customers:")
                 for c in results:
                     print(f"ID: {c.customer_id}, Name: {c.name}, Address: {c.address}, Email: {c.email}, Phone: {c.phone}")
-                else:
-                    print("No customers found with the given information.")
+            else:
+                print("No customers found with the given information.")
+        elif user_input == "list":
+            results = customers_of_seller(seller.customer_id)
+            if results:
+                print(f"Customers of {seller.name}:")
+                for c in results:
+                    blocked = " (blocked)" if c.block else ""
+                    print(f"ID: {c.customer_id}, Name: {c.name}, Address: {c.address}, Email: {c.email}, Phone: {c.phone}{blocked}")
+            else:
+                print("No customers are registered to you.")
         else:
             print("Invalid input. Please try again.")
 
+def _table_choices(tables):
+    """'711 or 411', '711, 411 or 511', ... for the tables of a pricing config."""
+    return tables[0] if len(tables) == 1 else f"{', '.join(tables[:-1])} or {tables[-1]}"
+
 def _get_table_number():
-    """Gets a valid table number from the user."""
+    """Gets a valid table number from the user, out of the tables of the current pricing."""
     while True:
-        table = input("Enter the table number (711 or 411): ")
-        if table in PRICE_TABLES:
+        tables = list(PRICING.config.table_factors)  # read on every prompt, so a reload's tables show up
+        table = input(f"Enter the table number ({_table_choices(tables)}): ")
+        if table in tables:
             return table
         else:
-            print("Invalid table number. Please enter 711 or 411.")
+            print(f"Invalid table number. Please enter {_table_choices(tables)}.")
 
 # ---------------------------
 # Main Program Logic
 # ---------------------------
 
 def main_program():
-    global customer_product_list
-    customer_product_list = {}
-    global table
-
     current_datetime = datetime.now()
     print(f"Current date and time: {current_datetime.strftime('%Y-%m-%d %H:%M:%S')}")
 
@@ -1,8 +1,13 @@
 
+import threading
 from dataclasses import dataclass
 from datetime import datetime
 
+from money import apply_rate, from_cents, percent_to_rate, to_cents
+
 class Customer:
+    __slots__ = ('customer_id', 'name', 'address', 'email', 'phone', 'seller_id', 'block', '_order_history')
+
     def __init__(self, customer_id: int, name: str, address: str, email: str, phone: str, seller_id: int, block: bool = False):
         self.customer_id = customer_id
         self.name = name
@@ -25,7 +30,7 @@ class Customer:
             **order_details
         })
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class Product:
     category: str
     finish: str
@@ -35,14 +40,21 @@ class Product:
     flammable: bool = False
 
 class Seller(Customer):
+    __slots__ = ('_commission_cents', '_commission_lock', '_sales_history')
+
     def __init__(self, customer_id: int, name: str, address: str, email: str, phone: str, block: bool = False):
         super().__init__(customer_id, name, address, email, phone, None, block)
-        self._total_commission = 0.0
+        self._commission_cents = 0
+        self._commission_lock = threading.Lock()  # orders for one seller may be priced on several threads
         self._sales_history = []
 
     def calculate_commission(self, total_price: float, commission_rate: float) -> float:
-        commission = (commission_rate / 100) * total_price
-        self._total_commission += commission
+        return from_cents(self.calculate_commission_cents(to_cents(total_price), commission_rate))
+
+    def calculate_commission_cents(self, total_cents: int, commission_rate: float) -> int:
+        commission = apply_rate(total_cents, percent_to_rate(commission_rate))
+        with self._commission_lock:
+            self._commission_cents += commission
         return commission
 
     def record_sale(self, customer_id: int, total_price: float, commission: float) -> None:
@@ -54,4 +66,4 @@ class Seller(Customer):
         })
 
     def get_total_commission(self) -> float:
-        return self._total_commission
+        return from_cents(self._commission_cents)
@@ -0,0 +1,111 @@
+"""
+Exact money arithmetic in integer cents.
+
+Amounts are held as int cents and rates (tax, discount, commission) as int
+parts per million, so sums never drift. Every product of an amount and a rate
+is rounded once, half away from zero, to whole cents:
+
+    unit price      base price * (1 - discount), rounded
+    tax per unit    discounted unit price * tax rate, rounded
+    line totals     unit amounts * quantity (exact)
+    commission      commission base * commission rate, rounded
+    installments    total split into whole cents; the first ones take the
+                    leftover cents, so they always add up to the total
+
+Floats and strings from the price tables and user input are converted with
+Decimal(str(value)), i.e. as they are written, not as their binary value.
+The *_array functions do the same arithmetic on int64 NumPy arrays for whole
+batches; amounts up to 10**12 cents can be multiplied by any rate without
+overflow.
+"""
+from decimal import ROUND_HALF_UP, Decimal
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+
+CENTS = 100
+RATE_SCALE = 1_000_000  # rates are stored as parts per million
+
+# ---------------------------
+# Conversions
+# ---------------------------
+@lru_cache(maxsize=4096)
+def to_cents(amount) -> int:
+    """Convert an amount in currency units (float, int, str or Decimal) to int cents."""
+    return int((Decimal(str(amount)) * CENTS).to_integral_value(ROUND_HALF_UP))
+
+def from_cents(cents: int) -> float:
+    """Convert int cents back to a float amount (the closest float to the exact value)."""
+    return cents / CENTS
+
+@lru_cache(maxsize=4096)
+def to_rate(fraction) -> int:
+    """Convert a fraction (0.1 for 10%) to parts per million."""
+    return int((Decimal(str(fraction)) * RATE_SCALE).to_integral_value(ROUND_HALF_UP))
+
+@lru_cache(maxsize=4096)
+def percent_to_rate(percent) -> int:
+    """Convert a percentage (10 for 10%) to parts per million."""
+    return int((Decimal(str(percent)) * RATE_SCALE / 100).to_integral_value(ROUND_HALF_UP))
+
+# ---------------------------
+# Scalar Arithmetic
+# ---------------------------
+def _round_div(numerator: int, denominator: int) -> int:
+    """numerator / denominator rounded half away from zero (denominator > 0)."""
+    quotient = (2 * abs(numerator) + denominator) // (2 * denominator)
+    return quotient if numerator >= 0 else -quotient
+
+def apply_rate(cents: int, rate: int) -> int:
+    """cents * rate (in parts per million), rounded to whole cents."""
+    return _round_div(cents * rate, RATE_SCALE)
+
+def discounted(cents: int, discount_rate: int) -> int:
+    """Price after taking off discount_rate (parts per million), rounded to whole cents."""
+    return apply_rate(cents, RATE_SCALE - discount_rate)
+
+def split(total_cents: int, parts: int) -> List[int]:
+    """Split total_cents into `parts` installments that add up to it exactly."""
+    if parts <= 0:
+        raise ValueError("Number of installments must be positive.")
+    share, leftover = divmod(total_cents, parts)
+    return [share + 1 if i < leftover else share for i in range(parts)]
+
+# ---------------------------
+# Vectorized Arithmetic
+# ---------------------------
+WHOLE_CENTS_TOLERANCE = 1e-6  # in cents; far from the half-cent ties that to_cents has to round
+
+def to_cents_array(amounts) -> np.ndarray:
+    """
+    to_cents for every element of a float array. NaN is not allowed. Amounts that
+    are already whole cents (everything from_cents produced) are converted in one
+    vectorized step; only the others go through to_cents.
+    """
+    amounts = np.asarray(amounts)
+    if np.isnan(amounts).any():
+        raise ValueError("Cannot convert NaN to cents.")
+    scaled = amounts * CENTS
+    cents = np.rint(scaled)
+    odd = np.abs(scaled - cents) > WHOLE_CENTS_TOLERANCE
+    cents = cents.astype(np.int64)
+    if odd.any():
+        uniques, inverse = np.unique(amounts[odd], return_inverse=True)
+        cents[odd] = np.array([to_cents(float(amount)) for amount in uniques], dtype=np.int64)[inverse]
+    return cents
+
+def apply_rate_array(cents, rates) -> np.ndarray:
+    """apply_rate element-wise on int64 arrays (either may be a scalar)."""
+    product = np.asarray(cents, dtype=np.int64) * np.asarray(rates, dtype=np.int64)
+    quotient = (2 * np.abs(product) + RATE_SCALE) // (2 * RATE_SCALE)
+    return np.where(product >= 0, quotient, -quotient)
+
+def discounted_array(cents, discount_rates) -> np.ndarray:
+    return apply_rate_array(cents, RATE_SCALE - np.asarray(discount_rates, dtype=np.int64))
+
+def percent_to_rate_array(percents) -> np.ndarray:
+    """percent_to_rate for every element of an array of percentages."""
+    percents = np.asarray(percents)
+    uniques, inverse = np.unique(percents, return_inverse=True)
+    return np.array([percent_to_rate(float(p)) for p in uniques], dtype=np.int64)[inverse].reshape(percents.shape)
@@ -0,0 +1,190 @@
+"""
+Durable order history in a local SQLite file.
+
+Every order is one row with indexed customer_id, seller_id and date columns,
+plus the full priced order as JSON. Writes can be batched into a single
+transaction, and the query helpers only touch the rows they return.
+
+    store = OrderStore("orders.db")
+    store.add_orders(priced_orders)
+    store.seller_orders_for_month(4, 2026, 10)
+"""
+import json
+import sqlite3
+from datetime import date, datetime
+from typing import Iterable, Iterator, List, Optional, Union
+
+DateLike = Union[date, datetime, str]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS orders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    order_id TEXT,
+    date TEXT NOT NULL,
+    customer_id INTEGER NOT NULL,
+    seller_id INTEGER NOT NULL,
+    transport_id INTEGER,
+    table_number TEXT,
+    total_price REAL NOT NULL,
+    commission REAL NOT NULL,
+    details TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_orders_customer_date ON orders (customer_id, date);
+CREATE INDEX IF NOT EXISTS idx_orders_seller_date ON orders (seller_id, date);
+CREATE INDEX IF NOT EXISTS idx_orders_date ON orders (date);
+"""
+
+_COLUMNS = "id, order_id, date, customer_id, seller_id, transport_id, table_number, total_price, commission, details"
+
+def _iso(value: DateLike) -> str:
+    """Dates are stored as ISO strings so that string order is date order."""
+    if isinstance(value, str):
+        return value
+    if isinstance(value, datetime):
+        return value.isoformat(timespec='seconds')
+    return value.isoformat()
+
+class OrderStore:
+    """SQLite-backed order history, indexed by customer, seller and date."""
+
+    def __init__(self, path: str = "orders.db"):
+        self.path = path
+        self._conn = sqlite3.connect(path)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "OrderStore":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---------------------------
+    # Writes
+    # ---------------------------
+    @staticmethod
+    def _row(order: dict, when: Optional[DateLike]) -> tuple:
+        when = when or order.get('date') or datetime.now()
+        return (
+            order.get('order_id'),
+            _iso(when),
+            order['customer_id'],
+            order['seller_id'],
+            order.get('transport_id'),
+            order.get('table'),
+            order['total_price'],
+            order.get('commission', 0.0),
+            json.dumps(order, default=str),
+        )
+
+    def add_order(self, order: dict, when: Optional[DateLike] = None) -> int:
+        """Store one priced order (a price_order/process_order result). Returns its row id."""
+        with self._conn:
+            cursor = self._conn.execute(
+                "INSERT INTO orders (order_id, date, customer_id, seller_id, transport_id, table_number, "
+                "total_price, commission, details) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", self._row(order, when))
+        return cursor.lastrowid
+
+    def add_orders(self, orders: Iterable[dict], when: Optional[DateLike] = None) -> int:
+        """Store many orders in a single transaction. Returns how many were written."""
+        rows = [self._row(order, when) for order in orders]
+        with self._conn:
+            self._conn.executemany(
+                "INSERT INTO orders (order_id, date, customer_id, seller_id, transport_id, table_number, "
+                "total_price, commission, details) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        return len(rows)
+
+    # ---------------------------
+    # Queries
+    # ---------------------------
+    def _select(self, where: str, params: list, start: Optional[DateLike], end: Optional[DateLike],
+                limit: Optional[int]) -> List[dict]:
+        clauses = [where] if where else []
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(_iso(start))
+        if end is not None:
+            clauses.append("date < ?")
+            params.append(_iso(end))
+        sql = f"SELECT {_COLUMNS} FROM orders"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY date, id"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [self._to_dict(row) for row in self._conn.execute(sql, params)]
+
+    @staticmethod
+    def _to_dict(row: sqlite3.Row) -> dict:
+        record = dict(row)
+        record['details'] = json.loads(record['details'])
+        return record
+
+    def orders_for_customer(self, customer_id: int, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                            limit: Optional[int] = None) -> List[dict]:
+        """Orders of one customer, oldest first, optionally within [start, end)."""
+        return self._select("customer_id = ?", [customer_id], start, end, limit)
+
+    def orders_for_seller(self, seller_id: int, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                          limit: Optional[int] = None) -> List[dict]:
+        """Orders of one seller, oldest first, optionally within [start, end)."""
+        return self._select("seller_id = ?", [seller_id], start, end, limit)
+
+    def orders_between(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                       limit: Optional[int] = None) -> List[dict]:
+        """All orders within [start, end), oldest first."""
+        return self._select("", [], start, end, limit)
+
+    def seller_orders_for_month(self, seller_id: int, year: int, month: int) -> List[dict]:
+        """Orders of one seller in the given calendar month."""
+        start = date(year, month, 1)
+        end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+        return self.orders_for_seller(seller_id, start, end)
+
+    def seller_orders_this_month(self, seller_id: int) -> List[dict]:
+        today = date.today()
+        return self.seller_orders_for_month(seller_id, today.year, today.month)
+
+    def iter_commission_rows(self, start: Optional[DateLike] = None, end: Optional[DateLike] = None,
+                             after_id: int = 0, batch_size: int = 10_000) -> Iterator[List[tuple]]:
+        """
+        (id, date, seller_id, commission base, commission) of the orders within [start,
+        end), in id (insertion) order, batch_size rows at a time. The base is the stored
+        total_price_before_transport, or total_price minus transport_fee for orders
+        recorded without it, and is the only value read from the JSON. Pages are keyed on
+        id, so passing the last id seen as after_id resumes right after it, and picks up
+        orders stored since, whatever their date.
+        """
+        clauses, params = [], []
+        if start is not None:
+            clauses.append("date >= ?")
+            params.append(_iso(start))
+        if end is not None:
+            clauses.append("date < ?")
+            params.append(_iso(end))
+        period = "".join(f" AND {clause}" for clause in clauses)
+        # Find the first order of the period on the date index, then page on the primary key;
+        # unary + keeps SQLite from switching to the date index for the pages.
+        first = self._conn.execute(f"SELECT MIN(id) FROM orders INDEXED BY idx_orders_date WHERE id > ?{period}",
+                                   [after_id, *params]).fetchone()[0]
+        if first is None:
+            return
+        period = period.replace("date", "+date")
+        sql = ("SELECT id, date, seller_id, COALESCE(json_extract(details, '$.total_price_before_transport'), "
+               "total_price - COALESCE(json_extract(details, '$.transport_fee'), 0)), commission "
+               f"FROM orders WHERE id > ?{period} ORDER BY id LIMIT ?")
+        last = first - 1
+        while True:
+            rows = [tuple(row) for row in self._conn.execute(sql, [last, *params, batch_size])]
+            if not rows:
+                return
+            yield rows
+            last = rows[-1][0]
+
+    def count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0]
@@ -0,0 +1,376 @@
+"""
+Commission payroll: every seller's commission for a period, per day, from the
+priced orders of a batch results file or the order store.
+
+Orders are read in chunks of plain columns (seller, day, commission base,
+commission as priced) and each chunk is grouped by (seller, day) in one NumPy
+pass, so the Python work per order is only reading it. The commission base is
+the order's products total before transport, as in OrderSession. Sellers given
+a rate are paid that rate on it, rounded to the cent like Seller
+calculate_commission_cents; the others are paid the commission their orders
+were priced with.
+
+    python payroll.py --store orders.db --month 2026-10 --statements statements/
+    python payroll.py priced.jsonl --date 2026-10-17 --rate 4=6 --rate 5=4.5
+    python payroll.py --store orders.db --month 2026-10 --checkpoint payroll.ckpt
+
+With --checkpoint the totals so far and the position reached are saved after
+every chunk, and a run started with the same checkpoint, source, period and
+rates carries on from there. A checkpoint left by a finished run makes the next
+run read only the orders added since.
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import date
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from money import apply_rate_array, from_cents, percent_to_rate, to_cents_array
+from order_store import OrderStore
+from render import FORMATS, column_widths, write_table
+
+CHECKPOINT_VERSION = 1
+PAYROLL_CHUNK_SIZE = 100_000
+
+class CommissionColumns(NamedTuple):
+    """One chunk of orders as parallel arrays."""
+    seller_id: np.ndarray   # int64
+    day: np.ndarray         # int64 YYYYMMDD
+    base: np.ndarray        # commission base (products total before transport), int64 cents
+    commission: np.ndarray  # commission the order was priced with, int64 cents
+
+DAY_KEY = 100_000_000  # (seller, day) group key = seller_id * DAY_KEY + YYYYMMDD
+
+def day_numbers(days: Sequence[str]) -> np.ndarray:
+    """YYYYMMDD ints for ISO dates or datetimes, read from the characters without parsing each string."""
+    chars = np.array(days, dtype='U10')
+    if not len(chars):
+        return np.zeros(0, dtype=np.int64)
+    codes = chars.view(np.uint32).reshape(len(chars), 10).astype(np.int64) - ord('0')
+    digits = codes[:, [0, 1, 2, 3, 5, 6, 8, 9]]
+    bad = ((digits < 0) | (digits > 9)).any(axis=1) | (codes[:, [4, 7]] != ord('-') - ord('0')).any(axis=1)
+    if bad.any():
+        raise ValueError(f"Invalid order date: '{chars[bad][0]}'.")
+    return digits @ np.array([10_000_000, 1_000_000, 100_000, 10_000, 1_000, 100, 10, 1], dtype=np.int64)
+
+def day_label(day: int) -> str:
+    return f"{day // 10_000:04d}-{day // 100 % 100:02d}-{day % 100:02d}"
+
+def commission_columns(rows: Sequence[tuple]) -> CommissionColumns:
+    """
+    Columns for rows of (ISO date, seller_id, commission base, commission) in currency
+    units. Raises ValueError if a base or commission is missing (None or NaN).
+    """
+    days, seller_ids, bases, commissions = zip(*rows) if rows else ((), (), (), ())
+    bases = np.array(bases, dtype=np.float64)
+    commissions = np.array(commissions, dtype=np.float64)
+    missing = np.isnan(bases) | np.isnan(commissions)
+    if missing.any():
+        raise ValueError(f"{int(missing.sum())} order(s), the first dated {days[int(missing.argmax())][:10]}, have no "
+                         f"commission or no commission base (total_price_before_transport, or total_price).")
+    return CommissionColumns(
+        seller_id=np.array(seller_ids, dtype=np.int64),
+        day=day_numbers(days),
+        base=to_cents_array(bases),
+        commission=to_cents_array(commissions),
+    )
+
+def commission_base(order: dict) -> Optional[float]:
+    """The products total an order's commission is charged on; None if the order does not say."""
+    base = order.get('total_price_before_transport')
+    if base is None and order.get('total_price') is not None:
+        base = order['total_price'] - (order.get('transport_fee') or 0)
+    return base
+
+# ---------------------------
+# Grouping
+# ---------------------------
+def seller_rates(seller_ids: np.ndarray, rates: Optional[Dict[int, float]] = None,
+                 default_rate: Optional[float] = None) -> np.ndarray:
+    """Rate in parts per million for each seller id, -1 where the priced commission stands."""
+    rates = rates or {}
+    ppm = []
+    for seller_id in seller_ids.tolist():
+        percent = rates.get(seller_id, default_rate)
+        ppm.append(-1 if percent is None else percent_to_rate(percent))
+    return np.array(ppm, dtype=np.int64)
+
+def group_commissions(columns: CommissionColumns, rates: Optional[Dict[int, float]] = None,
+                      default_rate: Optional[float] = None) -> Dict[Tuple[int, str], Tuple[int, int, int]]:
+    """
+    {(seller_id, day): (orders, sales, commission)} for one chunk, in cents. rates maps
+    seller ids to a commission percentage; default_rate applies to sellers not in it.
+    """
+    if not len(columns.seller_id):
+        return {}
+    groups, group_idx = np.unique(columns.seller_id * DAY_KEY + columns.day, return_inverse=True)
+    group_sellers, group_days = np.divmod(groups, DAY_KEY)
+    sellers, seller_idx = np.unique(group_sellers, return_inverse=True)
+    rate = seller_rates(sellers, rates, default_rate)[seller_idx][group_idx]
+    commission = np.where(rate >= 0, apply_rate_array(columns.base, rate), columns.commission)
+
+    orders = np.bincount(group_idx, minlength=len(groups))
+    sales = np.zeros(len(groups), dtype=np.int64)
+    np.add.at(sales, group_idx, columns.base)
+    paid = np.zeros(len(groups), dtype=np.int64)
+    np.add.at(paid, group_idx, commission)
+    return {(seller_id, day_label(day)): totals for seller_id, day, *totals
+            in zip(group_sellers.tolist(), group_days.tolist(), orders.tolist(), sales.tolist(), paid.tolist())}
+
+class Payroll:
+    """Running commission totals per seller and day for one period."""
+
+    def __init__(self, start: Optional[str] = None, end: Optional[str] = None,
+                 rates: Optional[Dict[int, float]] = None, default_rate: Optional[float] = None):
+        self.start = start
+        self.end = end
+        self.rates = dict(rates or {})
+        self.default_rate = default_rate
+        self.orders_read = 0
+        self.totals: Dict[Tuple[int, str], List[int]] = {}  # (seller_id, day) -> [orders, sales, commission]
+
+    def add(self, columns: CommissionColumns) -> None:
+        """Group a chunk and add it to the totals."""
+        self.orders_read += len(columns.seller_id)
+        for key, (orders, sales, commission) in group_commissions(columns, self.rates, self.default_rate).items():
+            totals = self.totals.setdefault(key, [0, 0, 0])
+            totals[0] += orders
+            totals[1] += sales
+            totals[2] += commission
+
+    def sellers(self) -> List[int]:
+        return sorted({seller_id for seller_id, _ in self.totals})
+
+    def days(self, seller_id: int) -> List[Tuple[str, int, int, int]]:
+        """(day, orders, sales, commission) of one seller, in day order."""
+        return sorted((day, *totals) for (seller, day), totals in self.totals.items() if seller == seller_id)
+
+    def seller_totals(self) -> Dict[int, Tuple[int, int, int]]:
+        """{seller_id: (orders, sales, commission)} over the whole period."""
+        totals: Dict[int, List[int]] = {}
+        for (seller_id, _), (orders, sales, commission) in self.totals.items():
+            seller = totals.setdefault(seller_id, [0, 0, 0])
+            seller[0] += orders
+            seller[1] += sales
+            seller[2] += commission
+        return {seller_id: tuple(totals[seller_id]) for seller_id in sorted(totals)}
+
+    def rate_label(self, seller_id: int) -> str:
+        percent = self.rates.get(seller_id, self.default_rate)
+        return "as priced" if percent is None else f"{percent:g}%"
+
+    def params(self) -> dict:
+        return {'start': self.start, 'end': self.end, 'default_rate': self.default_rate,
+                'rates': {str(seller_id): percent for seller_id, percent in sorted(self.rates.items())}}
+
+# ---------------------------
+# Reading Orders
+# ---------------------------
+def _in_period(day: str, start: Optional[str], end: Optional[str]) -> bool:
+    return (start is None or day >= start) and (end is None or day < end)
+
+def iter_file_chunks(path: str, start: Optional[str] = None, end: Optional[str] = None, undated: Optional[str] = None,
+                     chunk_size: int = PAYROLL_CHUNK_SIZE, offset: int = 0) -> Iterator[Tuple[CommissionColumns, int]]:
+    """
+    (columns, byte offset after the chunk) for the priced orders of a batch.py JSONL
+    results file dated within [start, end). Orders without a 'date' count as undated
+    (default today); error records are skipped. Orders written before the commission
+    base was recorded fall back to total_price minus transport_fee (see commission_base).
+    """
+    undated = undated or date.today().isoformat()
+    with open(path, 'rb') as f:
+        if offset > os.fstat(f.fileno()).st_size:
+            raise ValueError(f"{path} is shorter than the checkpoint position; it is not the same file.")
+        f.seek(offset)
+        rows = []
+        for line in f:
+            offset += len(line)
+            if not line.strip():
+                continue
+            order = json.loads(line)
+            if 'error' in order:
+                continue
+            day = str(order.get('date') or undated)
+            if _in_period(day, start, end):
+                rows.append((day, order['seller_id'], commission_base(order), order.get('commission')))
+            if len(rows) >= chunk_size:
+                yield commission_columns(rows), offset
+                rows = []
+        if rows:
+            yield commission_columns(rows), offset
+
+def iter_store_chunks(store: OrderStore, start: Optional[str] = None, end: Optional[str] = None,
+                      chunk_size: int = PAYROLL_CHUNK_SIZE, after_id: int = 0) -> Iterator[Tuple[CommissionColumns, int]]:
+    """(columns, id of the chunk's last order) for the stored orders within [start, end)."""
+    for rows in store.iter_commission_rows(start, end, after_id, chunk_size):
+        yield commission_columns([row[1:] for row in rows]), rows[-1][0]
+
+# ---------------------------
+# Checkpoints
+# ---------------------------
+def _write_json(path: str, data: dict) -> None:
+    """Write under a temporary name and rename, so a checkpoint is never half-written."""
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    os.replace(tmp, path)
+
+def save_checkpoint(path: str, payroll: Payroll, source: str, position) -> None:
+    _write_json(path, {'version': CHECKPOINT_VERSION, 'source': source, **payroll.params(), 'position': position,
+                       'orders_read': payroll.orders_read,
+                       'totals': [[seller_id, day, *totals] for (seller_id, day), totals in payroll.totals.items()]})
+
+def load_checkpoint(path: str, payroll: Payroll, source: str):
+    """
+    Restore payroll's totals from the checkpoint at path and return the position to
+    resume from, or None if there is no checkpoint. Raises ValueError if it was
+    written for another source, period or rates.
+    """
+    try:
+        with open(path, encoding='utf-8') as f:
+            saved = json.load(f)
+    except FileNotFoundError:
+        return None
+    expected = {'version': CHECKPOINT_VERSION, 'source': source, **payroll.params()}
+    if any(saved.get(key) != value for key, value in expected.items()):
+        raise ValueError(f"Checkpoint {path} is for another payroll run; remove it to start over.")
+    payroll.orders_read = saved['orders_read']
+    payroll.totals = {(seller_id, day): totals for seller_id, day, *totals in saved['totals']}
+    return saved['position']
+
+# ---------------------------
+# Running
+# ---------------------------
+def run_payroll(source, start: Optional[str] = None, end: Optional[str] = None,
+                rates: Optional[Dict[int, float]] = None, default_rate: Optional[float] = None,
+                undated: Optional[str] = None, chunk_size: int = PAYROLL_CHUNK_SIZE,
+                checkpoint: Optional[str] = None) -> Payroll:
+    """
+    Commission totals for the orders dated within [start, end) (ISO dates) in source, a
+    JSONL results path or an OrderStore. With checkpoint, progress is saved to that
+    path after every chunk and resumed from it.
+    """
+    payroll = Payroll(start, end, rates, default_rate)
+    is_store = isinstance(source, OrderStore)
+    name = os.path.abspath(source.path if is_store else source)
+    position = load_checkpoint(checkpoint, payroll, name) if checkpoint else None
+    if is_store:
+        chunks = iter_store_chunks(source, start, end, chunk_size, position or 0)
+    else:
+        chunks = iter_file_chunks(source, start, end, undated, chunk_size, position or 0)
+    for columns, position in chunks:
+        payroll.add(columns)
+        if checkpoint:
+            save_checkpoint(checkpoint, payroll, name, position)
+    return payroll
+
+# ---------------------------
+# Statements
+# ---------------------------
+STATEMENT_COLUMNS = ['Date', 'Orders', 'Sales', 'Commission']
+SUMMARY_COLUMNS = ['Seller', 'Name', 'Rate', 'Orders', 'Sales', 'Commission']
+
+def statement_rows(payroll: Payroll, seller_id: int) -> Iterable[dict]:
+    """One row per day with orders, then a Total row."""
+    orders = sales = commission = 0
+    for day, day_orders, day_sales, day_commission in payroll.days(seller_id):
+        orders, sales, commission = orders + day_orders, sales + day_sales, commission + day_commission
+        yield {'Date': day, 'Orders': day_orders, 'Sales': from_cents(day_sales),
+               'Commission': from_cents(day_commission)}
+    yield {'Date': 'Total', 'Orders': orders, 'Sales': from_cents(sales), 'Commission': from_cents(commission)}
+
+def summary_rows(payroll: Payroll, names: Optional[Dict[int, str]] = None) -> Iterable[dict]:
+    names = names or {}
+    for seller_id, (orders, sales, commission) in payroll.seller_totals().items():
+        yield {'Seller': seller_id, 'Name': names.get(seller_id, ''), 'Rate': payroll.rate_label(seller_id),
+               'Orders': orders, 'Sales': from_cents(sales), 'Commission': from_cents(commission)}
+
+def _period_label(payroll: Payroll) -> str:
+    if payroll.start is None and payroll.end is None:
+        return "all dates"
+    return f"{payroll.start or 'the first order'} to {payroll.end or 'the last order'}" + (" (exclusive)" if payroll.end else "")
+
+def write_statement(payroll: Payroll, seller_id: int, out, fmt: str = 'text', name: str = '') -> int:
+    """Write one seller's statement to out. Text statements start with a short heading."""
+    rows = list(statement_rows(payroll, seller_id))
+    if fmt == 'text':
+        out.write(f"Commission statement for seller {seller_id}{f' ({name})' if name else ''}\n"
+                  f"Period: {_period_label(payroll)}\nRate: {payroll.rate_label(seller_id)}\n\n")
+    widths = column_widths(rows, STATEMENT_COLUMNS) if fmt == 'text' else None
+    return write_table(rows, out, fmt, STATEMENT_COLUMNS, widths)
+
+def write_statements(payroll: Payroll, directory: str, fmt: str = 'text',
+                     names: Optional[Dict[int, str]] = None) -> List[str]:
+    """Write seller-<id>.txt (.csv, .jsonl) for every seller with orders in the period. Returns the paths."""
+    names = names or {}
+    os.makedirs(directory, exist_ok=True)
+    extension = {'text': 'txt'}.get(fmt, fmt)
+    paths = []
+    for seller_id in payroll.sellers():
+        path = os.path.join(directory, f"seller-{seller_id}.{extension}")
+        with open(path, 'w', newline='', encoding='utf-8') as out:
+            write_statement(payroll, seller_id, out, fmt, names.get(seller_id, ''))
+        paths.append(path)
+    return paths
+
+def _month_period(month: str) -> Tuple[str, str]:
+    year, month = (int(part) for part in month.split('-'))
+    end = date(year + 1, 1, 1) if month == 12 else date(year, month + 1, 1)
+    return date(year, month, 1).isoformat(), end.isoformat()
+
+def _parse_rate(text: str) -> Tuple[int, float]:
+    seller_id, _, percent = text.partition('=')
+    seller_id, percent = int(seller_id), float(percent)
+    if not 0 <= percent <= 100:
+        raise ValueError("commission rate must be between 0 and 100")
+    return seller_id, percent
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Compute seller commissions for a period and write statements.")
+    parser.add_argument('input', nargs='?', help="priced orders from batch.py (.jsonl)")
+    parser.add_argument('--store', help="read the orders from this SQLite order store instead")
+    parser.add_argument('--start', help="first day of the period (YYYY-MM-DD)")
+    parser.add_argument('--end', help="day after the period (YYYY-MM-DD)")
+    parser.add_argument('--month', help="the calendar month YYYY-MM (instead of --start/--end)")
+    parser.add_argument('--rate', type=_parse_rate, action='append', default=[], metavar='SELLER=PERCENT',
+                        help="pay this seller this commission rate; may be repeated")
+    parser.add_argument('--default-rate', type=float,
+                        help="rate for sellers without --rate (default: the commission each order was priced with)")
+    parser.add_argument('--date', help="day of orders without a date in the input file (default: today)")
+    parser.add_argument('--chunk-size', type=int, default=PAYROLL_CHUNK_SIZE, help="orders grouped per pass")
+    parser.add_argument('--checkpoint', help="save progress here after every chunk and resume from it")
+    parser.add_argument('--statements', help="directory to write one statement per seller to")
+    parser.add_argument('--format', choices=FORMATS, default='text', help="statement format")
+    args = parser.parse_args(argv)
+    if bool(args.input) == bool(args.store):
+        parser.error("give either an input file or --store")
+    if args.month:
+        if args.start or args.end:
+            parser.error("--month cannot be combined with --start/--end")
+        args.start, args.end = _month_period(args.month)
+
+    import main as sales  # seller names only; main is not needed to compute the payroll
+    names = {seller_id: seller.name for seller_id, seller in sales.seller_dict.items()}
+    store = OrderStore(args.store) if args.store else None
+    try:
+        payroll = run_payroll(store or args.input, args.start, args.end, dict(args.rate), args.default_rate,
+                              args.date, args.chunk_size, args.checkpoint)
+    except ValueError as exc:
+        parser.error(str(exc))
+    finally:
+        if store is not None:
+            store.close()
+
+    rows = list(summary_rows(payroll, names))
+    write_table(rows, sys.stdout, 'text', SUMMARY_COLUMNS, column_widths(rows, SUMMARY_COLUMNS))
+    if args.statements:
+        paths = write_statements(payroll, args.statements, args.format, names)
+        print(f"Wrote {len(paths)} statements to {args.statements}.", file=sys.stderr)
+    print(f"{payroll.orders_read} orders in {_period_label(payroll)}.", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
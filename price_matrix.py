@@ -0,0 +1,148 @@
+"""
+Array-backed price store.
+
+PriceMatrix keeps every price in one dense float64 NumPy array indexed by
+integer-coded dimensions (table, category, finish, color, weight, location).
+Each label is mapped to its position once, so a lookup is a handful of dict
+hits and one array read, and a price costs 8 bytes instead of a dict entry
+plus a 5-tuple key.
+
+It also behaves like the old {table: {(category, finish, color, weight,
+location): price}} dict, so existing code that iterates PRICE_TABLES or calls
+PRICE_TABLES[table].get(key) keeps working. Missing prices are stored as NaN.
+"""
+from collections.abc import Mapping, MutableMapping
+from typing import Dict, Iterable, Iterator, Optional, Sequence, Tuple
+
+import numpy as np
+
+PriceKey = Tuple[str, str, str, int, str]
+
+class PriceTableView(MutableMapping):
+    """Dict-style view of one table of a PriceMatrix, keyed by (category, finish, color, weight, location)."""
+
+    def __init__(self, matrix: "PriceMatrix", table: str):
+        self._matrix = matrix
+        self._table = table
+        self._table_offset = matrix._table_index[table] * matrix._strides[0]
+
+    def _offset(self, key: PriceKey) -> int:
+        matrix = self._matrix
+        try:
+            return self._table_offset + sum(index[label] * stride
+                                            for index, label, stride in zip(matrix._index, key, matrix._strides[1:]))
+        except (KeyError, TypeError):
+            raise KeyError(key) from None
+
+    def __getitem__(self, key: PriceKey) -> float:
+        if len(key) != len(self._matrix.dimensions):
+            raise KeyError(key)
+        price = self._matrix._cells[self._offset(key)]
+        if price != price:  # NaN marks a missing price
+            raise KeyError(key)
+        return price
+
+    def __setitem__(self, key: PriceKey, price: float) -> None:
+        if len(key) != len(self._matrix.dimensions):
+            raise KeyError(key)
+        self._matrix._flat[self._offset(key)] = price
+
+    def __delitem__(self, key: PriceKey) -> None:
+        self[key]  # raise KeyError if missing
+        self._matrix._flat[self._offset(key)] = np.nan
+
+    def __iter__(self) -> Iterator[PriceKey]:
+        matrix = self._matrix
+        table_data = matrix.data[matrix._table_index[self._table]]
+        for idx in zip(*np.nonzero(~np.isnan(table_data))):
+            yield tuple(labels[i] for labels, i in zip(matrix.labels, idx))
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(~np.isnan(self._matrix.data[self._matrix._table_index[self._table]])))
+
+class PriceMatrix(Mapping):
+    """Dense price array over (table, category, finish, color, weight, location), read like {table: {key: price}}."""
+
+    dimensions = ('category', 'finish', 'color', 'weight', 'location')
+
+    def __init__(self, tables: Iterable[str], categories: Iterable[str], finishes: Iterable[str],
+                 colors: Iterable[str], weights: Iterable[int], locations: Iterable[str],
+                 data: Optional[np.ndarray] = None):
+        self.tables = tuple(tables)
+        self.labels = (tuple(categories), tuple(finishes), tuple(colors), tuple(weights), tuple(locations))
+        self._table_index = {table: i for i, table in enumerate(self.tables)}
+        self._index = tuple({label: i for i, label in enumerate(labels)} for labels in self.labels)
+
+        shape = (len(self.tables),) + tuple(len(labels) for labels in self.labels)
+        if data is None:
+            data = np.full(shape, np.nan, dtype=np.float64)
+        elif data.shape != shape or data.dtype != np.float64 or not data.flags.c_contiguous:
+            raise ValueError(f"data must be a C-contiguous float64 array of shape {shape}.")
+        self.data = data  # may be a read-only memory map (see catalog_snapshot)
+        self._flat = self.data.reshape(-1)  # a view, writes go to data
+        self._cells = memoryview(self._flat)  # cheapest way to read one cell as a Python float
+        self._strides = tuple(stride // self.data.itemsize for stride in self.data.strides)
+        self._views = {table: PriceTableView(self, table) for table in self.tables}
+
+    @classmethod
+    def from_tables(cls, price_tables: Dict[str, Dict[PriceKey, float]]) -> "PriceMatrix":
+        """Build a matrix from the nested {table: {key: price}} dict layout."""
+        labels = [dict() for _ in cls.dimensions]  # dicts keep first-seen order
+        for table_prices in price_tables.values():
+            for key in table_prices:
+                for seen, label in zip(labels, key):
+                    seen.setdefault(label, None)
+        matrix = cls(price_tables, *labels)
+        for table, table_prices in price_tables.items():
+            view = matrix[table]
+            for key, price in table_prices.items():
+                view[key] = price
+        return matrix
+
+    def __getitem__(self, table: str) -> PriceTableView:
+        return self._views[table]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.tables)
+
+    def __len__(self) -> int:
+        return len(self.tables)
+
+    def lookup(self, table: str, category: str, finish: str, color: str, weight: int, location: str) -> Optional[float]:
+        """Return the price for one cell, or None if any label is unknown or the price is missing."""
+        index = self._index
+        strides = self._strides
+        try:
+            offset = (self._table_index[table] * strides[0] + index[0][category] * strides[1]
+                      + index[1][finish] * strides[2] + index[2][color] * strides[3]
+                      + index[3][weight] * strides[4] + index[4][location] * strides[5])
+        except KeyError:
+            return None
+        price = self._cells[offset]
+        return None if price != price else price
+
+    def price(self, table: str, product, location: str) -> Optional[float]:
+        """get_price-compatible lookup for a Product."""
+        return self.lookup(table, product.category, product.finish, product.color, product.weight, location)
+
+    def product_prices(self, products: Sequence) -> np.ndarray:
+        """
+        Gather a [table, product, location] array of prices for a list of Products,
+        with NaN for products whose attributes are not in the matrix.
+        """
+        prices = np.full((len(self.tables), len(products), len(self.labels[-1])), np.nan)
+        for p, product in enumerate(products):
+            try:
+                idx = tuple(index[label] for index, label in
+                            zip(self._index, (product.category, product.finish, product.color, product.weight)))
+            except KeyError:
+                continue
+            prices[:, p, :] = self.data[(slice(None),) + idx]
+        return prices
+
+    def labels_for(self, dimension: str) -> Sequence:
+        return self.labels[self.dimensions.index(dimension)]
+
+    @property
+    def nbytes(self) -> int:
+        return self.data.nbytes
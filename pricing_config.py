@@ -0,0 +1,207 @@
+"""
+Pricing model as data: dimensions, factors, tax rates and per-SKU overrides.
+
+A PricingConfig is read from a JSON file (or taken from DEFAULT_PRICING) and
+compiled once into PricingRules:
+
+    price = base price(weight) x location factor x table factor
+
+unless an override names the SKU (category, finish, color, weight), optionally
+narrowed to one table and/or location, in which case its price is used. The
+base x location x table products are precomputed per (weight, location, table),
+and PricingRules.fill writes a whole PriceMatrix in one vectorized pass.
+
+A config file looks like DEFAULT_PRICING, with base_prices keyed by weight:
+
+    {"categories": ["Acrilico premium"], "finishes": ["fosco"], "colors": ["black"],
+     "base_prices": {"500": 1.0}, "tables": {"711": 1.0, "411": 0.9},
+     "locations": {"goiania": {"factor": 4.0, "tax_rate": 0.10}},
+     "overrides": [{"category": "Acrilico premium", "finish": "fosco", "color": "black",
+                    "weight": 500, "table": "411", "price": 3.5}]}
+"""
+import json
+from dataclasses import dataclass, field
+from itertools import product as cartesian
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+DEFAULT_PRICING = {
+    "categories": ["Acrilico premium"],
+    "finishes": ["fosco", "semibrilho"],
+    "colors": ["black", "white", "green"],
+    "base_prices": {"500": 1.0, "1000": 1.5, "2000": 2.0},
+    "tables": {"711": 1.0, "411": 0.9},
+    "locations": {
+        "goiania": {"factor": 4.0, "tax_rate": 0.10},
+        "pernambuco": {"factor": 4.5, "tax_rate": 0.15},
+        "bahia": {"factor": 5.0, "tax_rate": 0.12},
+    },
+    "overrides": [],
+}
+
+CellKey = Tuple[str, str, str, str, int, str]  # (table, category, finish, color, weight, location)
+
+@dataclass(frozen=True)
+class PriceOverride:
+    category: str
+    finish: str
+    color: str
+    weight: int
+    price: float
+    table: Optional[str] = None     # None: every table
+    location: Optional[str] = None  # None: every location
+
+@dataclass
+class PricingConfig:
+    categories: List[str]
+    finishes: List[str]
+    colors: List[str]
+    base_prices: Dict[int, float]
+    table_factors: Dict[str, float]
+    location_factors: Dict[str, float]
+    tax_rates: Dict[str, float]
+    overrides: List[PriceOverride] = field(default_factory=list)
+
+# ---------------------------
+# Loading
+# ---------------------------
+def _number(value, what: str) -> float:
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"{what} must be a number, got {value!r}.")
+    return float(value)
+
+def _labels(data: dict, name: str) -> List[str]:
+    labels = data.get(name)
+    if not isinstance(labels, list) or not labels or not all(isinstance(label, str) for label in labels):
+        raise ValueError(f"Pricing config needs a non-empty list of {name}.")
+    if len(set(labels)) != len(labels):
+        raise ValueError(f"Pricing config lists the same entry twice in {name}.")
+    return list(labels)
+
+def _factors(data: dict, name: str) -> dict:
+    factors = data.get(name)
+    if not isinstance(factors, dict) or not factors:
+        raise ValueError(f"Pricing config needs a non-empty {name} object.")
+    return factors
+
+def pricing_config_from_dict(data: dict) -> PricingConfig:
+    """Build and check a PricingConfig from the JSON layout. Raises ValueError on bad data."""
+    base_prices = {}
+    for weight, price in _factors(data, "base_prices").items():
+        try:
+            base_prices[int(weight)] = _number(price, f"Base price for {weight}ml")
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid base_prices entry {weight!r}: {exc}") from None
+    table_factors = {str(table): _number(factor, f"Factor for table {table}")
+                     for table, factor in _factors(data, "tables").items()}
+    location_factors, tax_rates = {}, {}
+    for location, settings in _factors(data, "locations").items():
+        if not isinstance(settings, dict) or "factor" not in settings:
+            raise ValueError(f"Location {location} needs a factor.")
+        location_factors[location] = _number(settings["factor"], f"Factor for {location}")
+        tax_rates[location] = _number(settings.get("tax_rate", 0), f"Tax rate for {location}")
+
+    config = PricingConfig(_labels(data, "categories"), _labels(data, "finishes"), _labels(data, "colors"),
+                           base_prices, table_factors, location_factors, tax_rates)
+    for i, entry in enumerate(data.get("overrides", [])):
+        try:
+            override = PriceOverride(entry["category"], entry["finish"], entry["color"], int(entry["weight"]),
+                                     _number(entry["price"], "price"), entry.get("table"), entry.get("location"))
+        except (KeyError, TypeError, ValueError) as exc:
+            raise ValueError(f"Invalid override #{i + 1}: {exc}") from None
+        _check_override(config, override, i + 1)
+        config.overrides.append(override)
+    return config
+
+def _check_override(config: PricingConfig, override: PriceOverride, number: int) -> None:
+    for label, labels, name in ((override.category, config.categories, "category"),
+                                (override.finish, config.finishes, "finish"),
+                                (override.color, config.colors, "color"),
+                                (override.weight, config.base_prices, "weight")):
+        if label not in labels:
+            raise ValueError(f"Override #{number} has an unknown {name}: {label}.")
+    if override.table is not None and override.table not in config.table_factors:
+        raise ValueError(f"Override #{number} has an unknown table: {override.table}.")
+    if override.location is not None and override.location not in config.location_factors:
+        raise ValueError(f"Override #{number} has an unknown location: {override.location}.")
+
+def load_pricing_config(path: str) -> PricingConfig:
+    with open(path, encoding="utf-8") as f:
+        return pricing_config_from_dict(json.load(f))
+
+def pricing_config_to_dict(config: PricingConfig) -> dict:
+    """The JSON layout of config, as load_pricing_config reads it."""
+    return {
+        "categories": config.categories,
+        "finishes": config.finishes,
+        "colors": config.colors,
+        "base_prices": {str(weight): price for weight, price in config.base_prices.items()},
+        "tables": config.table_factors,
+        "locations": {location: {"factor": factor, "tax_rate": config.tax_rates.get(location, 0)}
+                      for location, factor in config.location_factors.items()},
+        "overrides": [{key: value for key, value in vars(o).items() if value is not None} for o in config.overrides],
+    }
+
+def save_pricing_config(config: PricingConfig, path: str) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(pricing_config_to_dict(config), f, indent=2)
+
+# ---------------------------
+# Compiled Rules
+# ---------------------------
+class PricingRules:
+    """
+    Pricing compiled for fast evaluation: base x location x table precomputed per
+    (weight, location, table), overrides expanded to one dict entry per cell.
+    """
+
+    def __init__(self, base_prices: Dict[int, float], location_factors: Dict[str, float],
+                 table_factors: Dict[str, float], overrides: List[PriceOverride] = ()):
+        self.base_prices = dict(base_prices)
+        self.location_factors = dict(location_factors)
+        self.table_factors = dict(table_factors)
+        self._rule = {(weight, location, table): base * location_factor * table_factor
+                      for (weight, base), (location, location_factor), (table, table_factor)
+                      in cartesian(self.base_prices.items(), self.location_factors.items(), self.table_factors.items())}
+        self._overrides: Dict[CellKey, float] = {}
+        for o in overrides:  # later overrides win
+            tables = [o.table] if o.table is not None else list(self.table_factors)
+            locations = [o.location] if o.location is not None else list(self.location_factors)
+            for table, location in cartesian(tables, locations):
+                self._overrides[(table, o.category, o.finish, o.color, o.weight, location)] = o.price
+
+    def base_price(self, weight: int, location: str, table: str) -> Optional[float]:
+        """Price from the base x location x table rule alone, or None if a label is unknown."""
+        return self._rule.get((weight, location, table))
+
+    def price(self, table: str, category: str, finish: str, color: str, weight: int, location: str) -> Optional[float]:
+        """Price of one cell, overrides included."""
+        if self._overrides:
+            price = self._overrides.get((table, category, finish, color, weight, location))
+            if price is not None:
+                return price
+        return self._rule.get((weight, location, table))
+
+    def fill(self, matrix) -> None:
+        """Write every cell of a PriceMatrix whose table, weight and location the rules know."""
+        categories, finishes, colors, weights, locations = matrix.labels
+        nan = float('nan')
+        base = np.array([self.base_prices.get(weight, nan) for weight in weights])
+        location_factor = np.array([self.location_factors.get(location, nan) for location in locations])
+        table_factor = np.array([self.table_factors.get(table, nan) for table in matrix.tables])
+        # same multiplication order as the scalar rule, so both give identical floats
+        cells = (base[:, None] * location_factor[None, :])[None, :, :] * table_factor[:, None, None]
+        matrix.data[...] = cells[:, None, None, None, :, :]
+        for (table, *key), price in self._overrides.items():
+            if _has_labels(matrix, table, key):
+                matrix[table][tuple(key)] = price
+
+    def __len__(self) -> int:
+        return len(self._rule) + len(self._overrides)
+
+def _has_labels(matrix, table, key) -> bool:
+    return table in matrix.tables and all(label in labels for label, labels in zip(key, matrix.labels))
+
+def compile_rules(config: PricingConfig) -> PricingRules:
+    return PricingRules(config.base_prices, config.location_factors, config.table_factors, config.overrides)
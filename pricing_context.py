@@ -0,0 +1,109 @@
+"""
+Per-(table, location) pricing snapshots.
+
+An order is always priced for one table and one customer location, so the base
+price, tax rate, weight, flammability and cost of every product can be worked
+out once and reused for every line. PricingContext holds them per product code
+(in cents and parts per million, see money); pricing a line is then a lookup
+plus the money arithmetic. A context can also start empty and resolve each
+product when it is priced, for price stores that should not be read in full.
+
+PricingContextCache keeps one context per (table, location) and drops them all
+when the fingerprint of the pricing settings changes.
+"""
+from types import MappingProxyType
+from typing import Callable, Dict, Hashable, Mapping, NamedTuple, Optional, Tuple
+
+from money import apply_rate, discounted, percent_to_rate
+
+class ContextEntry(NamedTuple):
+    base_cents: int  # base price for the context's table and location
+    tax_rate: int    # parts per million; 0 for products that are not taxed
+    weight: int
+    flammable: bool
+    cost_cents: int
+
+class PricingContext:
+    """
+    Immutable price-and-tax snapshot of a catalog for one table and location. Products
+    without an entry are priced by resolve, which must work at the context's version.
+    """
+    __slots__ = ('table', 'location', 'version', 'entries', '_resolve')
+
+    def __init__(self, table: str, location: str, version: Hashable, entries: Dict[str, ContextEntry],
+                 resolve: Optional[Callable[[object], Optional[ContextEntry]]] = None):
+        self.table = table
+        self.location = location
+        self.version = version  # pricing version the entries were computed at
+        self.entries: Mapping[str, ContextEntry] = MappingProxyType(dict(entries))  # Product.code -> entry
+        self._resolve = resolve  # product -> entry (None if it has no price), for products not in entries
+
+    def entry(self, product) -> Optional[ContextEntry]:
+        """The entry for product, from entries or resolved on the spot; None if it has no price here."""
+        entry = self.entries.get(product.code)
+        if entry is None and self._resolve is not None:
+            entry = self._resolve(product)
+        return entry
+
+    def price_line(self, entry: ContextEntry, quantity: int, discount: float) -> Dict[str, int]:
+        """Price quantity units of entry at discount percent, in cents (same keys as main._price_line_cents)."""
+        discounted_price = discounted(entry.base_cents, percent_to_rate(discount))
+        tax_amount_per_item = apply_rate(discounted_price, entry.tax_rate) if entry.tax_rate else 0
+
+        item_total_before_tax = discounted_price * quantity
+        line_tax_amount = tax_amount_per_item * quantity
+        return {
+            'unit_price_before_tax': discounted_price,
+            'unit_price_incl_tax': discounted_price + tax_amount_per_item,
+            'tax_amount_per_item': tax_amount_per_item,
+            'item_total_before_tax': item_total_before_tax,
+            'line_tax_amount': line_tax_amount,
+            'line_total_with_tax': item_total_before_tax + line_tax_amount,
+            'line_cost': entry.cost_cents * quantity,
+        }
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, code: str) -> bool:
+        return code in self.entries
+
+    def __repr__(self) -> str:
+        return f"PricingContext(table={self.table!r}, location={self.location!r}, version={self.version!r}, products={len(self.entries)})"
+
+class PricingContextCache:
+    """PricingContexts by (table, location), all dropped when the settings fingerprint changes."""
+
+    def __init__(self, fingerprint: Optional[Hashable] = None):
+        self._contexts: Dict[Tuple[str, str], PricingContext] = {}
+        self.fingerprint = fingerprint  # settings the stored prices were computed under
+        self.builds = 0
+        self.invalidations = 0
+
+    def get(self, table: str, location: str, fingerprint: Hashable,
+            build: Callable[[str, str, Hashable], PricingContext],
+            on_invalidate: Optional[Callable[[], None]] = None) -> PricingContext:
+        """
+        Return the context for (table, location), building it if needed. If fingerprint
+        differs from the one the cached contexts were built under, they are dropped and
+        on_invalidate is called first.
+        """
+        if fingerprint != self.fingerprint:
+            if self.fingerprint is not None:
+                self.invalidations += 1
+                if on_invalidate is not None:
+                    on_invalidate()
+            self._contexts.clear()
+            self.fingerprint = fingerprint
+        context = self._contexts.get((table, location))
+        if context is None:
+            context = self._contexts[(table, location)] = build(table, location, fingerprint)
+            self.builds += 1
+        return context
+
+    def clear(self) -> None:
+        self._contexts.clear()
+        self.fingerprint = None
+
+    def stats(self) -> dict:
+        return {'contexts': len(self._contexts), 'builds': self.builds, 'invalidations': self.invalidations}
@@ -0,0 +1,238 @@
+"""
+Product finder: which catalog products have a given category, finish, color,
+weight and/or flammability.
+
+ProductIndex is built once from the catalog ({product id: Product}). For every
+value of every attribute it keeps a bitset (a Python int) with bit i set when
+the i-th product in id order has that value, so a query is a few dict hits and
+bitwise ANDs, whatever the catalog size, instead of a scan over every product.
+Several values for one attribute match any of them (their bitsets are ORed).
+Counting matches is a popcount; only the requested page is turned back into
+products.
+
+    index = ProductIndex(products)
+    page = index.search(finish="semibrilho", color="white", weight=2000)
+    index.search(**index.parse_query("semibrilho white 2000ml"), page=2, page_size=10)
+
+Free-text queries are matched word by word against the attribute values by
+parse_query; run this module to list or search the catalog from the shell:
+
+    python product_search.py semibrilho white 2000ml
+    python product_search.py --color black --color green --table 711 --location bahia
+"""
+import argparse
+import math
+import sys
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence
+
+ATTRIBUTES = ('category', 'finish', 'color', 'weight', 'flammable')
+
+class ProductPage(NamedTuple):
+    items: List[tuple]  # (product id, Product), in id order
+    total: int          # matches over all pages
+    page: int
+    page_size: int
+
+    @property
+    def pages(self) -> int:
+        return max(1, math.ceil(self.total / self.page_size))
+
+def _positions(bits: int, skip: int = 0, limit: Optional[int] = None) -> List[int]:
+    """Indexes of the set bits of bits, lowest first, after skipping skip of them."""
+    digits = bin(bits)[:1:-1]  # digits[i] is bit i
+    positions = []
+    i = digits.find('1')
+    while i >= 0 and (limit is None or len(positions) < limit):
+        if skip:
+            skip -= 1
+        else:
+            positions.append(i)
+        i = digits.find('1', i + 1)
+    return positions
+
+class ProductIndex:
+    """Per-attribute bitset indexes over a product catalog."""
+
+    def __init__(self, products: Dict[int, object]):
+        self.products = products
+        self.ids = sorted(products)
+        self.all = (1 << len(self.ids)) - 1
+        self._bits: Dict[str, Dict[object, int]] = {attribute: {} for attribute in ATTRIBUTES}
+        for position, product_id in enumerate(self.ids):
+            product = products[product_id]
+            bit = 1 << position
+            for attribute, bits in self._bits.items():
+                value = getattr(product, attribute)
+                bits[value] = bits.get(value, 0) | bit
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def values(self, attribute: str) -> Dict[object, int]:
+        """Every value of attribute in the catalog, with how many products have it."""
+        return {value: bits.bit_count() for value, bits in self._bits[self._check(attribute)].items()}
+
+    @staticmethod
+    def _check(attribute: str) -> str:
+        if attribute not in ATTRIBUTES:
+            raise ValueError(f"Unknown product attribute: {attribute}. Use one of {', '.join(ATTRIBUTES)}.")
+        return attribute
+
+    def _match(self, criteria: dict) -> int:
+        matched = self.all
+        for attribute, wanted in criteria.items():
+            if wanted is None:
+                continue
+            bits = self._bits[self._check(attribute)]
+            if isinstance(wanted, (list, tuple, set, frozenset)):
+                any_of = 0
+                for value in wanted:
+                    any_of |= bits.get(value, 0)
+                matched &= any_of
+            else:
+                matched &= bits.get(wanted, 0)
+            if not matched:
+                break
+        return matched
+
+    def find(self, **criteria) -> List[int]:
+        """Ids, in order, of the products matching every criterion (attribute=value or attribute=[values])."""
+        ids = self.ids
+        return [ids[i] for i in _positions(self._match(criteria))]
+
+    def count(self, **criteria) -> int:
+        return self._match(criteria).bit_count()
+
+    def search(self, page: int = 1, page_size: int = 20, **criteria) -> ProductPage:
+        """One page (counting from 1) of the products matching criteria, in id order."""
+        if page < 1 or page_size < 1:
+            raise ValueError("page and page_size must be positive.")
+        matched = self._match(criteria)
+        ids, products = self.ids, self.products
+        items = [(ids[i], products[ids[i]]) for i in _positions(matched, (page - 1) * page_size, page_size)]
+        return ProductPage(items, matched.bit_count(), page, page_size)
+
+    def resolve(self, attribute: str, values: Iterable) -> list:
+        """
+        The catalog's own spelling of each value of attribute, matched ignoring case as
+        parse_query does. Raises ValueError for a value no product has.
+        """
+        known = {str(value).lower(): value for value in self._bits[self._check(attribute)]}
+        resolved = []
+        for value in values:
+            if str(value).lower() not in known:
+                raise ValueError(f"No product has {attribute} '{value}'.")
+            resolved.append(known[str(value).lower()])
+        return resolved
+
+    def parse_query(self, text: str) -> Dict[str, list]:
+        """Criteria for a free-text query; see parse_query."""
+        return parse_query(text, self._bits)
+
+# ---------------------------
+# Free-Text Queries
+# ---------------------------
+_FLAMMABLE_WORDS = {'flammable': True, 'non-flammable': False, 'nonflammable': False}
+
+def _weight(word: str) -> Optional[int]:
+    word = word[:-2] if word.endswith('ml') else word
+    return int(word) if word.isdigit() else None
+
+def parse_query(text: str, known: Dict[str, Iterable]) -> Dict[str, list]:
+    """
+    Map each word of text (commas and spaces separate words) to the attribute whose
+    known values contain it, ignoring case: "semibrilho, white, 2000ml" gives
+    {'finish': ['semibrilho'], 'color': ['white'], 'weight': [2000]}. Values made of
+    several words ("Acrilico premium") match as a phrase. Raises ValueError for
+    words that match nothing.
+    """
+    words = text.replace(',', ' ').lower().split()
+    phrases = {}  # lowered value -> (attribute, value), longest first
+    for attribute in ('category', 'finish', 'color'):
+        for value in known.get(attribute, ()):
+            phrases[str(value).lower()] = (attribute, value)
+    criteria: Dict[str, list] = {}
+    i = 0
+    while i < len(words):
+        for phrase in sorted(phrases, key=lambda p: -len(p.split())):
+            length = len(phrase.split())
+            if ' '.join(words[i:i + length]) == phrase:
+                attribute, value = phrases[phrase]
+                i += length
+                break
+        else:
+            word = words[i]
+            i += 1
+            if word in _FLAMMABLE_WORDS:
+                attribute, value = 'flammable', _FLAMMABLE_WORDS[word]
+            elif _weight(word) is not None:
+                attribute, value = 'weight', _weight(word)
+            else:
+                raise ValueError(f"No product attribute matches '{word}'.")
+        if value not in criteria.setdefault(attribute, []):
+            criteria[attribute].append(value)
+    return criteria
+
+# ---------------------------
+# Catalog Listing
+# ---------------------------
+LISTING_COLUMNS = ['Code', 'Category', 'Finish', 'Color', 'Weight (ml)', 'Flammable']
+
+def listing_rows(page: ProductPage, price=None) -> Iterable[dict]:
+    """Catalog listing rows for a page; price(product), if given, fills a Price column."""
+    for product_id, product in page.items:
+        row = {'Code': product_id, 'Category': product.category, 'Finish': product.finish, 'Color': product.color,
+               'Weight (ml)': product.weight, 'Flammable': product.flammable}
+        if price is not None:
+            row['Price'] = price(product)
+        yield row
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    import main as sales  # the catalog lives in main, which imports this module
+    from render import FORMATS, column_widths, write_table
+
+    parser = argparse.ArgumentParser(description="List or search the product catalog.")
+    parser.add_argument('query', nargs='*', help='free-text filter, e.g. "semibrilho white 2000ml"')
+    for attribute in ('category', 'finish', 'color'):
+        parser.add_argument(f'--{attribute}', action='append', help="may be repeated (matches any)")
+    parser.add_argument('--weight', type=int, action='append', help="in ml; may be repeated (matches any)")
+    parser.add_argument('--flammable', choices=['yes', 'no'])
+    parser.add_argument('--table', help="show prices from this table (needs --location)")
+    parser.add_argument('--location', help="show prices for this location (needs --table)")
+    parser.add_argument('--page', type=int, default=1)
+    parser.add_argument('--page-size', type=int, default=20)
+    parser.add_argument('--format', choices=FORMATS, default='text')
+    args = parser.parse_args(argv)
+    if bool(args.table) != bool(args.location):
+        parser.error("--table and --location go together")
+
+    index = sales.product_index
+    try:
+        criteria = index.parse_query(' '.join(args.query)) if args.query else {}
+    except ValueError as exc:
+        parser.error(str(exc))
+    if args.flammable:
+        criteria['flammable'] = args.flammable == 'yes'
+    try:
+        for attribute in ('category', 'finish', 'color'):
+            if getattr(args, attribute):
+                criteria[attribute] = index.resolve(attribute, getattr(args, attribute))
+        if args.weight:
+            criteria['weight'] = args.weight
+        page = index.search(args.page, args.page_size, **criteria)
+    except ValueError as exc:
+        parser.error(str(exc))
+
+    columns = list(LISTING_COLUMNS)
+    price = None
+    if args.table:
+        columns.append('Price')
+        price = lambda product: sales.get_price(args.table, product, args.location)  # noqa: E731
+    rows = list(listing_rows(page, price))
+    widths = column_widths(rows, columns, {'Category': 18}) if args.format == 'text' else None
+    write_table(rows, sys.stdout, args.format, columns, widths)
+    print(f"Page {page.page} of {page.pages} ({page.total} products)", file=sys.stderr)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
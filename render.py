@@ -0,0 +1,119 @@
+"""
+Plain-text table rendering for the order summaries.
+
+render_table produces the same fixed-width layout as
+DataFrame.to_string(index=False, col_space=...) for the string, number and
+boolean cells used in the summaries, without importing pandas. pandas is only
+imported by to_dataframe, for callers that want a DataFrame.
+
+write_table streams rows from any iterable to a file as text, CSV or JSONL,
+one row at a time, so a summary of any length is written in constant memory.
+"""
+import csv
+import json
+from typing import Dict, Iterable, List, Optional, Sequence, TextIO
+
+FORMATS = ('text', 'csv', 'jsonl')
+
+def format_cell(value) -> str:
+    """Money and other floats are shown with two decimals; everything else as str()."""
+    if isinstance(value, float):
+        return f"{value:.2f}"
+    return str(value)
+
+def format_for_path(path: str) -> str:
+    """Pick the output format from a file extension: .csv, .jsonl, anything else is text."""
+    if path.endswith('.csv'):
+        return 'csv'
+    if path.endswith('.jsonl'):
+        return 'jsonl'
+    return 'text'
+
+def render_table(rows: Sequence[dict], columns: Optional[Sequence[str]] = None,
+                 col_space: Optional[Dict[str, int]] = None) -> str:
+    """
+    Render rows (dicts keyed by column name) as right-aligned columns separated by one
+    space. Each column is as wide as its header, its widest cell and col_space[column].
+    """
+    if columns is None:
+        columns = list(rows[0]) if rows else []
+    col_space = col_space or {}
+    cells = [[format_cell(row.get(column, '')) for column in columns] for row in rows]
+    widths = [max([col_space.get(column, 0), len(column)] + [len(row[i]) for row in cells])
+              for i, column in enumerate(columns)]
+    lines = [' '.join(column.rjust(width) for column, width in zip(columns, widths))]
+    lines.extend(' '.join(cell.rjust(width) for cell, width in zip(row, widths)) for row in cells)
+    return '\n'.join(lines)
+
+def column_widths(rows: Iterable[dict], columns: Sequence[str], col_space: Optional[Dict[str, int]] = None) -> Dict[str, int]:
+    """One pass over rows to find the widths render_table would use, without keeping the rows."""
+    col_space = col_space or {}
+    widths = {column: max(col_space.get(column, 0), len(column)) for column in columns}
+    for row in rows:
+        for column in columns:
+            width = len(format_cell(row.get(column, '')))
+            if width > widths[column]:
+                widths[column] = width
+    return widths
+
+class TableWriter:
+    """
+    Writes rows to out one at a time as text, CSV or JSONL. Text output uses widths
+    (from column_widths, or the headers if not given); a cell wider than its column
+    pushes the rest of its line right instead of being cut. JSONL keeps values
+    unformatted.
+    """
+
+    def __init__(self, out: TextIO, fmt: str, columns: Sequence[str], widths: Optional[Dict[str, int]] = None):
+        if fmt not in FORMATS:
+            raise ValueError(f"Unknown output format: {fmt}. Use one of {', '.join(FORMATS)}.")
+        self.out = out
+        self.fmt = fmt
+        self.columns = list(columns)
+        self.count = 0
+        widths = widths or {}
+        self._widths = [max(widths.get(column, 0), len(column)) for column in self.columns]
+        self._csv = csv.writer(out) if fmt == 'csv' else None
+        if fmt == 'text':
+            out.write(' '.join(column.rjust(width) for column, width in zip(self.columns, self._widths)) + '\n')
+        elif fmt == 'csv':
+            self._csv.writerow(self.columns)
+
+    def write_row(self, row: dict) -> None:
+        if self.fmt == 'text':
+            self.out.write(' '.join(format_cell(row.get(column, '')).rjust(width)
+                                    for column, width in zip(self.columns, self._widths)) + '\n')
+        elif self.fmt == 'csv':
+            self._csv.writerow([format_cell(row.get(column, '')) for column in self.columns])
+        else:
+            self.out.write(json.dumps({column: row.get(column) for column in self.columns}) + '\n')
+        self.count += 1
+
+def write_table(rows: Iterable[dict], out: TextIO, fmt: str = 'text', columns: Optional[Sequence[str]] = None,
+                widths: Optional[Dict[str, int]] = None) -> int:
+    """Stream rows to out with a TableWriter and return how many were written."""
+    rows = iter(rows)
+    if columns is None:
+        first = next(rows, None)
+        if first is None:
+            return 0
+        columns = list(first)
+        rows = _chain_first(first, rows)
+    writer = TableWriter(out, fmt, columns, widths)
+    for row in rows:
+        writer.write_row(row)
+    return writer.count
+
+def _chain_first(first, rest):
+    yield first
+    yield from rest
+
+def columns_to_rows(data: Dict[str, List]) -> List[dict]:
+    """Turn {'column': [values...]} (the DataFrame constructor layout) into a list of row dicts."""
+    columns = list(data)
+    return [dict(zip(columns, values)) for values in zip(*data.values())]
+
+def to_dataframe(rows: Sequence[dict], columns: Optional[Sequence[str]] = None):
+    """Build a pandas DataFrame from rows. pandas is imported here, on first use."""
+    import pandas as pd
+    return pd.DataFrame(list(rows), columns=columns)
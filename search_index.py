@@ -0,0 +1,195 @@
+"""
+Text search index for customer/seller names and addresses.
+
+TextIndex keeps each value lowercased once, a trigram -> ids inverted index for
+substring queries and a sorted list for prefix queries. Substring queries of
+three or more characters intersect the posting sets of the query's trigrams and
+only verify the surviving candidates, instead of lowercasing and scanning every
+entity on every query. TextIndex.filter answers the same queries within a given
+set of ids (one seller's customers, say) by checking just those ids.
+
+OwnershipIndex maps owners to the set of ids they own (sellers to their
+customers), so a portfolio is read, searched or moved without scanning every
+entity.
+"""
+from bisect import bisect_left, insort
+from typing import AbstractSet, Dict, Hashable, Iterable, List, Optional, Set
+
+GRAM = 3
+
+def _grams(text: str) -> Set[str]:
+    return {text[i:i + GRAM] for i in range(len(text) - GRAM + 1)}
+
+class TextIndex:
+    """Substring and prefix index over one text field of a set of entities."""
+
+    def __init__(self):
+        self._values: Dict[Hashable, str] = {}
+        self._postings: Dict[str, Set[Hashable]] = {}
+        self._sorted: List[tuple] = []  # (lowered value, id), for prefix queries
+        self._ids: List[Hashable] = []  # sorted ids, for short-query scans
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __contains__(self, entity_id: Hashable) -> bool:
+        return entity_id in self._values
+
+    def add(self, entity_id: Hashable, value: str) -> None:
+        """Index value for entity_id, replacing any previous value."""
+        if entity_id in self._values:
+            self.remove(entity_id)
+        text = value.lower()
+        self._values[entity_id] = text
+        for gram in _grams(text):
+            self._postings.setdefault(gram, set()).add(entity_id)
+        insort(self._sorted, (text, entity_id))
+        insort(self._ids, entity_id)
+
+    update = add
+
+    def add_many(self, items) -> None:
+        """Index many (id, value) pairs, sorting once at the end instead of inserting one by one."""
+        for entity_id, value in items:
+            if entity_id in self._values:
+                self.remove(entity_id)
+            text = value.lower()
+            self._values[entity_id] = text
+            for gram in _grams(text):
+                self._postings.setdefault(gram, set()).add(entity_id)
+            self._sorted.append((text, entity_id))
+            self._ids.append(entity_id)
+        self._sorted.sort()
+        self._ids.sort()
+
+    def remove(self, entity_id: Hashable) -> None:
+        text = self._values.pop(entity_id, None)
+        if text is None:
+            return
+        for gram in _grams(text):
+            ids = self._postings[gram]
+            ids.discard(entity_id)
+            if not ids:
+                del self._postings[gram]
+        del self._sorted[bisect_left(self._sorted, (text, entity_id))]
+        del self._ids[bisect_left(self._ids, entity_id)]
+
+    def _candidates(self, query: str) -> Set[Hashable]:
+        """Ids whose value has every trigram of query (a superset of the matches); query must be lowered."""
+        postings = []
+        for gram in _grams(query):
+            ids = self._postings.get(gram)
+            if not ids:
+                return set()
+            postings.append(ids)
+        postings.sort(key=len)
+        candidates = set(postings[0])
+        for ids in postings[1:]:
+            candidates &= ids
+            if not candidates:
+                break
+        return candidates
+
+    def search(self, query: str, limit: Optional[int] = None) -> List[Hashable]:
+        """Ids whose value contains query (case-insensitive), in id order, at most limit of them."""
+        query = query.lower()
+        if len(query) < GRAM:
+            # Too short for the trigram index. Short queries match most values, so an
+            # early-stopping scan is cheap when a limit is given.
+            matches = []
+            values = self._values
+            for entity_id in self._ids:
+                if query in values[entity_id]:
+                    matches.append(entity_id)
+                    if limit is not None and len(matches) >= limit:
+                        break
+            return matches
+
+        matches = sorted(entity_id for entity_id in self._candidates(query) if query in self._values[entity_id])
+        return matches if limit is None else matches[:limit]
+
+    def prefix(self, query: str, limit: Optional[int] = None) -> List[Hashable]:
+        """Ids whose value starts with query (case-insensitive), in value order, at most limit of them."""
+        query = query.lower()
+        matches = []
+        for i in range(bisect_left(self._sorted, (query,)), len(self._sorted)):
+            text, entity_id = self._sorted[i]
+            if not text.startswith(query) or (limit is not None and len(matches) >= limit):
+                break
+            matches.append(entity_id)
+        return matches
+
+    def filter(self, entity_ids: AbstractSet[Hashable], query: str, prefix: bool = False,
+               limit: Optional[int] = None) -> List[Hashable]:
+        """
+        The ids in entity_ids whose value contains (or, with prefix=True, starts with)
+        query, ordered like search and prefix. Checks each id given at most once, or,
+        for substring queries of three or more characters, the ids having the query's
+        trigrams when the rarest trigram has fewer ids than entity_ids.
+        """
+        query = query.lower()
+        values = self._values
+        pool = entity_ids
+        if not prefix and len(query) >= GRAM:
+            # the rarest trigram bounds the candidates; only worth intersecting if it beats the pool
+            if min(len(self._postings.get(gram, ())) for gram in _grams(query)) < len(entity_ids):
+                pool = [entity_id for entity_id in self._candidates(query) if entity_id in entity_ids]
+        if prefix:
+            matches = sorted((values[entity_id], entity_id) for entity_id in pool
+                             if values.get(entity_id, '').startswith(query))
+            matches = [entity_id for _, entity_id in matches]
+        else:
+            matches = sorted(entity_id for entity_id in pool if query in values.get(entity_id, ''))
+        return matches if limit is None else matches[:limit]
+
+class OwnershipIndex:
+    """Owner -> set of owned ids, with the reverse lookup, kept in step as ids are added and moved."""
+
+    def __init__(self):
+        self._owner: Dict[Hashable, Hashable] = {}
+        self._owned: Dict[Hashable, Set[Hashable]] = {}
+
+    def __len__(self) -> int:
+        return len(self._owner)
+
+    def __contains__(self, entity_id: Hashable) -> bool:
+        return entity_id in self._owner
+
+    def add(self, entity_id: Hashable, owner: Hashable) -> None:
+        """Record that owner owns entity_id, moving it from its previous owner if any."""
+        if entity_id in self._owner:
+            if self._owner[entity_id] == owner:
+                return
+            self.remove(entity_id)
+        self._owner[entity_id] = owner
+        self._owned.setdefault(owner, set()).add(entity_id)
+
+    move = add
+
+    def add_many(self, items: Iterable[tuple]) -> None:
+        for entity_id, owner in items:
+            self.add(entity_id, owner)
+
+    def remove(self, entity_id: Hashable) -> None:
+        if entity_id not in self._owner:
+            return
+        owner = self._owner.pop(entity_id)
+        owned = self._owned[owner]
+        owned.discard(entity_id)
+        if not owned:
+            del self._owned[owner]
+
+    def owner_of(self, entity_id: Hashable) -> Optional[Hashable]:
+        return self._owner.get(entity_id)
+
+    def portfolio(self, owner: Hashable) -> AbstractSet[Hashable]:
+        """The live set of ids owner owns; do not modify it."""
+        return self._owned.get(owner, frozenset())
+
+    def owned_by(self, owner: Hashable) -> List[Hashable]:
+        """The ids owner owns, in id order."""
+        return sorted(self._owned.get(owner, ()))
+
+    def sizes(self) -> Dict[Hashable, int]:
+        """How many ids each owner owns."""
+        return {owner: len(owned) for owner, owned in self._owned.items()}
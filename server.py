@@ -0,0 +1,124 @@
+"""
+Order-intake service: a line-oriented TCP server on asyncio.
+
+Each request is one order spec as a JSON line (the same format batch.py reads);
+each response is one JSON line, either the priced order from batch.process_order
+or {"order_id": ..., "error": ...}. Many clients can be connected at once, and a
+client may send several requests before reading the responses; responses come
+back in request order on each connection.
+
+    python server.py --port 8750
+    python server.py --port 8750 --workers 4
+
+Orders are priced on the event loop by default. Pricing an order is short, and
+each one keeps its state in its own OrderSession, so there is nothing to gain
+from threads here. With --workers N orders are priced in N worker processes
+instead, like batch.py --workers (commissions then accumulate on the workers'
+copies of the sellers).
+
+With --watch-pricing SECONDS the pricing config (SALES_PRICING_CONFIG) is checked
+that often and reloaded when it changes; orders already being priced finish at
+the version they started with. Reloads only reach orders priced on the event
+loop, so it cannot be combined with --workers.
+"""
+import argparse
+import asyncio
+import json
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from batch import process_order
+from main import watch_pricing_config
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8750
+MAX_REQUEST_BYTES = 1 << 20
+
+# ---------------------------
+# Requests
+# ---------------------------
+def handle_request(line: bytes) -> dict:
+    """Price one JSON order spec. Invalid requests get an error record instead of an exception."""
+    try:
+        spec = json.loads(line)
+    except ValueError as exc:
+        return {'order_id': None, 'error': f"Invalid JSON: {exc}"}
+    if not isinstance(spec, dict):
+        return {'order_id': None, 'error': "Request must be a JSON object."}
+    try:
+        return process_order(spec)
+    except (KeyError, TypeError, ValueError) as exc:
+        return {'order_id': spec.get('order_id'), 'error': str(exc)}
+
+async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                            pool: Optional[ProcessPoolExecutor] = None) -> None:
+    """Answer each request line on one connection until the client closes it."""
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                line = await reader.readline()
+            except ValueError:  # line longer than MAX_REQUEST_BYTES
+                writer.write(b'{"order_id": null, "error": "Request too large."}\n')
+                break
+            if not line:
+                break
+            if not line.strip():
+                continue
+            if pool is None:
+                result = handle_request(line)
+            else:
+                result = await loop.run_in_executor(pool, handle_request, line)
+            writer.write(json.dumps(result).encode() + b'\n')
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+# ---------------------------
+# Server
+# ---------------------------
+async def start_server(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                       pool: Optional[ProcessPoolExecutor] = None) -> asyncio.AbstractServer:
+    """Start listening; port 0 picks a free port (see server.sockets[0].getsockname())."""
+    return await asyncio.start_server(lambda r, w: handle_connection(r, w, pool), host, port,
+                                      limit=MAX_REQUEST_BYTES)
+
+async def serve(host: str, port: int, workers: int = 0) -> None:
+    pool = ProcessPoolExecutor(max_workers=workers) if workers else None
+    try:
+        server = await start_server(host, port, pool)
+        address = server.sockets[0].getsockname()
+        print(f"Listening on {address[0]}:{address[1]}", file=sys.stderr, flush=True)
+        async with server:
+            await server.serve_forever()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve order pricing over TCP, one JSON order per line.")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help="0 picks a free port")
+    parser.add_argument('-w', '--workers', type=int, default=0,
+                        help="worker processes to price orders in (0 = on the event loop)")
+    parser.add_argument('--watch-pricing', type=float, metavar='SECONDS',
+                        help="reload the pricing config when it changes, checking every SECONDS")
+    args = parser.parse_args(argv)
+    if args.watch_pricing:
+        if args.workers:
+            parser.error("--watch-pricing cannot be combined with --workers")
+        try:
+            watch_pricing_config(interval=args.watch_pricing)
+        except ValueError as exc:
+            parser.error(str(exc))
+    try:
+        asyncio.run(serve(args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,52 @@
+import random
+
+import numpy as np
+import pytest
+
+import main
+from columnar import MONEY_COLUMNS, build_catalog_arrays, price_lines_cents, totals_by_order
+
+def random_lines(n, seed=7):
+    rng = random.Random(seed)
+    codes = list(main.products)
+    lines = []
+    for _ in range(n):
+        code = rng.choice(codes)
+        quantity = rng.randint(1, 30) * (4 if main.products[code].weight == 500 else 1)
+        lines.append((code, quantity, rng.choice((0, 5, 10, 12.5, 33.3, 100)),
+                      rng.choice(main.TABLES), rng.choice(main.LOCATIONS)))
+    return lines
+
+def test_price_lines_cents_matches_the_scalar_path():
+    lines = random_lines(2000)
+    codes, quantities, discounts, tables, locations = zip(*lines)
+    priced = price_lines_cents(codes, quantities, discounts, tables, locations, arrays=build_catalog_arrays())
+    for i, (code, quantity, discount, table, location) in enumerate(lines):
+        expected = main._price_line_cents(main.products[code], quantity, discount, table, location)
+        assert {column: int(priced[column][i]) for column in MONEY_COLUMNS} == expected, lines[i]
+
+def test_order_totals_match_the_cart():
+    lines = [(code, quantity, discount) for code, quantity, discount, _, _ in random_lines(40, seed=3)]
+    lines = list({code: (code, quantity, discount) for code, quantity, discount in lines}.values())
+    customer = main.customer_dict[1]
+    cart = main.Cart(customer, "711")
+    for code, quantity, discount in lines:
+        cart.add(str(code), quantity, discount)
+    codes, quantities, discounts = zip(*lines)
+    priced = price_lines_cents(codes, quantities, discounts, "711", customer.address)
+    totals = totals_by_order(np.zeros(len(lines), dtype=np.int64), priced)
+    assert int(totals['line_total_with_tax'][0]) == cart.total_price_cents
+    assert int(totals['line_weight'][0]) == cart.total_weight
+    assert {weight: int(totals[f'volumes_{weight}'][0]) for weight in cart.volumes} == cart.volumes
+
+@pytest.mark.parametrize("change, message", [
+    (dict(code=1), "Invalid product code"),
+    (dict(quantity=0), "positive"),
+    (dict(discount=101), "between 0 and 100"),
+    (dict(table="999"), "Invalid table number"),
+])
+def test_invalid_lines_are_rejected(change, message):
+    line = dict(code=next(iter(main.products)), quantity=4, discount=0, table="711", location="goiania")
+    line.update(change)
+    with pytest.raises(ValueError, match=message):
+        price_lines_cents([line['code']], [line['quantity']], [line['discount']], line['table'], line['location'])
@@ -0,0 +1,58 @@
+import re
+
+import pytest
+
+import main
+
+SELLERS = """customer_id,name,address,email,phone,block
+4,Dave,goiania,d@x,1,no
+6,Frank,bahia,f@x,2,
+"""
+
+CUSTOMERS = """{"customer_id": 1, "name": "Alice", "address": "goiania", "email": "a@x", "phone": "1", "seller_id": 4}
+{"customer_id": 2, "name": "Carol", "address": "bahia", "email": "c@x", "phone": "2", "seller_id": 6}
+"""
+
+@pytest.fixture
+def entities():
+    """The current entity dicts, put back (and re-indexed) after the test."""
+    saved = [(entity_dict, dict(entity_dict)) for entity_dict in (main.seller_dict, main.customer_dict, main.transport_dict)]
+    yield
+    for entity_dict, contents in saved:
+        entity_dict.clear()
+        entity_dict.update(contents)
+    main.build_search_indexes()
+
+def data_dir(tmp_path, sellers=SELLERS, customers=CUSTOMERS):
+    (tmp_path / "sellers.csv").write_text(sellers, encoding="utf-8")
+    (tmp_path / "customers.jsonl").write_text(customers, encoding="utf-8")
+    return str(tmp_path)
+
+def test_load_data_dir_replaces_the_sample_data(tmp_path, entities):
+    reports = main.load_data_dir(data_dir(tmp_path))
+    assert [(report.loaded, report.skipped) for report in reports] == [(2, 0), (2, 0)]
+    assert sorted(main.seller_dict) == [4, 6]
+    assert sorted(main.customer_dict) == [1, 2]
+    assert [customer.name for customer in main.search_by_name("carol")] == ["Carol"]
+    assert [customer.customer_id for customer in main.customers_of_seller(6)] == [2]
+
+def test_strict_load_reports_the_bad_line_and_keeps_the_previous_data(tmp_path, entities):
+    before = (dict(main.seller_dict), dict(main.customer_dict), dict(main.search_indexes), main.customers_by_seller)
+    path = data_dir(tmp_path, sellers=SELLERS + "9,Zed,rio,z@x,3,maybe\n")
+    with pytest.raises(ValueError, match=r"sellers\.csv:4: block must be yes/no"):
+        main.load_data_dir(path)
+    assert (dict(main.seller_dict), dict(main.customer_dict), dict(main.search_indexes)) == before[:3]
+    assert main.customers_by_seller is before[3]
+
+def test_non_strict_load_skips_and_reports_bad_records(tmp_path, entities):
+    customers = CUSTOMERS + '{"customer_id": 3, broken\n[1, 2]\n' + \
+        '{"customer_id": 1, "name": "Again", "address": "x", "email": "a@x", "phone": "1", "seller_id": 4}\n' + \
+        '{"customer_id": 5, "name": "Eve", "address": "x", "email": "e@x", "phone": "1", "seller_id": 99}\n'
+    sellers_report, customers_report = main.load_data_dir(data_dir(tmp_path, customers=customers), strict=False)
+    assert (sellers_report.loaded, sellers_report.skipped) == (2, 0)
+    assert (customers_report.loaded, customers_report.skipped) == (2, 4)
+    errors = [re.fullmatch(r".*customers\.jsonl:(\d+): (.*)", error).groups() for error in customers_report.errors]
+    assert [line for line, _ in errors] == ["3", "4", "5", "6"]
+    assert errors[0][1].startswith("not valid JSON")
+    assert [message for _, message in errors[1:]] == ["not a JSON object", "duplicate id 1", "unknown seller_id 99"]
+    assert sorted(main.customer_dict) == [1, 2]
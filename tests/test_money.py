@@ -0,0 +1,34 @@
+import pytest
+
+import main
+from money import apply_rate, discounted, percent_to_rate, split, to_cents
+
+@pytest.mark.parametrize("total", [0, 1, 99, 100, 10_001, 123_456_789, -1001])
+@pytest.mark.parametrize("parts", [1, 2, 3, 7, 12])
+def test_split_adds_up_to_the_total(total, parts):
+    installments = split(total, parts)
+    assert len(installments) == parts
+    assert sum(installments) == total
+    assert max(installments) - min(installments) <= 1
+    assert installments == sorted(installments, reverse=True)  # leftover cents go first
+
+def test_split_rejects_no_installments():
+    with pytest.raises(ValueError):
+        split(100, 0)
+
+def test_rounding_is_half_away_from_zero_on_the_written_value():
+    assert to_cents(0.125) == 13
+    assert to_cents(2.675) == 268  # 2.67499999... as a binary float
+    assert to_cents(-0.125) == -13
+    assert apply_rate(1, 500_000) == 1
+    assert apply_rate(-1, 500_000) == -1
+    assert discounted(1999, percent_to_rate(12.5)) == 1749
+
+def test_order_installments_add_up_to_the_order_total():
+    customer, seller = main.customer_dict[1], main.seller_dict[main.customer_dict[1].seller_id]
+    session = main.OrderSession(customer, seller, 5, "711", [30, 60, 90])
+    for code in ("100", "101", "102"):
+        session.cart.add(code, 8, 12.5)
+    installments = session.installment_cents()
+    assert len(installments) == 3
+    assert sum(installments) == session.total_price_cents
@@ -0,0 +1,37 @@
+"""
+populate_price_tables in every kind of price store. The store is chosen from the
+environment when main is imported, so each mode runs in its own interpreter.
+"""
+import os
+import subprocess
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+POPULATE = """
+import main
+before = main.get_price('711', main.products[100], 'goiania')
+main.populate_price_tables()
+assert main.get_price('711', main.products[100], 'goiania') == before
+print(type(main.PRICE_TABLES).__name__)
+"""
+
+def run_main(code, **env):
+    result = subprocess.run([sys.executable, "-c", code], cwd=ROOT, env={**os.environ, **env},
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return result.stdout.strip().splitlines()[-1]
+
+@pytest.mark.parametrize("mode, store", [("eager", "PriceMatrix"), ("lazy", "LazyPriceTables")])
+def test_populate_price_tables(mode, store):
+    assert run_main(POPULATE, SALES_PRICING_MODE=mode, SALES_CATALOG_SNAPSHOT="") == store
+
+def test_populate_price_tables_over_memory_mapped_snapshot(tmp_path):
+    snapshot = str(tmp_path / "catalog.snapshot")
+    run_main(f"import compile_catalog; compile_catalog.compile_catalog({snapshot!r}); print('ok')",
+             SALES_CATALOG_SNAPSHOT="")
+    check = "import main; print(main.PRICE_TABLES.data.flags.writeable)"
+    assert run_main(check, SALES_PRICING_MODE="eager", SALES_CATALOG_SNAPSHOT=snapshot) == "False"
+    assert run_main(POPULATE, SALES_PRICING_MODE="eager", SALES_CATALOG_SNAPSHOT=snapshot) == "PriceMatrix"
@@ -0,0 +1,61 @@
+import json
+import os
+
+import pytest
+
+import main
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+@pytest.fixture
+def pricing():
+    """The current pricing, put back after the test."""
+    saved = main.PRICING
+    yield saved
+    main.install_pricing(saved)
+
+def write_config(tmp_path, **changes):
+    with open(os.path.join(ROOT, "pricing.example.json"), encoding="utf-8") as f:
+        config = json.load(f)
+    config.update(changes)
+    path = tmp_path / "pricing.json"
+    path.write_text(json.dumps(config), encoding="utf-8")
+    return str(path)
+
+def doubled_tables(tmp_path):
+    tables = {table: factor * 2 for table, factor in main.PRICING.config.table_factors.items()}
+    return write_config(tmp_path, tables=tables)
+
+@pytest.mark.parametrize("changes", [
+    dict(categories=["Acrilico premium", "Esmalte"]),
+    dict(colors=["black", "white"]),
+    dict(base_prices={"500": 1.0, "1000": 1.5, "2000": 2.0, "5000": 4.0}),
+])
+def test_reload_rejects_a_config_that_changes_the_catalog(tmp_path, pricing, changes):
+    failures = main.reload_stats.failures
+    with pytest.raises(ValueError, match="needs a restart"):
+        main.reload_pricing(write_config(tmp_path, **changes))
+    assert main.PRICING is pricing
+    assert main.reload_stats.failures == failures + 1
+
+def test_reload_installs_a_new_version(tmp_path, pricing):
+    product = main.products[100]
+    before = main.get_price("711", product, "goiania")
+    snapshot = main.reload_pricing(doubled_tables(tmp_path))
+    assert main.PRICING is snapshot
+    assert snapshot.version > pricing.version
+    assert main.get_price("711", product, "goiania") == pytest.approx(2 * before)
+    assert main.get_price("711", product, "goiania", snapshot=pricing) == before
+
+def test_open_carts_keep_their_version(tmp_path, pricing):
+    customer = main.customer_dict[1]
+    open_cart = main.Cart(customer, "711")
+    first = open_cart.add("101", 2, 0)
+    main.reload_pricing(doubled_tables(tmp_path))
+    # a line added after the reload is still priced at the version the cart started with
+    second = open_cart.add("102", 2, 0)
+    new_cart = main.Cart(customer, "711")
+    assert open_cart.pricing_version == pricing.version
+    assert new_cart.pricing_version == main.PRICING.version != pricing.version
+    assert new_cart.add("101", 2, 0)['unit_price_before_tax'] == pytest.approx(2 * first['unit_price_before_tax'])
+    assert new_cart.add("102", 2, 0)['unit_price_before_tax'] == pytest.approx(2 * second['unit_price_before_tax'])